@@ -0,0 +1,92 @@
+#!/usr/bin/env python
+"""
+Load the ChEBI index used by find_chebi_term from a sqlite copy of the florchebi tables, and compare the time to find
+the exact, synonym and partial matches of some texts with the index and with the queries previously run by
+find_chebi_term. By default, uses the sample tables next to this script, on which tests/test_chebi_index.py checks
+that both find the same matches.
+Run from the src directory: python -m benchmarks.chebi_benchmark
+"""
+from __future__ import division, absolute_import
+
+import argparse
+import os
+import sqlite3
+import time
+
+from chebi_base import ChebiIndex
+
+sample_sql = os.path.join(os.path.dirname(os.path.abspath(__file__)), "chebi_sample.sql")
+sample_queries = ["ethanol", "Ethanol", "ETHANOL", "ethyl alcohol", "EtOH", "etoh", "alcohol", "dextrose", "Glc",
+                  "glucose", "alpha-D-glucose", "alpha D glucose", "glucose solution", "heavy water",
+                  "dideuterium oxide", "deuterium oxide", "caffeine", "guaranine", "1,3,7-trimethylxanthine",
+                  "table salt", "sodium", "sodium ion", "sodium ions", "chloride ion", "acetic", "acetic acid",
+                  "water ice", "carbon", "carbon dioxide gas", "ammonium ion", "unknown compound", ""]
+
+exact_query = """SELECT distinct id, name FROM term a WHERE name =? and LENGTH(a.name)>0 and star=3 ORDER BY id"""
+synonym_query = """SELECT a.term_id, b.name
+                   FROM term_synonym a, term b
+                   WHERE a.term_synonym=? and b.id=a.term_id and LENGTH(a.term_synonym)>0 and star=3
+                   ORDER BY a.term_id"""
+partial_query = """SELECT c.id, e.name, ((sum(d.ic)/ec)-0.1) as score
+                   FROM term e JOIN descriptor3 c ON(c.term_id=e.id) JOIN word2term3 b ON (b.descriptor_id=c.id)
+                        JOIN word3 d ON (d.id=b.word_id) JOIN SSM_TermDesc f ON (e.id=f.term_id)
+                   WHERE b.word_id IN (SELECT distinct id FROM word3 WHERE word in ({}))
+                   GROUP by c.id
+                   ORDER by score desc, c.id
+                   LIMIT 3"""
+
+
+def sql_matches(conn, text):
+    """exact, synonym and partial matches of a text with the queries of find_chebi_term"""
+    words = text.split(" ")
+    return (conn.execute(exact_query, (text,)).fetchone(), conn.execute(synonym_query, (text,)).fetchone(),
+            conn.execute(partial_query.format(",".join("?" * len(words))), words).fetchone())
+
+
+def index_matches(index, text):
+    return index.find_name(text), index.find_synonym(text), index.find_partial(text.split(" "))
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark of the ChEBI index')
+    parser.add_argument("--db", help="sqlite copy of the florchebi tables, instead of the sample tables")
+    parser.add_argument("--queries", help="file with one text per line, instead of the sample texts")
+    parser.add_argument("--repeat", type=int, default=100, help="Number of times each text is resolved")
+    options = parser.parse_args()
+
+    if options.db:
+        conn = sqlite3.connect(options.db)
+    else:
+        conn = sqlite3.connect(":memory:")
+        with open(sample_sql) as f:
+            conn.executescript(f.read())
+    conn.text_factory = str
+    if options.queries:
+        with open(options.queries) as f:
+            texts = [line.rstrip("\r\n") for line in f]
+    else:
+        texts = sample_queries
+
+    index = ChebiIndex()
+    t = time.time()
+    index.load(conn)
+    load_time = time.time() - t
+
+    t = time.time()
+    for i in range(options.repeat):
+        for text in texts:
+            sql_matches(conn, text)
+    sql_time = time.time() - t
+    t = time.time()
+    for i in range(options.repeat):
+        for text in texts:
+            index_matches(index, text)
+    index_time = time.time() - t
+    nsearches = options.repeat * len(texts)
+    print "index loaded in {:.2f}s".format(load_time)
+    print "queries: {:.3f}ms per text".format(1000 * sql_time / nsearches)
+    print "index: {:.3f}ms per text ({:.1f}x)".format(1000 * index_time / nsearches, sql_time / index_time)
+
+
+if __name__ == "__main__":
+    main()
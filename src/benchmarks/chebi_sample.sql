@@ -0,0 +1,226 @@
+-- Sample of the tables of the florchebi database used by chebi_base.ChebiIndex, for benchmarks/chebi_benchmark.py
+-- The names and words use the NOCASE collation, like the case insensitive collation of the MySQL database
+CREATE TABLE term (id INTEGER PRIMARY KEY, name TEXT COLLATE NOCASE, star INTEGER);
+CREATE TABLE term_synonym (id INTEGER PRIMARY KEY, term_id INTEGER, term_synonym TEXT COLLATE NOCASE);
+CREATE TABLE word3 (id INTEGER PRIMARY KEY, word TEXT COLLATE NOCASE UNIQUE, freq INTEGER, ic REAL);
+CREATE TABLE descriptor3 (id INTEGER PRIMARY KEY, term_id INTEGER, descriptor_type TEXT, descriptor_ext_id INTEGER, ec REAL);
+CREATE TABLE word2term3 (id INTEGER PRIMARY KEY, word_id INTEGER, term_id INTEGER, descriptor_id INTEGER);
+CREATE TABLE SSM_TermDesc (term_id INTEGER PRIMARY KEY, nDesc INTEGER, prob REAL, info_content REAL, rel_info REAL);
+INSERT INTO term VALUES (15377, 'water', 3);
+INSERT INTO term VALUES (16236, 'ethanol', 3);
+INSERT INTO term VALUES (17234, 'glucose', 3);
+INSERT INTO term VALUES (4167, 'D-glucopyranose', 3);
+INSERT INTO term VALUES (17925, 'alpha-D-glucose', 3);
+INSERT INTO term VALUES (15378, 'hydron', 3);
+INSERT INTO term VALUES (29101, 'sodium(1+)', 3);
+INSERT INTO term VALUES (17996, 'chloride', 3);
+INSERT INTO term VALUES (15366, 'acetic acid', 3);
+INSERT INTO term VALUES (30089, 'acetate', 3);
+INSERT INTO term VALUES (27732, 'caffeine', 3);
+INSERT INTO term VALUES (41981, 'dideuterium oxide', 2);
+INSERT INTO term VALUES (26710, 'sodium chloride', 3);
+INSERT INTO term VALUES (26708, 'sodium atom', 3);
+INSERT INTO term VALUES (29412, 'oxonium', 3);
+INSERT INTO term VALUES (16134, 'ammonia', 3);
+INSERT INTO term VALUES (28938, 'ammonium', 3);
+INSERT INTO term VALUES (17790, 'methanol', 3);
+INSERT INTO term VALUES (16526, 'carbon dioxide', 3);
+INSERT INTO term VALUES (29237, 'deuterium atom', 3);
+INSERT INTO term_synonym VALUES (1, 15377, 'H2O');
+INSERT INTO term_synonym VALUES (2, 15377, 'oxidane');
+INSERT INTO term_synonym VALUES (3, 16236, 'ethyl alcohol');
+INSERT INTO term_synonym VALUES (4, 16236, 'EtOH');
+INSERT INTO term_synonym VALUES (5, 16236, 'alcohol');
+INSERT INTO term_synonym VALUES (6, 17234, 'Glc');
+INSERT INTO term_synonym VALUES (7, 17234, 'dextrose');
+INSERT INTO term_synonym VALUES (8, 4167, 'dextrose');
+INSERT INTO term_synonym VALUES (9, 17925, 'alpha-D-Glcp');
+INSERT INTO term_synonym VALUES (10, 15366, 'ethanoic acid');
+INSERT INTO term_synonym VALUES (11, 15366, 'AcOH');
+INSERT INTO term_synonym VALUES (12, 27732, '1,3,7-trimethylxanthine');
+INSERT INTO term_synonym VALUES (13, 27732, 'guaranine');
+INSERT INTO term_synonym VALUES (14, 41981, 'heavy water');
+INSERT INTO term_synonym VALUES (15, 26710, 'table salt');
+INSERT INTO term_synonym VALUES (16, 26710, 'NaCl');
+INSERT INTO term_synonym VALUES (17, 29101, 'sodium ion');
+INSERT INTO term_synonym VALUES (18, 17996, 'chloride ion');
+INSERT INTO term_synonym VALUES (19, 29412, 'hydronium');
+INSERT INTO term_synonym VALUES (20, 17790, 'methyl alcohol');
+INSERT INTO term_synonym VALUES (21, 16526, 'carbonic anhydride');
+INSERT INTO term_synonym VALUES (22, 29237, 'deuterium');
+INSERT INTO word3 VALUES (1, '1', 1, 1.000000);
+INSERT INTO word3 VALUES (2, '1+', 1, 1.000000);
+INSERT INTO word3 VALUES (3, '3', 1, 1.000000);
+INSERT INTO word3 VALUES (4, '7', 1, 1.000000);
+INSERT INTO word3 VALUES (5, 'acetate', 1, 1.000000);
+INSERT INTO word3 VALUES (6, 'acetic', 1, 1.000000);
+INSERT INTO word3 VALUES (7, 'acid', 1, 1.000000);
+INSERT INTO word3 VALUES (8, 'acoh', 1, 1.000000);
+INSERT INTO word3 VALUES (9, 'alcohol', 2, 0.768622);
+INSERT INTO word3 VALUES (10, 'alpha', 1, 1.000000);
+INSERT INTO word3 VALUES (11, 'ammonia', 1, 1.000000);
+INSERT INTO word3 VALUES (12, 'ammonium', 1, 1.000000);
+INSERT INTO word3 VALUES (13, 'anhydride', 1, 1.000000);
+INSERT INTO word3 VALUES (14, 'atom', 2, 0.768622);
+INSERT INTO word3 VALUES (15, 'caffeine', 1, 1.000000);
+INSERT INTO word3 VALUES (16, 'carbon', 1, 1.000000);
+INSERT INTO word3 VALUES (17, 'carbonic', 1, 1.000000);
+INSERT INTO word3 VALUES (18, 'chloride', 2, 0.768622);
+INSERT INTO word3 VALUES (19, 'd', 2, 0.768622);
+INSERT INTO word3 VALUES (20, 'deuterium', 1, 1.000000);
+INSERT INTO word3 VALUES (21, 'dextrose', 2, 0.768622);
+INSERT INTO word3 VALUES (22, 'dideuterium', 1, 1.000000);
+INSERT INTO word3 VALUES (23, 'dioxide', 1, 1.000000);
+INSERT INTO word3 VALUES (24, 'ethanoic', 1, 1.000000);
+INSERT INTO word3 VALUES (25, 'ethanol', 1, 1.000000);
+INSERT INTO word3 VALUES (26, 'ethyl', 1, 1.000000);
+INSERT INTO word3 VALUES (27, 'etoh', 1, 1.000000);
+INSERT INTO word3 VALUES (28, 'glc', 1, 1.000000);
+INSERT INTO word3 VALUES (29, 'glcp', 1, 1.000000);
+INSERT INTO word3 VALUES (30, 'glucopyranose', 1, 1.000000);
+INSERT INTO word3 VALUES (31, 'glucose', 2, 0.768622);
+INSERT INTO word3 VALUES (32, 'guaranine', 1, 1.000000);
+INSERT INTO word3 VALUES (33, 'h2o', 1, 1.000000);
+INSERT INTO word3 VALUES (34, 'heavy', 1, 1.000000);
+INSERT INTO word3 VALUES (35, 'hydron', 1, 1.000000);
+INSERT INTO word3 VALUES (36, 'hydronium', 1, 1.000000);
+INSERT INTO word3 VALUES (37, 'ion', 2, 0.768622);
+INSERT INTO word3 VALUES (38, 'methanol', 1, 1.000000);
+INSERT INTO word3 VALUES (39, 'methyl', 1, 1.000000);
+INSERT INTO word3 VALUES (40, 'nacl', 1, 1.000000);
+INSERT INTO word3 VALUES (41, 'oxidane', 1, 1.000000);
+INSERT INTO word3 VALUES (42, 'oxide', 1, 1.000000);
+INSERT INTO word3 VALUES (43, 'oxonium', 1, 1.000000);
+INSERT INTO word3 VALUES (44, 'salt', 1, 1.000000);
+INSERT INTO word3 VALUES (45, 'sodium', 3, 0.633274);
+INSERT INTO word3 VALUES (46, 'table', 1, 1.000000);
+INSERT INTO word3 VALUES (47, 'trimethylxanthine', 1, 1.000000);
+INSERT INTO word3 VALUES (48, 'water', 2, 0.768622);
+INSERT INTO descriptor3 (id, term_id, descriptor_type, descriptor_ext_id) VALUES (1, 15377, 'name', 1);
+INSERT INTO descriptor3 (id, term_id, descriptor_type, descriptor_ext_id) VALUES (2, 16236, 'name', 2);
+INSERT INTO descriptor3 (id, term_id, descriptor_type, descriptor_ext_id) VALUES (3, 17234, 'name', 3);
+INSERT INTO descriptor3 (id, term_id, descriptor_type, descriptor_ext_id) VALUES (4, 4167, 'name', 4);
+INSERT INTO descriptor3 (id, term_id, descriptor_type, descriptor_ext_id) VALUES (5, 17925, 'name', 5);
+INSERT INTO descriptor3 (id, term_id, descriptor_type, descriptor_ext_id) VALUES (6, 15378, 'name', 6);
+INSERT INTO descriptor3 (id, term_id, descriptor_type, descriptor_ext_id) VALUES (7, 29101, 'name', 7);
+INSERT INTO descriptor3 (id, term_id, descriptor_type, descriptor_ext_id) VALUES (8, 17996, 'name', 8);
+INSERT INTO descriptor3 (id, term_id, descriptor_type, descriptor_ext_id) VALUES (9, 15366, 'name', 9);
+INSERT INTO descriptor3 (id, term_id, descriptor_type, descriptor_ext_id) VALUES (10, 30089, 'name', 10);
+INSERT INTO descriptor3 (id, term_id, descriptor_type, descriptor_ext_id) VALUES (11, 27732, 'name', 11);
+INSERT INTO descriptor3 (id, term_id, descriptor_type, descriptor_ext_id) VALUES (12, 41981, 'name', 12);
+INSERT INTO descriptor3 (id, term_id, descriptor_type, descriptor_ext_id) VALUES (13, 26710, 'name', 13);
+INSERT INTO descriptor3 (id, term_id, descriptor_type, descriptor_ext_id) VALUES (14, 26708, 'name', 14);
+INSERT INTO descriptor3 (id, term_id, descriptor_type, descriptor_ext_id) VALUES (15, 29412, 'name', 15);
+INSERT INTO descriptor3 (id, term_id, descriptor_type, descriptor_ext_id) VALUES (16, 16134, 'name', 16);
+INSERT INTO descriptor3 (id, term_id, descriptor_type, descriptor_ext_id) VALUES (17, 28938, 'name', 17);
+INSERT INTO descriptor3 (id, term_id, descriptor_type, descriptor_ext_id) VALUES (18, 17790, 'name', 18);
+INSERT INTO descriptor3 (id, term_id, descriptor_type, descriptor_ext_id) VALUES (19, 16526, 'name', 19);
+INSERT INTO descriptor3 (id, term_id, descriptor_type, descriptor_ext_id) VALUES (20, 29237, 'name', 20);
+INSERT INTO descriptor3 (id, term_id, descriptor_type, descriptor_ext_id) VALUES (21, 15377, 'synonym', 21);
+INSERT INTO descriptor3 (id, term_id, descriptor_type, descriptor_ext_id) VALUES (22, 15377, 'synonym', 22);
+INSERT INTO descriptor3 (id, term_id, descriptor_type, descriptor_ext_id) VALUES (23, 16236, 'synonym', 23);
+INSERT INTO descriptor3 (id, term_id, descriptor_type, descriptor_ext_id) VALUES (24, 16236, 'synonym', 24);
+INSERT INTO descriptor3 (id, term_id, descriptor_type, descriptor_ext_id) VALUES (25, 16236, 'synonym', 25);
+INSERT INTO descriptor3 (id, term_id, descriptor_type, descriptor_ext_id) VALUES (26, 17234, 'synonym', 26);
+INSERT INTO descriptor3 (id, term_id, descriptor_type, descriptor_ext_id) VALUES (27, 17234, 'synonym', 27);
+INSERT INTO descriptor3 (id, term_id, descriptor_type, descriptor_ext_id) VALUES (28, 4167, 'synonym', 28);
+INSERT INTO descriptor3 (id, term_id, descriptor_type, descriptor_ext_id) VALUES (29, 17925, 'synonym', 29);
+INSERT INTO descriptor3 (id, term_id, descriptor_type, descriptor_ext_id) VALUES (30, 15366, 'synonym', 30);
+INSERT INTO descriptor3 (id, term_id, descriptor_type, descriptor_ext_id) VALUES (31, 15366, 'synonym', 31);
+INSERT INTO descriptor3 (id, term_id, descriptor_type, descriptor_ext_id) VALUES (32, 27732, 'synonym', 32);
+INSERT INTO descriptor3 (id, term_id, descriptor_type, descriptor_ext_id) VALUES (33, 27732, 'synonym', 33);
+INSERT INTO descriptor3 (id, term_id, descriptor_type, descriptor_ext_id) VALUES (34, 41981, 'synonym', 34);
+INSERT INTO descriptor3 (id, term_id, descriptor_type, descriptor_ext_id) VALUES (35, 26710, 'synonym', 35);
+INSERT INTO descriptor3 (id, term_id, descriptor_type, descriptor_ext_id) VALUES (36, 26710, 'synonym', 36);
+INSERT INTO descriptor3 (id, term_id, descriptor_type, descriptor_ext_id) VALUES (37, 29101, 'synonym', 37);
+INSERT INTO descriptor3 (id, term_id, descriptor_type, descriptor_ext_id) VALUES (38, 17996, 'synonym', 38);
+INSERT INTO descriptor3 (id, term_id, descriptor_type, descriptor_ext_id) VALUES (39, 29412, 'synonym', 39);
+INSERT INTO descriptor3 (id, term_id, descriptor_type, descriptor_ext_id) VALUES (40, 17790, 'synonym', 40);
+INSERT INTO descriptor3 (id, term_id, descriptor_type, descriptor_ext_id) VALUES (41, 16526, 'synonym', 41);
+INSERT INTO descriptor3 (id, term_id, descriptor_type, descriptor_ext_id) VALUES (42, 29237, 'synonym', 42);
+INSERT INTO word2term3 VALUES (1, 48, 15377, 1);
+INSERT INTO word2term3 VALUES (2, 25, 16236, 2);
+INSERT INTO word2term3 VALUES (3, 31, 17234, 3);
+INSERT INTO word2term3 VALUES (4, 19, 4167, 4);
+INSERT INTO word2term3 VALUES (5, 30, 4167, 4);
+INSERT INTO word2term3 VALUES (6, 10, 17925, 5);
+INSERT INTO word2term3 VALUES (7, 19, 17925, 5);
+INSERT INTO word2term3 VALUES (8, 31, 17925, 5);
+INSERT INTO word2term3 VALUES (9, 35, 15378, 6);
+INSERT INTO word2term3 VALUES (10, 45, 29101, 7);
+INSERT INTO word2term3 VALUES (11, 2, 29101, 7);
+INSERT INTO word2term3 VALUES (12, 18, 17996, 8);
+INSERT INTO word2term3 VALUES (13, 6, 15366, 9);
+INSERT INTO word2term3 VALUES (14, 7, 15366, 9);
+INSERT INTO word2term3 VALUES (15, 5, 30089, 10);
+INSERT INTO word2term3 VALUES (16, 15, 27732, 11);
+INSERT INTO word2term3 VALUES (17, 22, 41981, 12);
+INSERT INTO word2term3 VALUES (18, 42, 41981, 12);
+INSERT INTO word2term3 VALUES (19, 45, 26710, 13);
+INSERT INTO word2term3 VALUES (20, 18, 26710, 13);
+INSERT INTO word2term3 VALUES (21, 45, 26708, 14);
+INSERT INTO word2term3 VALUES (22, 14, 26708, 14);
+INSERT INTO word2term3 VALUES (23, 43, 29412, 15);
+INSERT INTO word2term3 VALUES (24, 11, 16134, 16);
+INSERT INTO word2term3 VALUES (25, 12, 28938, 17);
+INSERT INTO word2term3 VALUES (26, 38, 17790, 18);
+INSERT INTO word2term3 VALUES (27, 16, 16526, 19);
+INSERT INTO word2term3 VALUES (28, 23, 16526, 19);
+INSERT INTO word2term3 VALUES (29, 20, 29237, 20);
+INSERT INTO word2term3 VALUES (30, 14, 29237, 20);
+INSERT INTO word2term3 VALUES (31, 33, 15377, 21);
+INSERT INTO word2term3 VALUES (32, 41, 15377, 22);
+INSERT INTO word2term3 VALUES (33, 26, 16236, 23);
+INSERT INTO word2term3 VALUES (34, 9, 16236, 23);
+INSERT INTO word2term3 VALUES (35, 27, 16236, 24);
+INSERT INTO word2term3 VALUES (36, 9, 16236, 25);
+INSERT INTO word2term3 VALUES (37, 28, 17234, 26);
+INSERT INTO word2term3 VALUES (38, 21, 17234, 27);
+INSERT INTO word2term3 VALUES (39, 21, 4167, 28);
+INSERT INTO word2term3 VALUES (40, 10, 17925, 29);
+INSERT INTO word2term3 VALUES (41, 19, 17925, 29);
+INSERT INTO word2term3 VALUES (42, 29, 17925, 29);
+INSERT INTO word2term3 VALUES (43, 24, 15366, 30);
+INSERT INTO word2term3 VALUES (44, 7, 15366, 30);
+INSERT INTO word2term3 VALUES (45, 8, 15366, 31);
+INSERT INTO word2term3 VALUES (46, 1, 27732, 32);
+INSERT INTO word2term3 VALUES (47, 3, 27732, 32);
+INSERT INTO word2term3 VALUES (48, 4, 27732, 32);
+INSERT INTO word2term3 VALUES (49, 47, 27732, 32);
+INSERT INTO word2term3 VALUES (50, 32, 27732, 33);
+INSERT INTO word2term3 VALUES (51, 34, 41981, 34);
+INSERT INTO word2term3 VALUES (52, 48, 41981, 34);
+INSERT INTO word2term3 VALUES (53, 46, 26710, 35);
+INSERT INTO word2term3 VALUES (54, 44, 26710, 35);
+INSERT INTO word2term3 VALUES (55, 40, 26710, 36);
+INSERT INTO word2term3 VALUES (56, 45, 29101, 37);
+INSERT INTO word2term3 VALUES (57, 37, 29101, 37);
+INSERT INTO word2term3 VALUES (58, 18, 17996, 38);
+INSERT INTO word2term3 VALUES (59, 37, 17996, 38);
+INSERT INTO word2term3 VALUES (60, 36, 29412, 39);
+INSERT INTO word2term3 VALUES (61, 39, 17790, 40);
+INSERT INTO word2term3 VALUES (62, 9, 17790, 40);
+INSERT INTO word2term3 VALUES (63, 17, 16526, 41);
+INSERT INTO word2term3 VALUES (64, 13, 16526, 41);
+INSERT INTO word2term3 VALUES (65, 20, 29237, 42);
+INSERT INTO SSM_TermDesc VALUES (15377, 1, 0.0100, 0.9750, 0.9750);
+INSERT INTO SSM_TermDesc VALUES (16236, 2, 0.0200, 0.9500, 0.9500);
+INSERT INTO SSM_TermDesc VALUES (17234, 3, 0.0300, 0.9250, 0.9250);
+INSERT INTO SSM_TermDesc VALUES (4167, 1, 0.0400, 0.9000, 0.9000);
+INSERT INTO SSM_TermDesc VALUES (17925, 2, 0.0500, 0.8750, 0.8750);
+INSERT INTO SSM_TermDesc VALUES (15378, 3, 0.0600, 0.8500, 0.8500);
+INSERT INTO SSM_TermDesc VALUES (29101, 1, 0.0700, 0.8250, 0.8250);
+INSERT INTO SSM_TermDesc VALUES (17996, 2, 0.0800, 0.8000, 0.8000);
+INSERT INTO SSM_TermDesc VALUES (15366, 3, 0.0900, 0.7750, 0.7750);
+INSERT INTO SSM_TermDesc VALUES (30089, 1, 0.1000, 0.7500, 0.7500);
+INSERT INTO SSM_TermDesc VALUES (41981, 3, 0.1200, 0.7000, 0.7000);
+INSERT INTO SSM_TermDesc VALUES (26710, 1, 0.1300, 0.6750, 0.6750);
+INSERT INTO SSM_TermDesc VALUES (26708, 2, 0.1400, 0.6500, 0.6500);
+INSERT INTO SSM_TermDesc VALUES (29412, 3, 0.1500, 0.6250, 0.6250);
+INSERT INTO SSM_TermDesc VALUES (16134, 1, 0.1600, 0.6000, 0.6000);
+INSERT INTO SSM_TermDesc VALUES (28938, 2, 0.1700, 0.5750, 0.5750);
+INSERT INTO SSM_TermDesc VALUES (17790, 3, 0.1800, 0.5500, 0.5500);
+INSERT INTO SSM_TermDesc VALUES (16526, 1, 0.1900, 0.5250, 0.5250);
+INSERT INTO SSM_TermDesc VALUES (29237, 2, 0.2000, 0.5000, 0.5000);
+-- EC of the descriptors, as computed by xldb.flor.ontology_vocabulary.ProcessTerms
+UPDATE descriptor3 SET ec = (SELECT sum(ic) FROM word3 b, word2term3 c WHERE c.word_id = b.id AND c.descriptor_id = descriptor3.id);
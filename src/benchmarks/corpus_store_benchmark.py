@@ -0,0 +1,121 @@
+#!/usr/bin/env python
+"""
+Compare the memory used to read every document of a corpus saved as a document store, keeping every document that was
+read in memory, as the store did before, and keeping only the most recently used ones. Also checks that saving the
+store after reading its documents does not write them again.
+Each version is measured on a new process, as the increase of its RSS after reading all the documents, like the
+load_data step of test and test_relations. Uses random documents with the attributes set by
+Sentence.process_corenlp_output. Requires /proc (Linux).
+Run from the src directory: python -m benchmarks.corpus_store_benchmark
+"""
+from __future__ import division, absolute_import
+
+import argparse
+import multiprocessing
+import os
+import random
+import shutil
+import string
+import tempfile
+import time
+
+from benchmarks.token_memory_benchmark import get_rss
+from text.corpus_store import DocumentStore
+from text.document import Document
+from text.sentence import Sentence
+from text.token2 import Token2
+
+
+def generate_document(did, nsentences, ntokens):
+    sentences = []
+    offset = 0
+    for s in range(nsentences):
+        sid = "{}.s{}".format(did, s)
+        words = ["".join(random.choice(string.ascii_lowercase) for _ in range(random.randint(1, 12)))
+                 for _ in range(ntokens)]
+        sentence = Sentence(" ".join(words), offset=offset, sid=sid, did=did)
+        start = 0
+        for i, word in enumerate(words):
+            token = Token2(word, sid=sid, order=i, tid=sid + ".t" + str(i))
+            token.start = start
+            token.end = start + len(word)
+            token.dstart = offset + token.start
+            token.dend = offset + token.end
+            token.pos = random.choice(["NN", "NNS", "JJ", "VB", "IN", "DT"])
+            token.tag = "O"
+            token.lemma = word
+            sentence.tokens.append(token)
+            start = token.end + 1
+        sentences.append(sentence)
+        offset += len(sentence.text) + 1
+    return Document(" ".join(s.text for s in sentences), did=did, sentences=sentences)
+
+
+def create_store(path, ndocuments, nsentences, ntokens, cache_size):
+    random.seed(0)
+    # documents that do not fit in memory are written to the spill file of the store
+    store = DocumentStore(cache_size=cache_size)
+    for d in range(ndocuments):
+        did = "d{}".format(d)
+        store[did] = generate_document(did, nsentences, ntokens)
+    store.save(path)
+    store.close()
+
+
+def measure(path, cache_size, queue):
+    before = get_rss()
+    t = time.time()
+    store = DocumentStore(path, cache_size=cache_size)
+    ntokens = 0
+    for did in store:
+        for sentence in store[did].sentences:
+            ntokens += len(sentence.tokens)
+    read_time = time.time() - t
+    rss = get_rss() - before
+    t = time.time()
+    nchanged = len(store.changed())
+    store.save(path)
+    queue.put((rss, read_time, time.time() - t, nchanged))
+
+
+def run(path, cache_size):
+    """
+    :return: increase of the RSS in bytes, time to read and to save the documents, number of documents written
+    """
+    queue = multiprocessing.Queue()
+    p = multiprocessing.Process(target=measure, args=(path, cache_size, queue))
+    p.start()
+    result = queue.get()
+    p.join()
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark of the memory used to read a document store')
+    parser.add_argument("--documents", type=int, nargs="+", default=[1000, 5000], help="Number of documents")
+    parser.add_argument("--sentences", type=int, default=10, help="Sentences per document")
+    parser.add_argument("--tokens", type=int, default=25, help="Tokens per sentence")
+    parser.add_argument("--cache", type=int, default=1000, help="Documents kept in memory")
+    options = parser.parse_args()
+
+    tempdir = tempfile.mkdtemp(prefix="corpus_store_benchmark")
+    try:
+        print "{:>9} {:>12} {:>10} {:>10} {:>10} {:>8}".format("documents", "cache", "RSS(MB)", "read(s)", "save(s)",
+                                                               "written")
+        for n in options.documents:
+            path = os.path.join(tempdir, "corpus{}.db".format(n))
+            # created on another process, so that the processes that read the store do not start with its documents
+            p = multiprocessing.Process(target=create_store, args=(path, n, options.sentences, options.tokens,
+                                                                  options.cache))
+            p.start()
+            p.join()
+            for cache_size in (None, options.cache):
+                rss, read_time, save_time, nchanged = run(path, cache_size)
+                print "{:>9} {:>12} {:>10.1f} {:>10.2f} {:>10.2f} {:>8}".format(
+                    n, "all" if cache_size is None else cache_size, rss / 1024 / 1024, read_time, save_time, nchanged)
+    finally:
+        shutil.rmtree(tempdir)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,86 @@
+#!/usr/bin/env python
+"""
+Compare the time to generate the features of SimpleTaggerModel one token at a time, with generate_features, and one
+sentence at a time, with generate_sentence_features. tests/test_features.py checks that both generate the same
+features and labels.
+Uses random sentences with words similar to chemical and miRNA names, and tokens without text.
+Run from the src directory: python -m benchmarks.features_benchmark
+"""
+from __future__ import division, absolute_import
+
+import argparse
+import random
+import time
+
+from classification.ner.simpletagger import SimpleTaggerModel, feature_extractors, mirna_features
+from text.token2 import Token2
+
+words = ["the", "of", "and", "inhibited", "expression", "cells", "Aspirin", "NaCl", "H2O", "IL-2", "p53", "miR-21",
+         "mir-155-5p", "hsa-let-7a", "(", ")", ",", ".", "-", "2,4-dinitrophenol", "TNF-alpha", "\xce\xb1-tocopherol",
+         "BOS", "EOS", "EOSIN", "CYP3A4", "McGill", "x"]
+postags = ["NN", "NNS", "JJ", "VB", "IN", "DT", "CD", ":", "-LRB-"]
+tags = ["start", "middle", "end", "single"]
+
+
+class SyntheticSentence(object):
+    def __init__(self, sid, tokens):
+        self.sid = sid
+        self.tokens = tokens
+
+
+def generate_sentences(nsentences, seed=0):
+    random.seed(seed)
+    sentences = []
+    for s in range(nsentences):
+        sid = "doc.s{}".format(s)
+        tokens = []
+        for i in range(random.randint(1, 50)):
+            text = random.choice(words).decode("utf-8")
+            if random.random() < 0.01:
+                text = ""
+            token = Token2(text, sid=sid, order=i, tid=sid + ".t" + str(i))
+            token.pos = random.choice(postags)
+            token.lemma = text.lower()
+            if random.random() < 0.1:
+                token.tags["goldstandard"] = random.choice(tags)
+                token.tags["goldstandard_mirna"] = token.tags["goldstandard"]
+            tokens.append(token)
+        sentences.append(SyntheticSentence(sid, tokens))
+    return sentences
+
+
+def run_tokens(model, sentences, flist, subtype):
+    t = time.time()
+    features = [[model.generate_features(s, i, flist, subtype) if s.tokens[i].text else None
+                 for i in range(len(s.tokens))] for s in sentences]
+    return time.time() - t, features
+
+
+def run_sentences(model, sentences, flist, subtype):
+    t = time.time()
+    features = [model.generate_sentence_features(s, flist, subtype) for s in sentences]
+    return time.time() - t, features
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark of the feature extraction of SimpleTaggerModel')
+    parser.add_argument("--sentences", type=int, nargs="+", default=[1000, 10000], help="Number of sentences")
+    options = parser.parse_args()
+
+    model = SimpleTaggerModel("benchmark", "all")
+    flists = [("all", feature_extractors.keys()), ("mirna", mirna_features.keys())]
+    print "{:>9} {:>8} {:>8} {:>10} {:>11} {:>8}".format("sentences", "tokens", "subtype", "token(s)", "sentence(s)",
+                                                        "speedup")
+    for n in options.sentences:
+        sentences = generate_sentences(n)
+        ntokens = sum(len(s.tokens) for s in sentences)
+        for subtype, flist in flists:
+            tokens_time = run_tokens(model, sentences, flist, subtype)[0]
+            sentences_time = run_sentences(model, sentences, flist, subtype)[0]
+            print "{:>9} {:>8} {:>8} {:>10.3f} {:>11.3f} {:>7.1f}x".format(n, ntokens, subtype, tokens_time,
+                                                                         sentences_time,
+                                                                         tokens_time / max(sentences_time, 1e-6))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,109 @@
+#!/usr/bin/env python
+"""
+Compare the time to find a list of names in sentences with NameIndex, used by MatcherModel, and with the regex per
+name that MatcherModel used before. tests/test_nameindex.py checks that both find the same matches, except for the
+differences listed on NameIndex.
+Uses random names similar to chemical names, and sentences with some of those names between common words.
+Run from the src directory: python -m benchmarks.matcher_benchmark
+"""
+from __future__ import division, absolute_import
+
+import argparse
+import random
+import re
+import time
+
+from classification.ner.nameindex import NameIndex
+
+syllables = ["meth", "eth", "prop", "but", "yl", "ol", "ene", "amine", "oxy", "chlor", "fluor", "benz", "phen", "acid",
+             "ic", "ate", "ine", "-2-", "1,3-", "di", "tri", " ", "N-", "Ca", "(", ")"]
+words = ["the", "of", "and", "inhibited", "expression", "cells", "in", "with", "was", "by", "treated", "levels", "a"]
+
+
+def generate_names(nnames, seed=0):
+    random.seed(seed)
+    names = set()
+    while len(names) < nnames:
+        name = "".join(random.choice(syllables) for i in range(random.randint(2, 6))).strip()
+        if name:
+            names.add(name)
+    return list(names)
+
+
+def generate_sentences(names, nsentences, seed=0):
+    random.seed(seed)
+    sentences = []
+    for s in range(nsentences):
+        tokens = []
+        for i in range(random.randint(5, 40)):
+            if random.random() < 0.1:
+                name = random.choice(names)
+                if random.random() < 0.3:
+                    name = name.upper()
+                tokens.append(name)
+            else:
+                tokens.append(random.choice(words))
+            if random.random() < 0.05:
+                tokens[-1] += random.choice([".", ","])
+        sentences.append(" ".join(tokens).decode("utf-8"))
+    return sentences
+
+
+def run_index(names, sentences):
+    t = time.time()
+    index = NameIndex(names)
+    build_time = time.time() - t
+    t = time.time()
+    matches = [index.find(s) for s in sentences]
+    return build_time, time.time() - t, matches
+
+
+def run_regex(names, sentences):
+    """
+    Find the names with the patterns of the previous version of MatcherModel
+    :return: build time, search time and the (start, end) of the matches of each sentence, by name and then by start
+    """
+    t = time.time()
+    patterns = [re.compile(r"(\A|\s)(" + re.escape(n) + r")(\s|\Z|\.|,)", re.I) for n in names]
+    build_time = time.time() - t
+    t = time.time()
+    matches = []
+    for s in sentences:
+        smatches = []
+        for p in patterns:
+            smatches += [m.span(2) for m in p.finditer(s)]
+        matches.append(smatches)
+    return build_time, time.time() - t, matches
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark of the name matching of MatcherModel')
+    parser.add_argument("--names", type=int, nargs="+", default=[10000, 100000, 1000000], help="Number of names")
+    parser.add_argument("--sentences", type=int, default=10000, help="Number of sentences searched with NameIndex")
+    parser.add_argument("--regex-sentences", type=int, default=20, dest="regex_sentences",
+                        help="Number of sentences searched with the regexes")
+    parser.add_argument("--regex-names", type=int, default=100000, dest="regex_names",
+                        help="Maximum number of names to compare with the regexes, which take minutes to compile")
+    options = parser.parse_args()
+
+    print "{:>8} {:>10} {:>11} {:>13} {:>11} {:>13} {:>10}".format("names", "sentences", "index build",
+                                                                "index ms/sent", "regex build", "regex ms/sent",
+                                                                "speedup")
+    for n in options.names:
+        names = generate_names(n)
+        sentences = generate_sentences(names, options.sentences)
+        index_build, index_time, index_matches = run_index(names, sentences)
+        index_ms = 1000 * index_time / len(sentences)
+        if n > options.regex_names:
+            print "{:>8} {:>10} {:>10.2f}s {:>13.3f} {:>11} {:>13} {:>10}".format(n, len(sentences), index_build,
+                                                                              index_ms, "-", "-", "-")
+            continue
+        regex_sentences = sentences[:options.regex_sentences]
+        regex_build, regex_time, regex_matches = run_regex(names, regex_sentences)
+        regex_ms = 1000 * regex_time / len(regex_sentences)
+        print "{:>8} {:>10} {:>10.2f}s {:>13.3f} {:>10.2f}s {:>13.1f} {:>9.0f}x".format(
+            n, len(sentences), index_build, index_ms, regex_build, regex_ms, regex_ms / max(index_ms, 1e-6))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,102 @@
+#!/usr/bin/env python
+"""
+Compare the time to find the best miRBase label for miRNA mentions with LabelIndex, used by MirbaseDB.map_label, and
+with process.extractOne over every label, and count the mentions where the results are different.
+Uses labels similar to the human precursor and mature miRNAs of miRBase, and mentions written in the styles found in
+the miRNA corpora, with some random typos.
+Run from the src directory: python -m benchmarks.mirbase_benchmark
+"""
+from __future__ import division, absolute_import
+
+import argparse
+import random
+import time
+
+from fuzzywuzzy import process
+
+from mirna_base import LabelIndex
+
+
+def generate_labels(nmirnas, seed=0):
+    random.seed(seed)
+    labels = []
+    for i in range(1, nmirnas + 1):
+        number = str(i)
+        if random.random() < 0.05:
+            number = "let-7" + "abcdefgik"[i % 9]
+            prefix = "hsa-"
+        else:
+            prefix = "hsa-mir-"
+            if random.random() < 0.3:
+                number += random.choice("abcde")
+        copies = [""]
+        if random.random() < 0.2:
+            copies = ["-1", "-2"]
+        for copy in copies:
+            labels.append(prefix + number + copy)
+        mature = prefix.replace("mir", "miR") + number
+        if random.random() < 0.5:
+            labels += [mature + "-5p", mature + "-3p"]
+        else:
+            labels.append(mature)
+            if random.random() < 0.3:
+                labels.append(mature + "*")
+    return list(set(labels))
+
+
+def generate_mentions(labels, nmentions, seed=0):
+    random.seed(seed)
+    mentions = []
+    for i in range(nmentions):
+        label = random.choice(labels)
+        name = label[4:]
+        style = random.random()
+        if style < 0.2:
+            mention = name
+        elif style < 0.3:
+            mention = "microRNA-" + name.split("-", 1)[-1]
+        elif style < 0.4:
+            mention = name.replace("-", "", 1)
+        elif style < 0.5:
+            mention = label
+        elif style < 0.6:
+            mention = name.upper()
+        else:
+            mention = name.replace("-5p", "").replace("-3p", "")
+        if random.random() < 0.2:
+            pos = random.randint(0, len(mention) - 1)
+            mention = mention[:pos] + random.choice("abcdefgr0123456789-") + mention[pos + 1:]
+        mentions.append(mention)
+    return mentions
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark of the miRBase label index')
+    parser.add_argument("--mirnas", type=int, default=1900, help="Number of miRNAs, each with one or more labels")
+    parser.add_argument("--mentions", type=int, default=500, help="Number of mentions")
+    options = parser.parse_args()
+
+    labels = generate_labels(options.mirnas)
+    mentions = generate_mentions(labels, options.mentions)
+    t = time.time()
+    index = LabelIndex(labels)
+    build_time = time.time() - t
+    t = time.time()
+    index_results = [index.extract_one(m) for m in mentions]
+    index_time = time.time() - t
+    t = time.time()
+    scan_results = [process.extractOne(m, labels) for m in mentions]
+    scan_time = time.time() - t
+    different = [(m, r1, r2) for m, r1, r2 in zip(mentions, index_results, scan_results) if r1 != r2]
+    for m, r1, r2 in different[:10]:
+        print "different result for {}: index {}, extractOne {}".format(m, r1, r2)
+    exact = sum(1 for r in scan_results if r[1] == 100)
+    print "{} labels, {} mentions ({} with score 100)".format(len(labels), len(mentions), exact)
+    print "index: {:.2f}s to build, {:.2f}ms per mention".format(build_time, 1000 * index_time / len(mentions))
+    print "extractOne: {:.2f}ms per mention ({:.0f}x)".format(1000 * scan_time / len(mentions),
+                                                               scan_time / max(index_time, 1e-6))
+    print "different results: {} ({:.2%})".format(len(different), len(different) / len(mentions))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,99 @@
+#!/usr/bin/env python
+"""
+Compare the time to add offsets with Offsets and with the previous version, which compared each new offset with every
+offset of the set. Uses random entities similar to the output of several chemical NER models on one long document:
+dense, mostly short and often repeated by more than one model. tests/test_offsets.py checks that both keep the same
+offsets.
+Run from the src directory: python -m benchmarks.offsets_benchmark
+"""
+from __future__ import division, absolute_import
+
+import argparse
+import random
+import time
+
+from text.offset import Offset, Offsets, perfect_overlap, contains, contained_by, partial_overlap_after, \
+    partial_overlap_before
+
+# exclusion rules of Entities.get_unique_entities and MatcherModel.tag_sentence
+rules = [("perfect overlap", [perfect_overlap], []),
+         ("longest match", (partial_overlap_after, partial_overlap_before, contained_by, perfect_overlap), (contains,))]
+
+
+class LinearOffsets(object):
+    """Previous version of Offsets"""
+    def __init__(self):
+        self.offsets = set()
+
+    def add_offset(self, o, exclude_this_if, exclude_others_if):
+        overlapping = []
+        to_exclude = []
+        v = 0
+        toadd = True
+        for oo in self.offsets:
+            over = o.overlap(oo)
+            if over in exclude_this_if:
+                toadd = False
+                v = over
+                overlapping.append(oo)
+                break
+            elif over in exclude_others_if:
+                toadd = True
+                v = over
+                to_exclude.append(oo)
+        if toadd:
+            self.offsets.add(o)
+            for oo in to_exclude:
+                self.offsets.remove(oo)
+        return toadd, v, overlapping, to_exclude
+
+
+def generate_entities(nentities, nmodels, text_length, seed=0):
+    """
+    :return: list of (start, end) with the entities of every model
+    """
+    random.seed(seed)
+    entities = []
+    for i in range(nentities):
+        start = random.randint(0, text_length)
+        end = start + random.randint(3, 40)
+        # each entity is found by some of the models, with slightly different limits
+        for m in range(random.randint(1, nmodels)):
+            if random.random() < 0.7:
+                entities.append((start, end))
+            else:
+                entities.append((start + random.randint(-2, 1), end + random.randint(-1, 2)))
+    random.shuffle(entities)
+    return entities
+
+
+def run(offsets_class, entities, exclude_this_if, exclude_others_if):
+    offsets = offsets_class()
+    t = time.time()
+    for start, end in entities:
+        offsets.add_offset(Offset(start, end), exclude_this_if, exclude_others_if)
+    return time.time() - t, sorted((o.start, o.end) for o in offsets.offsets)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark of Offsets.add_offset')
+    parser.add_argument("--entities", type=int, nargs="+", default=[500, 2000, 5000],
+                        help="Number of distinct entities")
+    parser.add_argument("--models", type=int, default=4, help="Maximum number of models that find each entity")
+    parser.add_argument("--density", type=float, default=0.05, help="Distinct entities per character")
+    options = parser.parse_args()
+
+    print "{:>8} {:>8} {:>16} {:>10} {:>10} {:>8}".format("entities", "offsets", "rule", "linear(s)", "sorted(s)",
+                                                            "speedup")
+    for n in options.entities:
+        entities = generate_entities(n, options.models, int(n / options.density))
+        for name, exclude_this_if, exclude_others_if in rules:
+            linear_time, linear_offsets = run(LinearOffsets, entities, exclude_this_if, exclude_others_if)
+            sorted_time, sorted_offsets = run(Offsets, entities, exclude_this_if, exclude_others_if)
+            print "{:>8} {:>8} {:>16} {:>10.3f} {:>10.3f} {:>7.1f}x".format(n, len(entities), name, linear_time,
+                                                                        sorted_time,
+                                                                        linear_time / max(sorted_time, 1e-6))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,112 @@
+#!/usr/bin/env python
+"""
+Compare the memory used by the tokens of a corpus with Token2 and with the previous version, which had a __dict__ per
+token and kept the feature sets generated by SimpleTaggerModel.load_data on each token.
+Each version is measured on a new process, as the increase of its RSS after creating the tokens, with and without the
+features of a model that is still in memory. Without the model, the previous version still has the features on the
+tokens. Uses random tokens with the attributes set by Sentence.process_corenlp_output. Requires /proc (Linux).
+Run from the src directory: python -m benchmarks.token_memory_benchmark
+"""
+from __future__ import division, absolute_import
+
+import argparse
+import multiprocessing
+import os
+import random
+import string
+
+from text.token2 import Token2
+
+# features used by the default NER models
+nfeatures = 21
+
+
+class DictToken(object):
+    """Previous version of Token2"""
+    def __init__(self, text, **kwargs):
+        self.text = text
+        self.sid = kwargs.get("sid")
+        self.order = kwargs.get("order")
+        self.features = {}
+        self.tags = {}
+        self.tid = kwargs.get("tid")
+
+
+def generate_tokens(token_class, ntokens, model, seed=0):
+    """
+    :param model: keep the features of each token as the data of a model
+    :return: list of sentences, each a list of tokens, and the data of the model
+    """
+    random.seed(seed)
+    sentences = []
+    data = []
+    for i in range(ntokens):
+        if i % 25 == 0:
+            sentences.append([])
+            data.append([])
+            offset = 0
+        sid = "doc{}.s{}".format(i // 250, len(sentences))
+        text = "".join(random.choice(string.ascii_lowercase) for _ in range(random.randint(1, 12)))
+        token = token_class(text, sid=sid, order=len(sentences[-1]), tid=sid + ".t" + str(len(sentences[-1])))
+        token.start = offset
+        token.end = offset + len(text)
+        token.dstart = token.start + i * 6
+        token.dend = token.end + i * 6
+        token.pos = random.choice(["NN", "NNS", "JJ", "VB", "IN", "DT"])
+        token.tag = "O"
+        token.lemma = text
+        if random.random() < 0.05:
+            token.tags["goldstandard"] = "single"
+        offset = token.end + 1
+        sentences[-1].append(token)
+        if token_class is DictToken or model:
+            features = set("f{}={}".format(f, text[:f % 5]) for f in range(nfeatures))
+            if token_class is DictToken:
+                token.features["f" + str(nfeatures)] = features
+            if model:
+                data[-1].append(features)
+    return sentences, data
+
+
+def get_rss():
+    """Current RSS of this process in bytes"""
+    with open("/proc/self/statm") as f:
+        return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+
+
+def measure(token_class, ntokens, model, queue):
+    before = get_rss()
+    sentences, data = generate_tokens(token_class, ntokens, model)
+    queue.put(get_rss() - before)
+
+
+def run(token_class, ntokens, model):
+    """
+    :return: increase of the RSS in bytes
+    """
+    queue = multiprocessing.Queue()
+    p = multiprocessing.Process(target=measure, args=(token_class, ntokens, model, queue))
+    p.start()
+    rss = queue.get()
+    p.join()
+    return rss
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark of the memory used by tokens')
+    parser.add_argument("--tokens", type=int, nargs="+", default=[100000, 500000],
+                        help="Number of tokens")
+    options = parser.parse_args()
+
+    print "{:>8} {:>10} {:>10} {:>10} {:>10}".format("tokens", "model", "dict(MB)", "slots(MB)", "reduction")
+    for n in options.tokens:
+        for model in (False, True):
+            dict_rss = run(DictToken, n, model)
+            slots_rss = run(Token2, n, model)
+            print "{:>8} {:>10} {:>10.1f} {:>10.1f} {:>9.1f}x".format(n, "yes" if model else "no",
+                                                                    dict_rss / 1024 / 1024, slots_rss / 1024 / 1024,
+                                                                    dict_rss / max(slots_rss, 1))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,51 @@
+#!/usr/bin/env python
+"""
+Create the UniProt index used by ProteinEntity.normalize from a dump and measure the time to build it and to search
+names. By default, uses the small flat file next to this script, whose expected entries are checked by
+tests/test_uniprot_index.py.
+Run from the src directory: python -m benchmarks.uniprot_benchmark
+"""
+from __future__ import division, absolute_import
+
+import argparse
+import os
+import random
+import tempfile
+import time
+
+from uniprot_base import UniprotIndex, parse_dump
+
+sample_dump = os.path.join(os.path.dirname(os.path.abspath(__file__)), "uniprot_sample.dat")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark of the UniProt index')
+    parser.add_argument("--dump", default=sample_dump, help="UniProtKB dump (.dat, .xml, optionally .gz)")
+    parser.add_argument("--organism", default="9606", help="NCBI taxonomy ID of the entries to index")
+    parser.add_argument("--searches", type=int, default=10000, help="Number of names searched")
+    options = parser.parse_args()
+
+    path = tempfile.mktemp(suffix=".db")
+    try:
+        index = UniprotIndex(path)
+        t = time.time()
+        nentries = index.create(options.dump, options.organism)
+        build_time = time.time() - t
+        names = []
+        for entry in parse_dump(options.dump):
+            names += entry["gene_names"] + entry["protein_names"]
+        random.seed(0)
+        names = [random.choice(names) for i in range(options.searches)]
+        t = time.time()
+        found = sum(1 for name in names if index.search(name) is not None)
+        search_time = time.time() - t
+        print "{} entries indexed in {:.2f}s".format(nentries, build_time)
+        print "{} searches ({} found): {:.3f}ms per search".format(len(names), found,
+                                                                   1000 * search_time / len(names))
+    finally:
+        if os.path.exists(path):
+            os.remove(path)
+
+
+if __name__ == "__main__":
+    main()
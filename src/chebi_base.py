@@ -0,0 +1,118 @@
+from __future__ import division, absolute_import
+
+import logging
+import unicodedata
+from array import array
+
+
+def name_key(name):
+    """
+    key of a name or word as compared by the case insensitive collation of the ChEBI database: case, accents and
+    trailing spaces are ignored
+    """
+    if isinstance(name, str):
+        name = name.decode("utf-8", "replace")
+    name = unicodedata.normalize("NFKD", name)
+    return "".join(c for c in name if not unicodedata.combining(c)).lower().rstrip(" ")
+
+
+class ChebiIndex(object):
+    """
+    Names, synonyms and words of the ChEBI ontology loaded once from the tables of the florchebi database (term,
+    term_synonym, word3, descriptor3, word2term3 and SSM_TermDesc), to resolve terms without querying the database.
+    Names and synonyms of 3 star terms are matched as they are and then with name_key, and partial matches use an
+    inverted index of the words of each descriptor, scored as the partial match query of florchebi:
+    sum of the IC of the words of the descriptor found in the text / EC of the descriptor - 0.1.
+    When several terms match, the term, synonym or descriptor with the lowest ID is used.
+    """
+    def __init__(self):
+        # name -> (term id, name)
+        self.names = {}
+        self.name_keys = {}
+        # synonym -> (term id, name of the term)
+        self.synonyms = {}
+        self.synonym_keys = {}
+        # key of a word -> list of word ids
+        self.words = {}
+        self.word_ic = {}
+        # word id -> array of the ids of the descriptors that contain the word
+        self.word_descriptors = {}
+        # descriptor id -> (name of the term, EC of the descriptor)
+        self.descriptors = {}
+        self.loaded = False
+
+    def load(self, conn):
+        """
+        Load the index from a connection to the florchebi database, MySQL or a sqlite copy of its tables
+        """
+        cur = conn.cursor()
+        cur.execute("""SELECT id, name FROM term WHERE LENGTH(name)>0 and star=3 ORDER BY id""")
+        for term_id, name in cur.fetchall():
+            self.names.setdefault(name, (term_id, name))
+            self.name_keys.setdefault(name_key(name), (term_id, name))
+        cur.execute("""SELECT a.term_id, a.term_synonym, b.name
+                       FROM term_synonym a, term b
+                       WHERE b.id=a.term_id and LENGTH(a.term_synonym)>0 and b.star=3
+                       ORDER BY a.term_id""")
+        for term_id, synonym, name in cur.fetchall():
+            self.synonyms.setdefault(synonym, (term_id, name))
+            self.synonym_keys.setdefault(name_key(synonym), (term_id, name))
+        # only the descriptors of terms with IC are used by the partial match query
+        cur.execute("""SELECT c.id, e.name, c.ec
+                       FROM term e JOIN descriptor3 c ON (c.term_id=e.id) JOIN SSM_TermDesc f ON (e.id=f.term_id)""")
+        for descriptor_id, name, ec in cur.fetchall():
+            if ec:
+                self.descriptors[descriptor_id] = (name, ec)
+        cur.execute("""SELECT id, word, ic FROM word3""")
+        for word_id, word, ic in cur.fetchall():
+            self.words.setdefault(name_key(word or ""), []).append(word_id)
+            self.word_ic[word_id] = ic or 0.0
+        cur.execute("""SELECT word_id, descriptor_id FROM word2term3""")
+        for word_id, descriptor_id in cur:
+            if descriptor_id in self.descriptors:
+                self.word_descriptors.setdefault(word_id, array("l")).append(descriptor_id)
+        cur.close()
+        self.loaded = True
+        logging.info("loaded chebi index with {} names, {} synonyms and {} words".format(
+            len(self.names), len(self.synonyms), len(self.words)))
+
+    def find_name(self, term):
+        """
+        :return: (term id, name) of a 3 star term with this name, or None
+        """
+        match = self.names.get(term)
+        if match is None:
+            match = self.name_keys.get(name_key(term))
+        return match
+
+    def find_synonym(self, term):
+        """
+        :return: (term id, name of the term) of a 3 star term with this synonym, or None
+        """
+        match = self.synonyms.get(term)
+        if match is None:
+            match = self.synonym_keys.get(name_key(term))
+        return match
+
+    def find_partial(self, words):
+        """
+        Best descriptor that contains some of the words
+        :param words: words of the text
+        :return: (descriptor id, name of the term, score), or None if no descriptor contains the words
+        """
+        word_ids = set()
+        for word in words:
+            word_ids.update(self.words.get(name_key(word), ()))
+        ic_sums = {}
+        for word_id in word_ids:
+            ic = self.word_ic[word_id]
+            for descriptor_id in self.word_descriptors.get(word_id, ()):
+                ic_sums[descriptor_id] = ic_sums.get(descriptor_id, 0.0) + ic
+        if not ic_sums:
+            return None
+        best = None
+        for descriptor_id, ic_sum in ic_sums.iteritems():
+            score = ic_sum / self.descriptors[descriptor_id][1] - 0.1
+            if best is None or score > best[2] or (score == best[2] and descriptor_id < best[0]):
+                best = (descriptor_id, self.descriptors[descriptor_id][0], score)
+        return best
@@ -2,14 +2,13 @@ from __future__ import division, unicode_literals
 
 import os
 import sys
-from subprocess import Popen, PIPE, call
+from subprocess import Popen, PIPE, STDOUT, call
 import logging
 import codecs
-import ner
 import re
-import atexit
-from socket import error as SocketError
-import errno
+import shutil
+import tempfile
+import threading
 
 from text.protein_entity import ProteinEntity
 from text.offset import Offsets, Offset
@@ -17,6 +16,89 @@ from classification.results import ResultsNER
 from classification.ner.simpletagger import SimpleTaggerModel, create_entity
 from config import config
 
+line_breaks = re.compile(r"[\t\n\r\f\v]")
+
+
+class BannerTagger(object):
+    """
+    BANNER process that tags a stream of sentences with one JVM.
+    The sentences are written to the input of BANNER by a thread while the entities are read from its output, so
+    writing, tagging and processing the results overlap. The input and output files of BANNER are named pipes,
+    so nothing is written to disk, and the log of BANNER is read from its stdout.
+    """
+    def __init__(self, base_dir, config_file):
+        """
+        :param base_dir: BANNER directory, where the script is run
+        :param config_file: BANNER configuration, relative to base_dir
+        """
+        self.base_dir = base_dir
+        self.config_file = config_file
+        self.process = None
+        self.write_error = None
+
+    def tag(self, sentences):
+        """
+        Tag a sequence of sentences
+        :param sentences: iterable of (sid, text)
+        :return: iterator of the fields of each entity found: sid, type, start, end and text
+        """
+        tempdir = tempfile.mkdtemp(prefix="banner")
+        input_path = os.path.join(tempdir, "input")
+        output_path = os.path.join(tempdir, "output")
+        os.mkfifo(input_path)
+        os.mkfifo(output_path)
+        self.write_error = None
+        params = ["./scripts/banner.sh", "tag", self.config_file, input_path, output_path]
+        logging.info(' '.join(params))
+        try:
+            self.process = Popen(params, stdin=PIPE, stdout=PIPE, stderr=STDOUT, cwd=self.base_dir)
+            self.process.stdin.close()
+            log_thread = threading.Thread(target=self.read_log, args=(self.process, input_path, output_path))
+            log_thread.daemon = True
+            log_thread.start()
+            write_thread = threading.Thread(target=self.write_sentences, args=(sentences, input_path))
+            write_thread.daemon = True
+            write_thread.start()
+            with codecs.open(output_path, 'r', 'utf-8') as outputfile:
+                for line in outputfile:
+                    elements = line.strip().split("\t")
+                    if len(elements) == 5:  # sid, genetype, start, end, etext
+                        yield elements
+            write_thread.join()
+            log_thread.join()
+            if self.process.returncode != 0:
+                raise RuntimeError("BANNER exited with code {}".format(self.process.returncode))
+            if self.write_error is not None:
+                raise self.write_error
+        finally:
+            if self.process.poll() is None:
+                self.process.kill()
+                self.process.wait()
+            shutil.rmtree(tempdir, ignore_errors=True)
+
+    def write_sentences(self, sentences, input_path):
+        try:
+            with codecs.open(input_path, 'w', 'utf-8') as inputfile:
+                for sid, text in sentences:
+                    # one sentence per line; replacing with spaces keeps the offsets of the entities
+                    inputfile.write("{}\t{}\n".format(sid, line_breaks.sub(" ", text)))
+        except (IOError, OSError) as e:
+            self.write_error = e
+
+    def read_log(self, process, input_path, output_path):
+        """
+        Log the output of BANNER until it exits, and then open the pipes that BANNER did not open, so that the
+        other threads do not wait for it
+        """
+        for line in iter(process.stdout.readline, b""):
+            logging.info(line.strip())
+        process.wait()
+        for path, flags in ((input_path, os.O_RDONLY), (output_path, os.O_WRONLY)):
+            try:
+                os.close(os.open(path, flags | os.O_NONBLOCK))
+            except OSError:
+                pass
+
 
 class BANNERModel(SimpleTaggerModel):
     RAM = config.stanford_ner_train_ram
@@ -35,7 +117,6 @@ class BANNERModel(SimpleTaggerModel):
         super(BANNERModel, self).__init__(path, etype, **kwargs)
         self.process = None
         self.tagger = None
-        self.params = []
 
     def load_tagger(self, port=9181):
         """
@@ -52,60 +133,44 @@ class BANNERModel(SimpleTaggerModel):
 
 
     def test(self, corpus, port=9181):
-        # self.tagger = ner.SocketNER("localhost", port, output_format='inlineXML')
-        base_dir = os.getcwd()
-        os.chdir(self.BANNER_BASE)
-        tagged_sentences = []
-        ichunk = 0
-        chunk_size = 5000
-        for sidsx in chunks(self.sids, chunk_size):
-            with codecs.open("temp/banner_input{}.txt".format(ichunk), 'w', 'utf-8') as inputfile:
-                for i, sid in enumerate(sidsx):
-                    inputfile.write("{}\t{}\n".format(sid, self.sentences[i+(ichunk*chunk_size)]))
-            self.params = ["./scripts/banner.sh", "tag", self.BANNER_CONFIG, "temp/banner_input{}.txt".format(ichunk),
-                           "temp/banner_output{}.txt".format(ichunk)]
-            logging.info(' '.join(self.params))
-            # process.communicate()
-            logging.info("Starting banner tagger ({})".format(ichunk))
-            self.process = Popen(self.params, stdin=PIPE, stdout=PIPE, stderr=PIPE)
-            while True:
-                output = self.process.stdout.readline()
-                if output == '' and self.process.poll() is not None:
-                    break
-                if output:
-                    logging.info(output.strip())
-            ichunk += 1
-        # merge outputs
-        with open("temp/banner_output.txt", 'w') as outfile:
-            for i in range(ichunk):
-                with open("temp/banner_output{}.txt".format(i)) as chunkfile:
-                    outfile.write(chunkfile.read())
-
-        os.chdir(base_dir)
-        results = self.process_results(self.BANNER_BASE + "/temp/banner_output.txt", corpus)
+        """
+        Tag the sentences of the model with one BANNER process, processing each entity as soon as it is tagged
+        """
+        results = ResultsNER(self.path)
+        results.corpus = corpus
+        sentences = [(sid, corpus.get_sentence(sid).text) for sid in self.sids]
+        logging.info("Starting banner tagger for {} sentences".format(len(sentences)))
+        for elements in self.get_tagger().tag(sentences):
+            sentence = corpus.get_sentence(elements[0])
+            sentence, new_entity = self.process_entity(elements, sentence)
+            if new_entity:
+                results.entities[new_entity.eid] = new_entity
+        logging.info("found {} entities".format(len(results.entities)))
         return results
 
+    def get_tagger(self):
+        if self.tagger is None:
+            self.tagger = BannerTagger(self.BANNER_BASE, self.BANNER_CONFIG)
+        return self.tagger
+
     def annotate_sentence(self, text):
         """
         Annotate a single sentence using BANNER
         :param text: sentence text
         :return: BANNER output
         """
-        base_dir = os.getcwd()
-        os.chdir(self.BANNER_BASE)
-        with codecs.open("temp/banner_input.txt", 'w', 'utf-8') as inputfile:
-            inputfile.write("{}\t{}\n".format("0", text))
-        self.params = ["./scripts/banner.sh", "tag", self.BANNER_CONFIG, "temp/banner_input.txt",
-                       "temp/banner_output.txt"]
-        logging.info("Starting banner tagger")
-        self.process = Popen(self.params, stdin=PIPE, stdout=PIPE, stderr=PIPE)
-        while True:
-            output = self.process.stdout.readline()
-            if output == '' and self.process.poll() is not None:
-                break
-        os.chdir(base_dir)
-        with open(self.BANNER_BASE + "/temp/banner_output.txt") as outfile:
-            return outfile.read()
+        return self.annotate_sentences([text])[0]
+
+    def annotate_sentences(self, texts):
+        """
+        Annotate multiple sentences with one BANNER process
+        :param texts: text of each sentence
+        :return: BANNER output of each sentence
+        """
+        outputs = [[] for text in texts]
+        for elements in self.get_tagger().tag((str(i), text) for i, text in enumerate(texts)):
+            outputs[int(elements[0])].append("\t".join(elements))
+        return ["\n".join(lines) for lines in outputs]
 
     def process_entity(self, line, sentence):
         """
@@ -169,8 +234,3 @@ class BANNERModel(SimpleTaggerModel):
         logging.info("found {} entities".format(len(results.entities)))
         return results
 
-
-def chunks(l, n):
-    """Yield successive n-sized chunks from l."""
-    for i in range(0, len(l), n):
-        yield l[i:i+n]
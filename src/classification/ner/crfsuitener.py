@@ -1,15 +1,59 @@
 import logging
 import math
+import multiprocessing
 import pycrfsuite
 import sys
+import time
 
 from classification.ner.simpletagger import SimpleTaggerModel, create_entity
 from classification.results import ResultsNER
 
+# data tagged by the worker processes, set before the pool is created so that the workers get it when they are forked
+# instead of receiving a copy of each sequence
+_data = None
+# CRFsuite tagger of each worker process
+_tagger = None
+
+
+def init_worker(model_path):
+    """Open the tagger used by this worker process"""
+    global _tagger
+    _tagger = pycrfsuite.Tagger()
+    _tagger.open(model_path)
+
+
+def tag_sequence(tagger, xseq):
+    """
+    :return: predicted labels of the sequence and the marginal probability of each label
+    """
+    predicted = tagger.tag(xseq)
+    scores = []
+    for i, x in enumerate(predicted):
+        #logging.debug("{0}-{1}".format(i,x))
+        prob = tagger.marginal(x, i)
+        if math.isnan(prob):
+            print "NaN!!"
+            if x == "other":
+                prob = 0
+            else:
+                print x, xseq[i]
+        scores.append(prob)
+    return predicted, scores
+
+
+def tag_range(args):
+    """Entry point of the process pool, tagging the sequences of _data from start to end"""
+    start, end = args
+    return [tag_sequence(_tagger, xseq) for xseq in _data[start:end]]
+
 
 class CrfSuiteModel(SimpleTaggerModel):
     def __init__(self, path, etype, **kwargs):
+        """
+        :param workers: number of processes used to tag the data, each one with its own tagger
+        """
         super(CrfSuiteModel, self).__init__(path, etype, **kwargs)
+        self.workers = kwargs.get("workers", 1)
 
     def train(self):
         logging.info("Training model with CRFsuite")
@@ -37,29 +81,49 @@ class CrfSuiteModel(SimpleTaggerModel):
 
     def test(self, corpus, port=None):
         logging.info("Testing with %s" % self.path + ".model")
-        #self.predicted = [tagger.tag(xseq) for xseq in self.data]
-        for xseq in self.data:
-            #logging.debug(xseq)
-            self.predicted.append(self.tagger.tag(xseq))
-            self.scores.append([])
-            for i, x in enumerate(self.predicted[-1]):
-                #logging.debug("{0}-{1}".format(i,x))
-                prob = self.tagger.marginal(x, i)
-                if math.isnan(prob):
-                    print "NaN!!"
-                    if x == "other":
-                        prob = 0
-                    else:
-                        print x, xseq[i]
-                        #print xseq
-                        #print self.predicted[-1]
-                        #sys.exit()
-                #else:
-                #    print prob
-                self.scores[-1].append(prob)
+        self.tag_data()
         results = self.process_results(corpus)
         return results
 
+    def tag_data(self):
+        """Tag the data, adding the predicted labels and their marginal probabilities to predicted and scores"""
+        start_time = time.time()
+        nworkers = min(self.workers, len(self.data))
+        if nworkers > 1:
+            tagged = self.tag_parallel(nworkers)
+        else:
+            tagged = [tag_sequence(self.tagger, xseq) for xseq in self.data]
+        for predicted, scores in tagged:
+            self.predicted.append(predicted)
+            self.scores.append(scores)
+        total_time = time.time() - start_time
+        logging.info("tagged {} sentences with {} workers in {:.2f}s ({:.2f} sentences/s)".format(
+            len(self.data), max(nworkers, 1), total_time, len(self.data) / max(total_time, 1e-6)))
+
+    def tag_parallel(self, nworkers):
+        """
+        Tag the data with a pool of processes, each one with its own tagger of the model file
+        :return: predicted labels and marginal probabilities of each sequence, in the same order as the data
+        """
+        global _data
+        # several ranges per worker so that workers that finish first tag more sequences
+        size = max(1, len(self.data) // (nworkers * 4))
+        ranges = [(start, min(start + size, len(self.data))) for start in range(0, len(self.data), size)]
+        _data = self.data
+        pool = multiprocessing.Pool(nworkers, initializer=init_worker, initargs=(self.path + ".model",))
+        try:
+            tagged = []
+            for range_tagged in pool.imap(tag_range, ranges):
+                tagged += range_tagged
+        except:
+            pool.terminate()
+            raise
+        finally:
+            _data = None
+        pool.close()
+        pool.join()
+        return tagged
+
     def process_results(self, corpus):
         results = ResultsNER(self.path)
         results.corpus = corpus
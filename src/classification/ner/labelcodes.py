@@ -0,0 +1,69 @@
+from __future__ import division, absolute_import
+
+import collections
+
+import numpy as np
+
+
+class LabelCodes(collections.Sequence):
+    """
+    Labels of the tokens of each sentence, stored as one array with an int8 code per token and the offset of the
+    first token of each sentence. Each sentence is returned as a tuple of labels, like the labels of SimpleTaggerModel.
+    LabelCodes derived from another one share its offsets.
+    """
+    def __init__(self, names, codes, offsets):
+        """
+        :param names: label of each code
+        :param codes: numpy array with the code of the label of each token
+        :param offsets: numpy array with the offset of each sentence on codes, and the number of tokens at the end
+        """
+        self.names = names
+        self.codes = codes
+        self.offsets = offsets
+
+    @classmethod
+    def from_sequences(cls, sequences):
+        """
+        :param sequences: list with the labels of each sentence
+        """
+        names = []
+        name_codes = {}
+        codes = []
+        offsets = [0]
+        for sequence in sequences:
+            for label in sequence:
+                if label not in name_codes:
+                    name_codes[label] = len(names)
+                    names.append(label)
+                codes.append(name_codes[label])
+            offsets.append(len(codes))
+        if len(names) > np.iinfo(np.int8).max:
+            raise ValueError("too many labels to use int8 codes: {}".format(len(names)))
+        return cls(names, np.array(codes, dtype=np.int8), np.array(offsets, dtype=np.int64))
+
+    def __len__(self):
+        return len(self.offsets) - 1
+
+    def __getitem__(self, i):
+        if i < 0:
+            i += len(self)
+        if i < 0 or i >= len(self):
+            raise IndexError("sentence index out of range")
+        names = self.names
+        return tuple([names[c] for c in self.codes[self.offsets[i]:self.offsets[i + 1]].tolist()])
+
+    def subtype_labels(self, subtypes, subtype, other="other"):
+        """
+        Labels of a model of one subtype: the same labels for the tokens of that subtype, other for the remaining
+        tokens. The codes are derived in one pass over every token.
+        :param subtypes: LabelCodes with the subtype of each token, with the same offsets
+        """
+        names = list(self.names)
+        if other not in names:
+            names.append(other)
+        if subtype in subtypes.names:
+            is_subtype = subtypes.codes == subtypes.names.index(subtype)
+        else:
+            is_subtype = np.zeros(len(self.codes), dtype=bool)
+        codes = np.where(is_subtype, self.codes, names.index(other)).astype(np.int8)
+        return LabelCodes(names, codes, self.offsets)
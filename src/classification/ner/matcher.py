@@ -1,8 +1,8 @@
 import logging
 import pickle
-import re
 from text.offset import partial_overlap_after, partial_overlap_before, contained_by, perfect_overlap, Offsets, Offset, \
     contains
+from classification.ner.nameindex import NameIndex
 
 
 class MatcherModel(object):
@@ -11,7 +11,7 @@ class MatcherModel(object):
     def __init__(self, path, **kwargs):
         self.path = path
         self.names = set()
-        self.p = []
+        self.index = None
 
     def train(self, corpus):
         for did in corpus.documents:
@@ -39,11 +39,10 @@ class MatcherModel(object):
     def test(self, corpus):
         logging.info("loading names...")
         #self.names = pickle.load(open(self.path, "rb"))
-        logging.info("compiling regex...")
-        for n in self.names:
-            # logging.info(n)
-            self.p.append(re.compile(r"(\A|\s)(" + re.escape(n) + r")(\s|\Z|\.|,)", re.I))
-        # self.p = [re.compile(r"(\A|\s)(" + n + r")(\s|\Z|\.)", rext.I) for n in self.names]
+        logging.info("indexing names...")
+        # finds the matches of re.compile(r"(\A|\s)(" + re.escape(n) + r")(\s|\Z|\.|,)", re.I) for each name, in the
+        # same order, except for the differences listed on NameIndex
+        self.index = NameIndex(self.names)
         logging.info("testing {} documents".format(len(corpus.documents)))
         did_count = 1
         elist = {}
@@ -61,8 +60,8 @@ class MatcherModel(object):
     def test_alt(self, corpus):
         logging.info("loading names...")
         self.names = pickle.load(open(self.path, "rb"))
-        logging.info("compiling regex...")
-        self.p = re.compile(r"(\A|\s)(" + "|".join([re.escape(n) for n in self.names]) + r")(\s|\Z|\.)")
+        logging.info("indexing names...")
+        self.index = NameIndex(self.names)
         logging.info("testing {} documents".format(len(corpus.documents)))
         did_count = 1
         elist = {}
@@ -70,25 +69,32 @@ class MatcherModel(object):
             logging.info("document {0} {1}/{2}".format(did, did_count, len(corpus.documents)))
             for sentence in corpus.documents[did].sentences:
                 self.tag_sentence(sentence)
-                for entity in sentence.entities.elist[self.path]:
+                for entity in sentence.entities.elist.get(self.path, []):
                     elist[entity.eid] = entity
             did_count += 1
         return corpus, elist
 
+    def find(self, text):
+        """
+        Find the entities of a text with the index of names
+        :return: list of (start, end) of each match
+        """
+        if self.index is None:
+            return []
+        return self.index.find(text)
+
     def tag_sentence(self, sentence, entity_type="entity", offsets=None):
         exclude_this_if = (partial_overlap_after, partial_overlap_before, contained_by, perfect_overlap)
         exclude_others_if = (contains,)
         if not offsets:
             offsets = Offsets()
-        for pattern in self.p:
-            iterator = pattern.finditer(sentence.text)
-            for match in iterator:
-                offset = Offset(*match.span(2))
-                logging.info(match.group(2))
-                toadd, v, overlapping, to_exclude = offsets.add_offset(offset, exclude_this_if, exclude_others_if)
-                if toadd:
-                    #print sentence.sid, (offset.start,offset.end), [(o.start, o.end) for o in offsets.offsets]
-                    sentence.tag_entity(offset.start, offset.end, etype=entity_type, source=self.path)
-                    for o in to_exclude:
-                        # print "excluding {}-{}".format(o.start,o.end)
-                        sentence.exclude_entity(o.start, o.end, self.path)
+        for start, end in self.find(sentence.text):
+            offset = Offset(start, end)
+            logging.info(sentence.text[start:end])
+            toadd, v, overlapping, to_exclude = offsets.add_offset(offset, exclude_this_if, exclude_others_if)
+            if toadd:
+                #print sentence.sid, (offset.start,offset.end), [(o.start, o.end) for o in offsets.offsets]
+                sentence.tag_entity(offset.start, offset.end, etype=entity_type, source=self.path)
+                for o in to_exclude:
+                    # print "excluding {}-{}".format(o.start,o.end)
+                    sentence.exclude_entity(o.start, o.end, self.path)
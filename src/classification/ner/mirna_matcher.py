@@ -11,6 +11,7 @@ class MirnaMatcher(MatcherModel):
     """
     def __init__(self, path, **kwargs):
         super(MirnaMatcher, self).__init__(path, **kwargs)
+        self.p = []
         # best prefixes for miRNA corpus
         # self.names = set(["mir", "let", "miR", "hsa", "microRNA", "MicroRNA", "miR", "mir", "miR", "lin", "MiR",
         #                  "miRNA", "hsa-miR", "miRNA", "Let", "pre-miR", "premiR", "Hsa-miR", "Mir", "cel-miR"])
@@ -52,3 +53,13 @@ class MirnaMatcher(MatcherModel):
                         elist[entity.eid] = entity
             did_count += 1
         return corpus, elist
+
+    def find(self, text):
+        """
+        Find the miRNAs of a text with the patterns of self.p
+        :return: list of (start, end) of each match
+        """
+        matches = []
+        for pattern in self.p:
+            matches += [match.span(2) for match in pattern.finditer(text)]
+        return matches
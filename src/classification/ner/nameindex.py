@@ -0,0 +1,82 @@
+from __future__ import division, absolute_import
+
+import string
+
+# characters matched by \s, before and after a name, and by \. and , after a name, in the patterns of MatcherModel
+whitespace = frozenset(u" \t\n\r\f\v")
+end_boundaries = whitespace | frozenset(u".,")
+# lowercase ASCII letters only, like re.I without re.UNICODE
+_ascii_lower = dict((ord(c), ord(c.lower())) for c in string.ascii_uppercase)
+
+
+def fold_case(text):
+    """Lowercase the ASCII letters of a text, keeping its length"""
+    if isinstance(text, str):
+        text = text.decode("utf-8")
+    return text.translate(_ascii_lower)
+
+
+class NameIndex(object):
+    """
+    Index of a list of names, to find every occurrence of the names in a text, in the same conditions as the pattern
+    (\A|\s)(name)(\s|\Z|\.|,) with re.I: the name starts at the beginning of the text or after whitespace and ends
+    at the end of the text, before whitespace, a dot or a comma. Case is ignored for ASCII letters.
+    The matches are the matches of one such pattern per name, in the same order, except that:
+    - a name repeated after a single space is found every time, while the pattern consumed that space and missed the
+      repetition;
+    - names that only differ in case are matched once, at the order of the first of them, instead of once per name;
+    - empty names are ignored.
+    Since a name can only start and end at those boundaries, the index is a dictionary of the case-folded names,
+    and each text is searched by looking up the substrings between a start and an end boundary with the length of
+    some name. The time to search a text does not depend on the number of names.
+    """
+    def __init__(self, names):
+        """
+        :param names: iterable of names; matches are sorted by the order of the names, as the patterns were applied
+        """
+        # folded name -> order of the first name with that folded name
+        self.names = {}
+        for name in names:
+            if not name:
+                continue
+            folded = fold_case(name)
+            if folded not in self.names:
+                self.names[folded] = len(self.names)
+        self.lengths = frozenset(len(n) for n in self.names)
+        if self.lengths:
+            self.max_length = max(self.lengths)
+        else:
+            self.max_length = 0
+
+    def __len__(self):
+        return len(self.names)
+
+    def __contains__(self, name):
+        return fold_case(name) in self.names
+
+    def find(self, text):
+        """
+        Find the names in a text
+        :return: list of (start, end) of each occurrence, sorted by the order of the names and then by start
+        """
+        if not self.names:
+            return []
+        folded = fold_case(text)
+        nchars = len(folded)
+        starts = [0] + [i + 1 for i, c in enumerate(folded) if c in whitespace]
+        ends = [i for i, c in enumerate(folded) if c in end_boundaries] + [nchars]
+        matches = []
+        iend = 0
+        for start in starts:
+            while iend < len(ends) and ends[iend] <= start:
+                iend += 1
+            for end in ends[iend:]:
+                length = end - start
+                if length > self.max_length:
+                    break
+                if length in self.lengths:
+                    order = self.names.get(folded[start:end])
+                    if order is not None:
+                        matches.append((order, start, end))
+        matches.sort()
+        return [(start, end) for order, start, end in matches]
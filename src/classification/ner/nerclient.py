@@ -0,0 +1,170 @@
+from __future__ import division, absolute_import
+
+import itertools
+import logging
+import socket
+import threading
+import time
+from multiprocessing.pool import ThreadPool
+
+from config import config
+
+# characters replaced by spaces in the text of a sentence, since NERServer reads one line per request, without
+# joining the tokens on each side
+line_breaks = ("\f", "\n", "\r", "\t", "\v")
+
+
+class NERClientError(Exception):
+    """A sentence could not be tagged after the maximum number of attempts"""
+    pass
+
+
+class NERClient(object):
+    """
+    Client of one or more Stanford NERServer processes running the same classifier.
+    NERServer tags one line of text per connection and closes it after sending the output, so there is no connection
+    to keep alive between sentences; instead, a pool of threads keeps up to `connections` sentences per server being
+    tagged at the same time, while the sentences are streamed from the input.
+    Each sentence is sent to the server with the fewest sentences being tagged, in turns if they have the same number.
+    Failed requests are retried on another server, up to `retries` times, waiting retry_wait seconds more each time.
+    A server that fails is not used for down_time seconds, unless every server failed.
+    """
+    def __init__(self, servers, connections=None, retries=None, timeout=None, retry_wait=0.5, down_time=5):
+        """
+        :param servers: list of (host, port) of the servers
+        :param connections: number of sentences sent at the same time to each server
+        :param retries: number of times a sentence is sent again after an error
+        :param timeout: seconds to wait for each connection and response
+        """
+        if not servers:
+            raise ValueError("NERClient requires at least one server")
+        self.servers = list(servers)
+        self.connections = max(1, connections or config.stanford_ner_connections) * len(self.servers)
+        if retries is None:
+            retries = config.stanford_ner_retries
+        self.retries = retries
+        self.timeout = timeout or config.stanford_ner_timeout
+        self.retry_wait = retry_wait
+        self.down_time = down_time
+        self.lock = threading.Lock()
+        self.next_server = itertools.cycle(range(len(self.servers)))
+        # number of sentences being tagged by each server
+        self.load = [0] * len(self.servers)
+        self.server_requests = [0] * len(self.servers)
+        # time until which each server is not used after an error
+        self.down_until = [0] * len(self.servers)
+        self.requests = 0
+        self.retried = 0
+        self.failures = 0
+        self.errors = {}
+        self.request_time = 0
+
+    def get_server(self, exclude=()):
+        """
+        Index of the least loaded server, preferring the servers that are not in exclude and did not fail recently,
+        and increase its load
+        """
+        now = time.time()
+        with self.lock:
+            first = next(self.next_server)
+            order = [(first + i) % len(self.servers) for i in range(len(self.servers))]
+            candidates = [i for i in order if i not in exclude and self.down_until[i] <= now] or \
+                         [i for i in order if i not in exclude] or order
+            server = min(candidates, key=lambda i: self.load[i])
+            self.load[server] += 1
+            return server
+
+    def send(self, server, text):
+        """
+        Send one line of text to a server and read the output until the server closes the connection
+        """
+        conn = socket.create_connection(server, self.timeout)
+        try:
+            conn.settimeout(self.timeout)
+            conn.sendall(text)
+            chunks = []
+            while True:
+                data = conn.recv(65536)
+                if not data:
+                    break
+                chunks.append(data)
+        finally:
+            conn.close()
+        return b"".join(chunks)
+
+    def tag_text(self, text):
+        """
+        Tag one sentence
+        :param text: tokens of the sentence separated by spaces
+        :return: output of NERServer, as unicode
+        """
+        for c in line_breaks:
+            text = text.replace(c, " ")
+        if isinstance(text, unicode):
+            text = text.encode("utf-8")
+        text += b"\n"
+        failed = set()
+        for attempt in range(self.retries + 1):
+            if attempt > 0:
+                with self.lock:
+                    self.retried += 1
+                time.sleep(self.retry_wait * attempt)
+            iserver = self.get_server(failed)
+            server = self.servers[iserver]
+            start_time = time.time()
+            try:
+                out = self.send(server, text)
+            except (socket.error, socket.timeout) as e:
+                logging.warning("NER server {}:{} error ({}/{}): {}".format(server[0], server[1], attempt + 1,
+                                                                            self.retries + 1, e))
+                failed.add(iserver)
+                with self.lock:
+                    self.load[iserver] -= 1
+                    self.down_until[iserver] = time.time() + self.down_time
+                    self.errors[type(e).__name__] = self.errors.get(type(e).__name__, 0) + 1
+                continue
+            with self.lock:
+                self.load[iserver] -= 1
+                self.server_requests[iserver] += 1
+                self.requests += 1
+                self.request_time += time.time() - start_time
+            return out.decode("utf-8").strip()
+        with self.lock:
+            self.failures += 1
+        raise NERClientError("could not tag sentence after {} attempts: {}".format(self.retries + 1, text.strip()))
+
+    def tag_sentences(self, sentences):
+        """
+        Tag a sequence of sentences, sending up to self.connections sentences at the same time
+        :param sentences: iterable of sentence texts
+        :return: iterator of the output of each sentence, in the same order as the input
+        """
+        if self.connections == 1:
+            for text in sentences:
+                yield self.tag_text(text)
+            return
+        pool = ThreadPool(self.connections)
+        try:
+            for out in pool.imap(self.tag_text, sentences, chunksize=8):
+                yield out
+        finally:
+            pool.terminate()
+            pool.join()
+
+    def stats(self):
+        """
+        Number of sentences tagged, by all servers and by each one, retries, sentences that failed and average time
+        of each request
+        """
+        if self.requests == 0:
+            request_time = 0
+        else:
+            request_time = self.request_time / self.requests
+        return {"requests": self.requests, "retries": self.retried, "failures": self.failures,
+                "errors": dict(self.errors), "request_time": request_time,
+                "server_requests": dict(zip(["{}:{}".format(*s) for s in self.servers], self.server_requests))}
+
+    def log_stats(self):
+        logging.info("NER client: {requests} sentences, {retries} retries, {failures} failures, "
+                     "{request_time:.3f}s per sentence, errors: {errors}, servers: {server_requests}".format(
+                         **self.stats()))
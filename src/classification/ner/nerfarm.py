@@ -0,0 +1,264 @@
+from __future__ import division, absolute_import
+
+import atexit
+import ctypes
+import ctypes.util
+import logging
+import os
+import signal
+import socket
+import sys
+import threading
+import time
+from subprocess import Popen, PIPE
+
+from config import config
+
+
+class NERServerError(Exception):
+    """A NERServer process could not be started"""
+    pass
+
+
+def get_free_port(host="localhost"):
+    """Port that is not in use, chosen by the OS"""
+    s = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+    try:
+        s.bind((host, 0))
+        return s.getsockname()[1]
+    finally:
+        s.close()
+
+
+def port_in_use(port, host="localhost"):
+    """Check if a server is listening on a port; connections of a previous server that are closing are ignored"""
+    s = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+    s.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+    try:
+        s.bind((host, port))
+    except socket.error:
+        return True
+    finally:
+        s.close()
+    return False
+
+
+# farms that were started and not stopped yet
+_farms = set()
+
+
+def stop_farms():
+    """Stop the servers of every farm started by this process, when python exits"""
+    for farm in list(_farms):
+        if farm.pid == os.getpid():
+            farm.stop()
+
+
+atexit.register(stop_farms)
+
+
+def kill_with_parent():
+    """
+    Ask the kernel to terminate this process when the thread that started it exits, so that the JVMs do not keep
+    running if the python process is killed before stop_farms runs. Only available on Linux.
+    """
+    try:
+        libc = ctypes.CDLL(ctypes.util.find_library("c"), use_errno=True)
+        # PR_SET_PDEATHSIG
+        libc.prctl(1, signal.SIGTERM)
+    except (OSError, AttributeError):
+        pass
+
+
+class NERServerProcess(object):
+    """
+    One edu.stanford.nlp.ie.NERServer JVM serving a classifier on a port.
+    The stderr of the JVM is read by a thread, which logs it and detects when the classifier is loaded.
+    """
+    def __init__(self, classifier, port, host="localhost", ram=None, jar=None):
+        self.classifier = classifier
+        self.port = port
+        self.host = host
+        self.ram = ram or config.stanford_ner_test_ram
+        self.jar = jar or "{}/stanford-ner.jar".format(config.stanford_ner_dir)
+        self.process = None
+        self.ready = threading.Event()
+        self.starts = 0
+
+    def get_args(self):
+        return ["java", self.ram, "-Dfile.encoding=UTF-8", "-cp", self.jar, "edu.stanford.nlp.ie.NERServer",
+                "-port", str(self.port), "-loadClassifier", self.classifier,
+                "-tokenizerFactory", "edu.stanford.nlp.process.WhitespaceTokenizer", "-tokenizerOptions",
+                "tokenizeNLs=true"]
+
+    def start(self, backstop=False):
+        """
+        :param backstop: terminate the JVM when the current thread exits, see kill_with_parent
+        """
+        args = self.get_args()
+        logging.info(" ".join(args))
+        self.ready.clear()
+        with open(os.devnull, "w") as devnull:
+            self.process = Popen(args, stdin=PIPE, stdout=devnull, stderr=PIPE, shell=False,
+                                 preexec_fn=kill_with_parent if backstop else None)
+        self.starts += 1
+        reader = threading.Thread(target=self.read_stderr, args=(self.process,),
+                                  name="nerserver-{}".format(self.port))
+        reader.daemon = True
+        reader.start()
+
+    def read_stderr(self, process):
+        """Log the output of the JVM until it exits, so that the pipe does not fill up"""
+        for line in iter(process.stderr.readline, b""):
+            logging.debug("NERServer {}: {}".format(self.port, line.strip()))
+            if "done" in line:
+                self.ready.set()
+        process.stderr.close()
+
+    def wait_ready(self, timeout=None):
+        """
+        Wait until the classifier is loaded and the server accepts connections
+        """
+        timeout = timeout or config.stanford_ner_start_timeout
+        end_time = time.time() + timeout
+        while not self.ready.wait(1):
+            if not self.is_alive():
+                raise NERServerError("NERServer on port {} exited with code {}".format(self.port,
+                                                                                      self.process.returncode))
+            if time.time() > end_time:
+                raise NERServerError("NERServer on port {} did not load in {}s".format(self.port, timeout))
+        while True:
+            try:
+                socket.create_connection((self.host, self.port), 5).close()
+                break
+            except socket.error:
+                if not self.is_alive() or time.time() > end_time:
+                    raise NERServerError("NERServer on port {} is not accepting connections".format(self.port))
+                time.sleep(0.5)
+        logging.info("loaded {} on port {}".format(self.classifier, self.port))
+
+    def is_alive(self):
+        return self.process is not None and self.process.poll() is None
+
+    def stop(self, timeout=10):
+        """Terminate the JVM, and kill it if it does not exit after timeout seconds"""
+        if not self.is_alive():
+            return
+        self.process.terminate()
+        end_time = time.time() + timeout
+        while self.process.poll() is None and time.time() < end_time:
+            time.sleep(0.1)
+        if self.process.poll() is None:
+            logging.warning("killing NERServer on port {}".format(self.port))
+            self.process.kill()
+            self.process.wait()
+
+
+class NERServerFarm(object):
+    """
+    Pool of NERServer JVMs with the same classifier, so that the sentences of a model can be tagged by several JVMs.
+    The servers are started at the same time and the farm is ready when every server has loaded the classifier.
+    A monitor thread restarts the servers that exit while the farm is running.
+    Can be used as a context manager, which stops the servers at the end. Farms that are not stopped are stopped when
+    python exits.
+    """
+    def __init__(self, classifier, nservers=None, port=None, host="localhost", check_interval=10, **kwargs):
+        """
+        :param classifier: path of the serialized classifier
+        :param nservers: number of JVMs
+        :param port: port of the first server; the others use free ports
+        :param check_interval: seconds between each check of the servers
+        """
+        self.classifier = classifier
+        self.nservers = max(1, nservers or config.stanford_ner_servers)
+        self.host = host
+        self.check_interval = check_interval
+        ports = []
+        if port is not None:
+            if port_in_use(port, host):
+                logging.warning("port {} is in use, starting NERServer on a free port".format(port))
+            else:
+                ports.append(port)
+        while len(ports) < self.nservers:
+            free_port = get_free_port(host)
+            if free_port not in ports:
+                ports.append(free_port)
+        self.servers = [NERServerProcess(classifier, p, host=host, **kwargs) for p in ports]
+        self.stopping = threading.Event()
+        self.monitor = None
+        self.restarts = 0
+        self.pid = None
+
+    def can_kill_with_parent(self):
+        """
+        The kernel terminates a server when the thread that started it exits, instead of the python process, so
+        only the servers started by the main thread or the monitor thread, which run until the farm is stopped,
+        are terminated this way
+        """
+        thread = threading.current_thread()
+        return sys.platform.startswith("linux") and (isinstance(thread, threading._MainThread) or
+                                                     thread is self.monitor)
+
+    def start(self):
+        logging.info("Starting {} NERServer(s) for {}...".format(self.nservers, self.classifier))
+        self.pid = os.getpid()
+        _farms.add(self)
+        backstop = self.can_kill_with_parent()
+        for server in self.servers:
+            server.start(backstop)
+        try:
+            for server in self.servers:
+                server.wait_ready()
+        except:
+            self.stop()
+            raise
+        self.stopping.clear()
+        self.monitor = threading.Thread(target=self.monitor_servers, name="nerfarm-monitor")
+        self.monitor.daemon = True
+        self.monitor.start()
+        return self
+
+    def addresses(self):
+        """(host, port) of each server"""
+        return [(s.host, s.port) for s in self.servers]
+
+    def check(self):
+        """
+        Restart the servers that are not running
+        :return: number of servers that were restarted
+        """
+        restarted = 0
+        for server in self.servers:
+            if self.stopping.is_set():
+                break
+            if not server.is_alive():
+                logging.warning("NERServer on port {} exited with code {}, restarting".format(
+                    server.port, server.process.returncode if server.process else None))
+                server.start(self.can_kill_with_parent())
+                try:
+                    server.wait_ready()
+                except NERServerError as e:
+                    logging.error(e)
+                restarted += 1
+        self.restarts += restarted
+        return restarted
+
+    def monitor_servers(self):
+        while not self.stopping.wait(self.check_interval):
+            self.check()
+
+    def stop(self):
+        self.stopping.set()
+        if self.monitor is not None and self.monitor is not threading.current_thread():
+            self.monitor.join()
+        self.monitor = None
+        for server in self.servers:
+            server.stop()
+        _farms.discard(self)
+        logging.info("stopped NERServer(s) of {}".format(self.classifier))
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.stop()
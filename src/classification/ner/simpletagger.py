@@ -1,8 +1,10 @@
 import codecs
 import logging
-import unicodedata
-import gc
 from classification.model import Model
+from classification.ner.labelcodes import LabelCodes
+from classification.ner import wordshape
+from classification.ner.wordshape import word_case, has_greek_symbol, has_number, in_periodic_table, wordclass, \
+    simplewordclass
 from text.chemical_entity import element_base, ChemicalEntity
 from text.chemical_entity import amino_acids
 from text.dna_entity import DNAEntity
@@ -23,7 +25,7 @@ feature_extractors = {# "text": lambda x, i: x.tokens[i].text,
                       "suffix2": lambda x, i: x.tokens[i].text[-2:],
                       "prefix4": lambda x, i: x.tokens[i].text[:4],
                       "suffix4": lambda x, i: x.tokens[i].text[-4:],
-                      "hasnumber": lambda x, i: str(any(c.isdigit() for c in x.tokens[i].text)),
+                      "hasnumber": lambda x, i: str(has_number(x.tokens[i].text)),
                       "case": lambda x, i: word_case(x.tokens[i].text),
                       "prevcase": lambda x, i: prev_case(x, i),
                       "nextcase": lambda x, i: next_case(x, i),
@@ -43,7 +45,7 @@ feature_extractors = {# "text": lambda x, i: x.tokens[i].text,
 chem_features = feature_extractors.copy()
 chem_features.update({ "greek": lambda x, i: str(has_greek_symbol(x.tokens[i].text)),
                         "aminoacid": lambda x, i: str(any(w in amino_acids for w in x.tokens[i].text.split('-'))),
-                        "periodictable": lambda x, i: str(x.tokens[i].text in element_base.keys() or x.tokens[i].text.title() in zip(*element_base.values())[0])
+                        "periodictable": lambda x, i: str(in_periodic_table(x.tokens[i].text))
                                      })
 
 prot_features = feature_extractors.copy()
@@ -55,6 +57,113 @@ mirna_features.update({"mir": lambda x, i: mirna(x, i),
                        # "prev_mir": lambda x, i: x.tokens[i-1].text.lower().startswith("mir"),
                        })
 
+# features of a list of tokens that are used by the features of the same token and of the previous and next tokens
+token_features = {"prefix2": lambda tokens: [t.text[:2] for t in tokens],
+                  "prefix3": lambda tokens: [t.text[:3] for t in tokens],
+                  "prefix4": lambda tokens: [t.text[:4] for t in tokens],
+                  "suffix2": lambda tokens: [t.text[-2:] for t in tokens],
+                  "suffix3": lambda tokens: [t.text[-3:] for t in tokens],
+                  "suffix4": lambda tokens: [t.text[-4:] for t in tokens],
+                  "hasnumber": lambda tokens: [str(has_number(t.text)) for t in tokens],
+                  "case": lambda tokens: [word_case(t.text) for t in tokens],
+                  "lemma": lambda tokens: [t.lemma for t in tokens],
+                  "postag": lambda tokens: [t.pos for t in tokens],
+                  "wordclass": lambda tokens: [wordclass(t.text) for t in tokens],
+                  "simplewordclass": lambda tokens: [simplewordclass(t.text) for t in tokens]
+                  }
+
+# features of feature_extractors that are a token feature of the same (0), previous (-1) or next (1) token
+window_features = {"prefix2": ("prefix2", 0),
+                   "prefix3": ("prefix3", 0),
+                   "prevprefix3": ("prefix3", -1),
+                   "nextprefix3": ("prefix3", 1),
+                   "prefix4": ("prefix4", 0),
+                   "suffix2": ("suffix2", 0),
+                   "suffix3": ("suffix3", 0),
+                   "prevsuffix3": ("suffix3", -1),
+                   "nextsuffix3": ("suffix3", 1),
+                   "suffix4": ("suffix4", 0),
+                   "hasnumber": ("hasnumber", 0),
+                   "case": ("case", 0),
+                   "prevcase": ("case", -1),
+                   "nextcase": ("case", 1),
+                   "lemma": ("lemma", 0),
+                   "prevlemma": ("lemma", -1),
+                   "nextlemma": ("lemma", 1),
+                   "postag": ("postag", 0),
+                   "prevpostag": ("postag", -1),
+                   "nextpostag": ("postag", 1),
+                   "wordclass": ("wordclass", 0),
+                   "prevwordclass": ("wordclass", -1),
+                   "nextwordclass": ("wordclass", 1),
+                   "simplewordclass": ("simplewordclass", 0)
+                   }
+
+
+# values of features that are not added to the features of a token
+skipped_values = frozenset(["BOS", "EOS"])
+
+
+def get_extractors(subtype):
+    """Feature extractors used for a type of entity"""
+    if subtype == "protein":
+        return prot_features
+    elif subtype == "mirna":
+        return mirna_features
+    else:
+        return feature_extractors
+
+
+def get_sentence_features(sentence, flist, extractors):
+    """
+    Values of the features of every token of a sentence, the same as the values of the extractors.
+    Each token feature is computed once per token and the features of the previous and next tokens are the same
+    values shifted by one token. Features that are not on window_features are computed by their extractor.
+    :return: list with the values of each feature of flist, one per token
+    """
+    columns = {}
+    values = []
+    for f in flist:
+        # features that are not extractors of this type of entity are not valid, even if they are on window_features
+        extractor = extractors[f]
+        if f in window_features:
+            base, shift = window_features[f]
+            if base not in columns:
+                columns[base] = token_features[base](sentence.tokens)
+            if shift == -1:
+                values.append(["BOS"] + columns[base][:-1])
+            elif shift == 1:
+                values.append(columns[base][1:] + ["EOS"])
+            else:
+                values.append(columns[base])
+        else:
+            values.append([extractor(sentence, i) for i in range(len(sentence.tokens))])
+    return values
+
+
+def get_token_feature_sets(sentence, flist, subtype):
+    """
+    Features of every token of a sentence, as used by the models
+    :return: list with a set of features for each token, None for tokens without text
+    """
+    values = get_sentence_features(sentence, flist, get_extractors(subtype))
+    text_tokens = [i for i, t in enumerate(sentence.tokens) if t.text]
+    if len(text_tokens) < len(sentence.tokens):
+        values = [[fvalues[i] for i in text_tokens] for fvalues in values]
+    # feature strings of each token with text, None for the values that are skipped
+    columns = [[name + v if v not in skipped_values else None for v in fvalues]
+               for name, fvalues in zip([f + "=" for f in flist], values)]
+    if columns:
+        rows = zip(*columns)
+    else:
+        rows = [()] * len(text_tokens)
+    sentence_features = [None] * len(sentence.tokens)
+    for i, row in zip(text_tokens, rows):
+        features = set(row)
+        features.discard(None)
+        sentence_features[i] = features
+    return sentence_features
+
 def genia_chunk(sentence, i):
     if hasattr(sentence[i], "genia_chunk"):
         print sentence[i].genia_chunk
@@ -156,30 +265,6 @@ def next_pos(sentence, i):
         # return sentence.tokens[i+1].genia_pos
         return sentence.tokens[i + 1].pos
 
-def word_case(word):
-    if word.islower():
-        case = 'LOWERCASE'
-    elif word.isupper():
-        case = 'UPPERCASE'
-    elif word.istitle():
-        case = 'TITLECASE'
-    else:
-        case = 'MIXEDCASE'
-    return case
-
-
-def has_greek_symbol(word):
-    for c in word:
-        #print c
-        try:
-            if 'GREEK' in unicodedata.name(c):
-                hasgreek = 'HASGREEK'
-                return True
-        except ValueError:
-            return False
-    return False
-
-
 def get_prefix_suffix(word, n):
     #print len(word.decode('utf-8'))
     #if len(word.decode('utf-8')) <= n:
@@ -193,34 +278,6 @@ def get_prefix_suffix(word, n):
         return word[:n], word[-n:]
 
 
-def wordclass(word):
-    wclass = ''
-    for c in word:
-        if c.isdigit():
-            wclass += '0'
-        elif c.islower():
-            wclass += 'a'
-        elif c.isupper():
-            wclass += 'A'
-        else:
-            wclass += 'x'
-    return wclass
-
-
-def simplewordclass(word):
-    wclass = '.'
-    for c in word:
-        if c.isdigit() and wclass[-1] != '0':
-            wclass += '0'
-        elif c.islower() and wclass[-1] != 'a':
-            wclass += 'a'
-        elif c.isupper() and wclass[-1] != 'A':
-            wclass += 'A'
-        elif not c.isdigit() and not c.islower() and not c.isupper() and wclass[-1] != 'x':
-            wclass += 'x'
-    return wclass[1:]
-
-
 class SimpleTaggerModel(Model):
     """Model trained with a tagger"""
     def __init__(self, path, etype, **kwargs):
@@ -235,6 +292,8 @@ class SimpleTaggerModel(Model):
         self.trainer = None
         #self.sentences = []
         self.etype = etype
+        # (labels, subtypes) as LabelCodes, used to derive the labels of subtype models
+        self.label_codes = None
 
 
     def load_data(self, corpus, flist, etype="all", mode="train", doctype="all"):
@@ -248,7 +307,6 @@ class SimpleTaggerModel(Model):
                 - self.tokens = list of tokens for each sentence
         """
         logging.info("Loading data for type %s" % etype)
-        fname = "f" + str(len(flist))
         nsentences = 0
         didx = 0
         savecorpus = False # do not save the corpus if no new features are generated
@@ -273,6 +331,7 @@ class SimpleTaggerModel(Model):
                 sentencelabels = []
                 sentencetokens = []
                 sentencesubtypes = []
+                features_labels = self.generate_sentence_features(sentence, flist, etype)
                 for i in range(len(sentence.tokens)):
                     if sentence.tokens[i].text:
                         #tokensubtype = sentence.tokens[i].tags.get("goldstandard_subtype", "none")
@@ -284,16 +343,15 @@ class SimpleTaggerModel(Model):
                         #     else:
                         #         tokenlabel = sentence.tokens[i].tags.get("goldstandard_" + type, "other")
                         # else:
-                        tokenfeatures, tokenlabel = self.generate_features(sentence, i, flist, etype)
+                        tokenfeatures, tokenlabel = features_labels[i]
                         # savecorpus = True
-                        sentence.tokens[i].features[fname] = tokenfeatures
                         # if tokenlabel != "other":
                         #      logging.debug("%s %s" % (tokenfeatures, tokenlabel))
                         sentencefeatures.append(tokenfeatures)
                         sentencelabels.append(tokenlabel)
                         sentencetokens.append(sentence.tokens[i])
+                        sentencesubtypes.append(sentence.tokens[i].tags.get("goldstandard_subtype", "none"))
                         del tokenfeatures
-                            #sentencesubtypes.append(tokensubtype)
                         # print sentencesubtypes
                 #logging.info("%s" % set(sentencesubtypes))
                 #if subtype == "all" or subtype in sentencesubtypes:
@@ -305,12 +363,9 @@ class SimpleTaggerModel(Model):
                 del sentencelabels
                 self.sids.append(sentence.sid)
                 self.tokens.append(tuple(sentencetokens))
+                self.subtypes.append(tuple(sentencesubtypes))
                 #if mode != "train":
-
-                    #self.subtypes.append(tuple(sentencesubtypes))
                     #self.sentences.append(sentence.text)
-            if didx % 1000 == 0:
-                gc.collect()
             #    tr.print_diff()
 
             didx += 1
@@ -318,35 +373,31 @@ class SimpleTaggerModel(Model):
         #if subtype == "all" and savecorpus:
         #    corpus.save()
         logging.info("used %s sentences for model %s" % (nsentences, etype))
+        wordshape.log_stats()
         #tr.print_diff()
 
+    def get_label_codes(self):
+        """
+        Labels and subtypes of the tokens of each sentence as LabelCodes, generated once for every subtype model
+        """
+        if self.label_codes is None or len(self.label_codes[0]) != len(self.labels):
+            self.label_codes = (LabelCodes.from_sequences(self.labels), LabelCodes.from_sequences(self.subtypes))
+        return self.label_codes
+
     def copy_data(self, basemodel, t="all"):
-        #logging.debug(self.subtypes)
+        """
+        Use the data of basemodel. The features, sids and tokens are shared with basemodel and must not be modified.
+        The labels of a subtype model are the labels of the tokens of that subtype, and other for the remaining tokens.
+        """
+        self.data = basemodel.data
+        self.sids = basemodel.sids
+        self.tokens = basemodel.tokens
+        #self.sentences = basemodel.sentences
         if t != "all":
-            # right_sents = [i for i in range(len(basemodel.subtypes)) if t in basemodel.subtypes[i]]
-            #logging.debug(right_sents)
-            # print t, self.subtypes
-            self.data = [basemodel.data[i] for i in range(len(basemodel.subtypes))]
-            labels = [basemodel.labels[i] for i in range(len(basemodel.subtypes))]
-            self.labels = []
-            for il, l in enumerate(labels):
-                self.labels.append([])
-                for it, tl in enumerate(l):
-                    # print it, tl, basemodel.subtypes[il][it]
-                    if basemodel.subtypes[il][it] == t:
-                        self.labels[-1].append(tl)
-                    else:
-                        self.labels[-1].append("other")
-                # print self.labels[-1]
-            self.sids = [basemodel.sids[i] for i in range(len(basemodel.subtypes))]
-            self.tokens =  [basemodel.tokens[i] for i in range(len(basemodel.subtypes))]
-            #self.sentences = [basemodel.sentences[i] for i in range(len(basemodel.subtypes))]
+            labels, subtypes = basemodel.get_label_codes()
+            self.labels = labels.subtype_labels(subtypes, t)
         else:
-            self.data = basemodel.data[:]
-            self.labels = basemodel.labels[:]
-            self.sids = basemodel.sids
-            self.tokens = basemodel.tokens[:]
-            #self.sentences = basemodel.sentences[:]
+            self.labels = basemodel.labels
         logging.info("copied %s for model %s" % (len(self.data), t))
 
     def generate_features(self, sentence, i, flist, subtype):
@@ -379,6 +430,20 @@ class SimpleTaggerModel(Model):
         features = set(features)
         return features, label
 
+    def generate_sentence_features(self, sentence, flist, subtype):
+        """
+            Features and labels of every token of a sentence, the same as generate_features but computing each
+            feature of a token only once for the whole sentence.
+            Tokens without text have no features and their value is None.
+        """
+        if subtype == "all":
+            label_name = "goldstandard"
+        else:
+            label_name = "goldstandard_" + subtype
+        sentence_features = get_token_feature_sets(sentence, flist, subtype)
+        return [(features, t.tags.get(label_name, "other")) if features is not None else None
+                for t, features in zip(sentence.tokens, sentence_features)]
+
     def save_corpus_to_sbilou(self):
         """
         Saves the data that was loaded into simple tagger format to a file compatible with Stanford NER
@@ -3,16 +3,14 @@ import sys
 from subprocess import Popen, PIPE, call
 import logging
 import codecs
-import ner
 import re
-import atexit
-from socket import error as SocketError
-import errno
 
 from text.protein_entity import ProteinEntity
 from text.offset import Offsets, Offset
 from classification.results import ResultsNER
 from classification.ner.simpletagger import SimpleTaggerModel, create_entity
+from classification.ner.nerclient import NERClient
+from classification.ner.nerfarm import NERServerFarm
 from config import config
 
 stanford_coding = {"-LRB-": "<", "\/": "/", "&apos;": "'", "analogs": "analogues", "analog": "analogue",
@@ -44,6 +42,8 @@ class StanfordNERModel(SimpleTaggerModel):
         self.process = None
         self.tagger = None
         self.port = None
+        self.host = "localhost"
+        self.farm = None
 
     def write_prop(self):
         """
@@ -84,34 +84,37 @@ class StanfordNERModel(SimpleTaggerModel):
 
     def test(self, corpus):
 
-        tagged_sentences = []
         logging.info("sending sentences to tagger {}...".format(self.path))
-        for isent, sid in enumerate(self.sids):
-            #out = self.tagger.tag_text(replace_abbreviations(" ".join([t.text for t in self.tokens[isent]])))
-            #out = self.tagger.tag_text(self.sentences[isent])
-            #text = self.sentences[isent]
-            text = " ".join([t.text for t in self.tokens[isent]])
-            #logging.info("tagging: {}/{} - {}={}".format(isent, len(self.sids), sid, did))
-            out = self.annotate_sentence(text)
-            tagged_sentences.append(out)
+        tagger = self.get_tagger()
+        #out = self.tagger.tag_text(replace_abbreviations(" ".join([t.text for t in self.tokens[isent]])))
+        texts = (" ".join([t.text for t in tokens]) for tokens in self.tokens)
+        tagged_sentences = list(tagger.tag_sentences(texts))
+        tagger.log_stats()
         results = self.process_results(tagged_sentences, corpus)
         return results
 
+    def get_tagger(self):
+        """
+        Client of the servers of this model, created once and used for every sentence
+        """
+        if self.tagger is None:
+            if self.farm is not None:
+                self.tagger = NERClient(self.farm.addresses())
+            else:
+                self.tagger = NERClient([(self.host, self.port)])
+        return self.tagger
+
     def annotate_sentence(self, text):
-        self.tagger = ner.SocketNER("localhost", self.port, output_format='inlineXML')
-        try:
-            out = self.tagger.tag_text(text)
-        except SocketError as e:
-            if e.errno != errno.ECONNRESET:
-                raise  # Not error we are looking for
-            print "socket error with sentence {}".format(text)
-        except:
-            print "other socket error!"
-            out = self.tagger.tag_text(text)
-        return out
+        return self.get_tagger().tag_text(text)
+
+    def annotate_sentences(self, texts):
+        return list(self.get_tagger().tag_sentences(texts))
 
     def kill_process(self):
-        self.process.kill()
+        if self.farm is not None:
+            self.farm.stop()
+            self.farm = None
+        self.tagger = None
 
     def process_results(self, sentences, corpus):
         results = ResultsNER(self.path)
@@ -217,47 +220,15 @@ class StanfordNERModel(SimpleTaggerModel):
         return tagged
 
 
-    def load_tagger(self, port=9181):
+    def load_tagger(self, port=9181, servers=None):
         """
-        Start the server process with the classifier
-        :return:
+        Start the server processes with the classifier and wait until they are ready
+        :param port: port of the first server, or a free port if it is in use
+        :param servers: number of servers, config.stanford_ner_servers by default
         """
-        # check if it already loaded (and then kill that instance)
-        kill_process(port)
-        self.port = port
-        ner_args = ["java", self.RAM_TEST, "-Dfile.encoding=UTF-8", "-cp", self.STANFORD_NER, "edu.stanford.nlp.ie.NERServer",
-                    "-port", str(port), "-loadClassifier", self.path + ".ser.gz",
-                    "-tokenizerFactory", "edu.stanford.nlp.process.WhitespaceTokenizer", "-tokenizerOptions",
-                    "tokenizeNLs=true"]
-        logging.info(' '.join(ner_args))
-        logging.info("Starting the server for {} on {}...".format(self.path, self.port))
-        self.process = Popen(ner_args, stdin = PIPE, stdout = PIPE, stderr = PIPE, shell=False)
-        while True:
-            out = self.process.stderr.readline()
-            if out and out != "":
-                logging.info(out)
-            if "done" in out:
-                logging.info("loaded {}".format(self.path))
-                break
-        #out = ner.communicate("Structure-activity relationships have been investigated for inhibition of DNA-dependent protein kinase (DNA-PK) and ATM kinase by a series of pyran-2-ones, pyran-4-ones, thiopyran-4-ones, and pyridin-4-ones.")
-        #logging.info(out)
-        #print 'Success!!'
-        atexit.register(self.kill_process)
-
-
-def kill_process(port):
-    # http://stackoverflow.com/a/14907802
-    popen = Popen(['netstat', '-lpn'],
-                             shell=False,
-                             stdout=PIPE)
-    (data, err) = popen.communicate()
-
-    pattern = "^tcp.*((?:{0})).* (?P<pid>[0-9]*)/.*$"
-    pattern = pattern.format(str(port))
-    prog = re.compile(pattern)
-    for line in data.split('\n'):
-        match = re.match(prog, line)
-        if match:
-            pid = match.group('pid')
-            logging.info("killing process {}".format(pid))
-            Popen(['kill', '-9', pid])
\ No newline at end of file
+        self.kill_process()
+        self.farm = NERServerFarm(self.path + ".ser.gz", servers, port=port, host=self.host, ram=self.RAM_TEST,
+                                  jar=self.STANFORD_NER)
+        self.farm.start()
+        self.port = self.farm.servers[0].port
+        logging.info("loaded {} on ports {}".format(self.path, [s.port for s in self.farm.servers]))
\ No newline at end of file
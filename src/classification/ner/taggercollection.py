@@ -1,5 +1,6 @@
 import logging
 import multiprocessing
+import time
 
 from classification.ner.crfsuitener import CrfSuiteModel
 from classification.ner.simpletagger import feature_extractors
@@ -8,6 +9,20 @@ from classification.ner.stanfordner import StanfordNERModel
 
 chemdnerModels = "bc_systematic bc_formula bc_trivial bc_abbreviation bc_family"
 
+# collection used by the worker processes, set before the pool is created so that the workers get the data of the base
+# model when they are forked instead of receiving a copy for each type
+_collection = None
+
+
+def train_type_worker(t):
+    """Entry point of the process pool, training the model of one type"""
+    return _collection.train_type(t)
+
+
+def tag_type_worker(t):
+    """Entry point of the process pool, tagging the data with the model of one type"""
+    return _collection.tag_type(t)
+
 
 class TaggerCollection(object):
     """
@@ -18,7 +33,11 @@ class TaggerCollection(object):
     DDI_TYPES = ["drug", "group", "brand", "drug_n"]
 
     def __init__(self, basepath, baseport = 9191, **kwargs):
+        """
+        :param jobs: number of types whose models are trained or tested at the same time, each on its own process
+        """
         self.models = {}
+        self.jobs = kwargs.get("jobs", 1)
         self.basepath = basepath
         self.corpus = kwargs.get("corpus")
         submodels = []
@@ -44,14 +63,51 @@ class TaggerCollection(object):
         :param types: subtypes of entities to train individual models, as well as a general model
         """
         self.basemodel.load_data(self.corpus, feature_extractors.keys())
-        for t in self.types:
-            typepath = self.basepath + "_" + t
-            # model = StanfordNERModel(typepath, etype=t)
-            model = CrfSuiteModel(typepath, etype=t)
-            model.copy_data(self.basemodel, t)
-            logging.info("training subtype %s" % t)
-            model.train()
-            self.models[t] = model
+        # generated before the workers are created so that they share it
+        self.basemodel.get_label_codes()
+        for t, type_time in self.map_types(train_type_worker):
+            logging.info("{}: trained in {:.2f}s".format(t, type_time))
+            # the model is on the model file, its data is no longer needed
+            self.models[t] = CrfSuiteModel(self.basepath + "_" + t, etype=t)
+
+    def train_type(self, t):
+        """
+        Train the model of one type with the data of the base model
+        :return: type and the time it took
+        """
+        start_time = time.time()
+        typepath = self.basepath + "_" + t
+        # model = StanfordNERModel(typepath, etype=t)
+        model = CrfSuiteModel(typepath, etype=t)
+        model.copy_data(self.basemodel, t)
+        logging.info("training subtype %s" % t)
+        model.train()
+        return t, time.time() - start_time
+
+    def map_types(self, worker):
+        """
+        Run a worker function for each type, with a pool of processes if there is more than one job
+        :return: results of the worker for each type, in the same order as self.types
+        """
+        global _collection
+        _collection = self
+        njobs = min(self.jobs, len(self.types))
+        if njobs <= 1:
+            try:
+                return [worker(t) for t in self.types]
+            finally:
+                _collection = None
+        pool = multiprocessing.Pool(njobs)
+        try:
+            results = pool.map(worker, self.types)
+        except:
+            pool.terminate()
+            raise
+        finally:
+            _collection = None
+        pool.close()
+        pool.join()
+        return results
 
     def load_models(self):
         for i, t in enumerate(self.types):
@@ -60,34 +116,35 @@ class TaggerCollection(object):
             model.load_tagger(self.baseport + i)
             self.models[t] = model
 
-    def process_type(self, modelst, t, corpus, basemodel, basepath, port):
+    def tag_type(self, t):
+        """
+        Tag the data of the base model with the model of one type
+        :return: type, predicted labels and scores of each sentence and the time it took
+        """
+        start_time = time.time()
+        model = self.models[t]
         # load data only for one model since this takes at least 5 minutes each time
         logging.debug("{}: copying data...".format(t))
-        modelst.copy_data(basemodel)
-        #logging.debug("pre test %s" % model)
+        model.copy_data(self.basemodel)
         logging.debug("{}: testing...".format(t))
-        res = modelst.test(corpus, port)
-        logging.info("{}:done...".format(t))
-        return res
+        model.tag_data()
+        return t, model.predicted, model.scores, time.time() - start_time
 
     def test_types(self, corpus):
         """
-        Classify the corpus with multiple classifiers from different subtypes
+        Classify the corpus with multiple classifiers from different subtypes. The data is tagged by each model on
+        its own process, and then the entities of each model are added to the corpus in the same order as self.types.
         :return ResultSetNER object with the results obtained for the models
         """
-        # TODO: parallelize
         results = ResultSetNER(corpus, self.basepath)
         self.basemodel.load_data(corpus, feature_extractors.keys())
-        all_results = []
-        tasks = [(self.models[t], t, corpus, self.basemodel, self.basepath, self.baseport + i) for i, t in enumerate(self.types)]
-
-        all_results = []
-        for t in tasks:
-            r = self.process_type(*t)
-            all_results.append(r)
-        logging.info("adding results...")
-        for res, i in enumerate(all_results):
-            #logging.debug("adding these results: {}".format(self.types[i]))
+        for t, predicted, scores, type_time in self.map_types(tag_type_worker):
+            model = self.models[t]
+            model.sids = self.basemodel.sids
+            model.predicted = predicted
+            model.scores = scores
+            res = model.process_results(corpus)
+            logging.info("{}: tagged in {:.2f}s, found {} entities".format(t, type_time, len(res.entities)))
             results.add_results(res)
         return results
 
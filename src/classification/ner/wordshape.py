@@ -0,0 +1,139 @@
+from __future__ import division, absolute_import
+
+import logging
+import unicodedata
+
+from text.chemical_entity import element_base
+
+# maximum number of words kept by each cache
+cache_size = 200000
+# name -> WordCache of every cached function
+caches = {}
+
+element_symbols = frozenset(element_base.keys())
+element_names = frozenset(v[0] for v in element_base.values())
+
+
+class WordCache(object):
+    """
+    Bounded cache of a function of a word, such as its word class, so that it is computed once for frequent words.
+    Words are kept in two generations of up to max_size/2 words: when the current generation is full, it replaces
+    the old one, so the words that were not used during the last two generations are removed, similar to a LRU cache
+    without keeping the order of every access. Words of the old generation that are used again are moved to the current
+    one. The same value object is returned for every occurrence of a word.
+    """
+    def __init__(self, name, function, max_size=None):
+        self.name = name
+        self.function = function
+        self.max_size = max_size or cache_size
+        self.current = {}
+        self.old = {}
+        self.hits = 0
+        self.misses = 0
+
+    def __call__(self, word):
+        if word in self.current:
+            self.hits += 1
+            return self.current[word]
+        if word in self.old:
+            self.hits += 1
+            value = self.old[word]
+        else:
+            self.misses += 1
+            value = self.function(word)
+        if len(self.current) >= self.max_size // 2:
+            self.old = self.current
+            self.current = {}
+        self.current[word] = value
+        return value
+
+    def clear(self):
+        self.current = {}
+        self.old = {}
+
+    def stats(self):
+        total = self.hits + self.misses
+        if total == 0:
+            hit_rate = 0
+        else:
+            hit_rate = self.hits / total
+        return {"hits": self.hits, "misses": self.misses, "hit_rate": hit_rate,
+                "size": len(self.current) + len(self.old)}
+
+
+def cached(function):
+    """Keep the values of a function of a word in a WordCache registered in caches"""
+    cache = WordCache(function.__name__, function)
+    caches[function.__name__] = cache
+    return cache
+
+
+def log_stats():
+    for name in sorted(caches):
+        logging.info("{} cache: {hits} hits, {misses} misses ({hit_rate:.1%}), {size} words".format(
+            name, **caches[name].stats()))
+
+
+@cached
+def word_case(word):
+    if word.islower():
+        case = 'LOWERCASE'
+    elif word.isupper():
+        case = 'UPPERCASE'
+    elif word.istitle():
+        case = 'TITLECASE'
+    else:
+        case = 'MIXEDCASE'
+    return case
+
+
+@cached
+def has_greek_symbol(word):
+    for c in word:
+        try:
+            if 'GREEK' in unicodedata.name(c):
+                return True
+        except ValueError:
+            return False
+    return False
+
+
+@cached
+def has_number(word):
+    return any(c.isdigit() for c in word)
+
+
+@cached
+def in_periodic_table(word):
+    """Check if a word is the symbol or name of an element"""
+    return word in element_symbols or word.title() in element_names
+
+
+@cached
+def wordclass(word):
+    wclass = ''
+    for c in word:
+        if c.isdigit():
+            wclass += '0'
+        elif c.islower():
+            wclass += 'a'
+        elif c.isupper():
+            wclass += 'A'
+        else:
+            wclass += 'x'
+    return wclass
+
+
+@cached
+def simplewordclass(word):
+    wclass = '.'
+    for c in word:
+        if c.isdigit() and wclass[-1] != '0':
+            wclass += '0'
+        elif c.islower() and wclass[-1] != 'a':
+            wclass += 'a'
+        elif c.isupper() and wclass[-1] != 'A':
+            wclass += 'A'
+        elif not c.isdigit() and not c.islower() and not c.isupper() and wclass[-1] != 'x':
+            wclass += 'x'
+    return wclass[1:]
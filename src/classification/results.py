@@ -14,7 +14,8 @@ sys.path.append(os.path.abspath(os.path.dirname(__file__) + '../..'))
 from config.corpus_paths import paths
 
 
-from text.corpus import Corpus
+from text.annotation_layer import AnnotationLayer, get_layer_path, load_layer
+from text.corpus import Corpus, open_corpus
 from config import config
 from text.offset import Offset, perfect_overlap, contained_by, Offsets
 
@@ -24,6 +25,36 @@ END_TAG = "end"
 MIDDLE_TAG = "middle"
 OTHER_TAG = "other"
 
+def save_results(results, path, **attributes):
+    """Pickle a results object, replacing some of its attributes only on the saved object"""
+    previous = dict((k, getattr(results, k)) for k in attributes)
+    for k, v in attributes.iteritems():
+        setattr(results, k, v)
+    try:
+        pickle.dump(results, open(path, "wb"))
+    finally:
+        for k, v in previous.iteritems():
+            setattr(results, k, v)
+
+
+def load_results(path, goldstd, corpus=None):
+    """
+    Load a results pickle and add the results to the corpus of goldstd
+    :param path: path of the results pickle
+    :param corpus: corpus already opened, to which other results can be also added. Results with the same entity
+    sources replace each other.
+    :return: results object
+    """
+    with open(path, "rb") as f:
+        results = pickle.load(f)
+    if results.corpus is None:
+        # the annotation layer is next to the results, wherever they were moved to
+        results.load_corpus(goldstd, corpus, get_layer_path(path))
+    else:
+        results.load_corpus(goldstd, corpus)
+    return results
+
+
 class ResultsRE(object):
     def __init__(self, name):
         self.pairs = {}
@@ -32,30 +63,39 @@ class ResultsRE(object):
         self.document_pairs = {}
 
     def save(self, path):
-        # no need to save the whole corpus, only the entities of each sentence are necessary
-        # because the full corpus is already saved on a diferent pickle
+        # no need to save the whole corpus, only the entities and pairs of each document are necessary
+        # because the full corpus is already saved on a diferent file
         logging.info("Saving results to {}".format(path))
-        reduced_corpus = {}
-        npairs = 0
-        for did in self.corpus.documents:
-            self.document_pairs[did] = self.corpus.documents[did].pairs
-            npairs += len(self.document_pairs[did].pairs)
-            reduced_corpus[did] = {}
-            for sentence in self.corpus.documents[did].sentences:
-                reduced_corpus[did][sentence.sid] = sentence.entities
-        self.corpus = reduced_corpus
-        pickle.dump(self, open(path, "wb"))
+        layer = AnnotationLayer()
+        layer.add_corpus(self.corpus, pairs=True)
+        layer.save(get_layer_path(path))
+        save_results(self, path, corpus=None, document_pairs={})
 
-    def load_corpus(self, goldstd):
-        logging.info("loading corpus %s" % paths[goldstd]["corpus"])
-        corpus = pickle.load(open(paths[goldstd]["corpus"]))
-
-        for did in corpus.documents:
-            for sentence in corpus.documents[did].sentences:
-                sentence.entities = self.corpus[did][sentence.sid]
-            corpus.documents[did].pairs = self.document_pairs[did]
-                #for entity in sentence.entities.elist[options.models]:
-                #    print entity.chebi_score,
+    def load_corpus(self, goldstd, corpus=None, layer_path=None):
+        """
+        Add the results to the corpus of goldstd (see load_results)
+        :param corpus: corpus already opened, to which other results can be also added
+        :param layer_path: annotation layer of the results, None if they were saved with the entities of each sentence
+        """
+        if corpus is None:
+            logging.info("loading corpus %s" % paths[goldstd]["corpus"])
+            corpus = open_corpus(paths[goldstd]["corpus"])
+        if layer_path is None:
+            # results saved with the entities of each sentence
+            self.sources = None
+            for did in corpus.documents:
+                for sentence in corpus.documents[did].sentences:
+                    sentence.entities = self.corpus[did][sentence.sid]
+                corpus.documents[did].pairs = self.document_pairs[did]
+                    #for entity in sentence.entities.elist[options.models]:
+                    #    print entity.chebi_score,
+        else:
+            layer = load_layer(layer_path)
+            layer.apply(corpus)
+            self.sources = layer.sources()
+            for did in layer.pair_dids:
+                if did in corpus.documents:
+                    self.document_pairs[did] = corpus.documents[did].pairs
 
         self.corpus = corpus
 
@@ -121,30 +161,40 @@ class ResultsNER(object):
 
     def save(self, path):
         # no need to save the whole corpus, only the entities of each sentence are necessary
-        # because the full corpus is already saved on a diferent pickle
+        # because the full corpus is already saved on a diferent file
         logging.info("Saving results to {}".format(path))
-        reduced_corpus = {}
-        for did in self.corpus.documents:
-            reduced_corpus[did] = {}
-            for sentence in self.corpus.documents[did].sentences:
-                reduced_corpus[did][sentence.sid] = sentence.entities
-        self.corpus = reduced_corpus
-        pickle.dump(self, open(path, "wb"))
+        layer = AnnotationLayer()
+        layer.add_corpus(self.corpus)
+        layer.save(get_layer_path(path))
+        save_results(self, path, corpus=None)
     
     def save_chemdner(self):
         pass
 
-    def load_corpus(self, goldstd):
-        logging.info("loading corpus %s" % paths[goldstd]["corpus"])
-        corpus = pickle.load(open(paths[goldstd]["corpus"]))
-        for did in corpus.documents:
-            if did not in self.corpus:
-                logging.info("no results for {}".format(did))
-                continue
-            for sentence in corpus.documents[did].sentences:
-                sentence.entities = self.corpus[did][sentence.sid]
-                #for entity in sentence.entities.elist[options.models]:
-                #    print entity.chebi_score,
+    def load_corpus(self, goldstd, corpus=None, layer_path=None):
+        """
+        Add the results to the corpus of goldstd (see load_results)
+        :param corpus: corpus already opened, to which other results can be also added
+        :param layer_path: annotation layer of the results, None if they were saved with the entities of each sentence
+        """
+        if corpus is None:
+            logging.info("loading corpus %s" % paths[goldstd]["corpus"])
+            corpus = open_corpus(paths[goldstd]["corpus"])
+        if layer_path is None:
+            # results saved with the entities of each sentence
+            self.sources = None
+            for did in corpus.documents:
+                if did not in self.corpus:
+                    logging.info("no results for {}".format(did))
+                    continue
+                for sentence in corpus.documents[did].sentences:
+                    sentence.entities = self.corpus[did][sentence.sid]
+                    #for entity in sentence.entities.elist[options.models]:
+                    #    print entity.chebi_score,
+        else:
+            layer = load_layer(layer_path)
+            layer.apply(corpus)
+            self.sources = layer.sources()
 
         self.corpus = corpus
 
@@ -335,6 +385,11 @@ def combine_results(modelname, results, resultsname, etype, models):
     all_results.corpus = results[0].corpus
     for r in results:
         print r.path
+        # results that share a corpus only combine the sources of their own layer
+        if getattr(r, "sources", None) is None:
+            sources = models
+        else:
+            sources = [s for s in models if s in r.sources]
         for did in r.corpus.documents:
             for sentence in r.corpus.documents[did].sentences:
                 ref_sentence = all_results.corpus.documents[did].get_sentence(sentence.sid)
@@ -344,7 +399,7 @@ def combine_results(modelname, results, resultsname, etype, models):
                         all_results.corpus.documents[did].get_sentence(sentence.sid).entities.elist[modelname] = []
                     for s in sentence.entities.elist:
                         # print s
-                        if s in models:
+                        if s in sources:
                             # print s
                             for e in sentence.entities.elist[s]:
                                 if e.type == etype:
@@ -391,11 +446,13 @@ def main():
     logging.info("Processing action {0} on {1}".format(options.action, options.goldstd))
     logging.info("loading results %s" % options.results + ".pickle")
     results_list = []
+    # every result is added to the same corpus
+    corpus = None
     for r in options.results:
         if os.path.exists(r + ".pickle"):
-            results = pickle.load(open(r + ".pickle", 'rb'))
+            results = load_results(r + ".pickle", options.goldstd, corpus)
             results.path = r
-            results.load_corpus(options.goldstd)
+            corpus = results.corpus
             results_list.append(results)
         else:
             print "results not found"
@@ -413,7 +470,7 @@ def main():
         # for now assume CHEMDNER format
         results = ResultsNER(options.results[0])
         logging.info("loading corpus...")
-        results.corpus = pickle.load(open(paths[options.goldstd]["corpus"]))
+        results.corpus = open_corpus(paths[options.goldstd]["corpus"])
         results.model = options.models[0]
         results.import_chemdner(options.input)
         results.save(results.name + ".pickle")
@@ -144,9 +144,9 @@ class ReModel(object):
 
     def get_pair(self, pid, corpus):
         did = '.'.join(pid.split(".")[:-1])
-        for p in corpus.documents[did].pairs.pairs:
-            if p.pid == pid:
-                return p
+        p = corpus.documents[did].pairs.get_pair(pid)
+        if p is not None:
+            return p
         print "pid not found: {}".format(pid)
 
 def main():
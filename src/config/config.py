@@ -42,11 +42,25 @@ with open("settings.json") as settings:
     geniass_path = vals["geniass_path"]
     florchebi_path = vals["florchebi_path"]
     corenlp_dir = vals["corenlp_dir"]
+    # empty to disable the cache
+    corenlp_cache = vals.get("corenlp_cache", "")
+    corenlp_cache_mb = vals.get("corenlp_cache_mb", 2048)
     stanford_ner_dir = vals["stanford_ner_dir"]
     stanford_ner_train_ram = vals["stanford_ner_train_ram"]
     stanford_ner_test_ram = vals["stanford_ner_test_ram"]
+    # NER servers started for each model, sentences sent at the same time to each server, and number of retries of
+    # each sentence
+    stanford_ner_servers = vals.get("stanford_ner_servers", 1)
+    stanford_ner_connections = vals.get("stanford_ner_connections", 4)
+    stanford_ner_retries = vals.get("stanford_ner_retries", 3)
+    stanford_ner_timeout = vals.get("stanford_ner_timeout", 60)
+    # seconds to wait for a NER server to load its classifier
+    stanford_ner_start_timeout = vals.get("stanford_ner_start_timeout", 600)
     stoplist = vals["stoplist"]
     mirbase_path = vals["mirbase_path"]
+    # index of UniProt names created by uniprot_base.py, and whether to query uniprot.org for names not in the index
+    uniprot_index = vals.get("uniprot_index", "data/uniprot_index.db")
+    uniprot_online = vals.get("uniprot_online", False)
 
 if use_chebi or use_go:
     import MySQLdb
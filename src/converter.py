@@ -2,8 +2,10 @@ import argparse
 import logging
 import os
 import time
-import cPickle as pickle
+from classification.results import load_results
 from config.corpus_paths import paths
+from text.corpus import open_corpus
+from text.corpus_store import read_cache_size
 
 
 def main():
@@ -36,14 +38,14 @@ def main():
     for goldstd in options.corpus:
         corpus_path = paths[goldstd]["corpus"]
         logging.info("loading corpus %s" % corpus_path)
-        corpus = pickle.load(open(corpus_path, 'rb'))
+        # only the text of the documents is read
+        corpus = open_corpus(corpus_path, cache_size=read_cache_size)
         corpus.convert_to(options.format, options.path)
 
     if options.results:
         logging.info("loading results %s" % options.results + ".pickle")
         if os.path.exists(options.results + ".pickle"):
-            results = pickle.load(open(options.results + ".pickle", 'rb'))
-            results.load_corpus(options.corpus[0])
+            results = load_results(options.results + ".pickle", options.corpus[0])
             results.path = options.results
             results.convert_to(options.format, options.path, options.etype)
         else:
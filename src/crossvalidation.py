@@ -16,7 +16,7 @@ from evaluate import get_gold_ann_set, get_results
 # from postprocessing.chebi_resolution import add_chebi_mappings
 # from postprocessing.ssm import add_ssm_score
 from reader.chemdner_corpus import write_chemdner_files
-from text.corpus import Corpus
+from text.corpus import Corpus, open_corpus
 
 
 def run_crossvalidation(goldstd_list, corpus, model, cv, crf="stanford", entity_type="all", cvlog="cv.log"):
@@ -169,10 +169,8 @@ def main():
     for g in options.goldstd:
         corpus_path = paths[g]["corpus"]
         logging.info("loading corpus %s" % corpus_path)
-        this_corpus = pickle.load(open(corpus_path, 'rb'))
-        #docs = this_corpus.documents
-        docs = dict((k, this_corpus.documents[k]) for k in this_corpus.documents.keys())
-        corpus.documents.update(docs)
+        this_corpus = open_corpus(corpus_path)
+        corpus.documents.update(this_corpus.documents)
     run_crossvalidation(options.goldstd, corpus, options.models, options.cv, options.crf, options.etype)
 
     total_time = time.time() - start_time
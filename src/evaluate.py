@@ -1,7 +1,6 @@
 #!/usr/bin/env python
 from __future__ import division
 import argparse
-import cPickle as pickle
 import codecs
 import collections
 import logging
@@ -35,7 +34,7 @@ if config.use_chebi:
     from postprocessing import chebi_resolution
     from postprocessing.ssm import get_ssm
 from postprocessing.ensemble_ner import EnsembleNER
-from classification.results import ResultsNER
+from classification.results import ResultsNER, load_results
 
 def get_gold_ann_set(corpus_type, gold_path, entity_type, pair_type, text_path):
     if corpus_type == "chemdner":
@@ -341,12 +340,16 @@ def main():
     logging.getLogger().setLevel(numeric_level)
     logging.info("Processing action {0} on {1}".format(options.action, options.goldstd))
     results_list = []
+    corpus = None
     for results_path in options.results:
         logging.info("loading results %s" % results_path + ".pickle")
         if os.path.exists(results_path + ".pickle"):
-            results = pickle.load(open(results_path + ".pickle", 'rb'))
-            results.load_corpus(options.goldstd)
+            results = load_results(results_path + ".pickle", options.goldstd, corpus)
             results.path = results_path
+            # results that are merged are added to the same corpus, while results that are evaluated separately
+            # may have the same sources
+            if options.action in ("combine", "train_ensemble", "test_ensemble", "savetocorpus"):
+                corpus = results.corpus
             results_list.append(results)
         else:
             print "results not found"
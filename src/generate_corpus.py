@@ -4,12 +4,12 @@ import xml.etree.ElementTree as ET
 import codecs
 import os
 import sys
-import pickle
 from time import sleep
 from pycorenlp import StanfordCoreNLP
 
 import config.corpus_paths
 from classification.ner.matcher import MatcherModel
+from classification.results import load_results
 from config import config
 from postprocessing import ssm
 from reader import pubmed
@@ -144,7 +144,6 @@ if sys.argv[1] == "download":
 elif sys.argv[1] == "process":
     process_documents(corpus_path)
 elif sys.argv[1] == "annotate":
-    results = pickle.load(open("results/mirna_ds_entities.pickle", 'rb'))
-    results.load_corpus("mirna_ds")
+    results = load_results("results/mirna_ds_entities.pickle", "mirna_ds")
     corpus = results.corpus
     annotate_corpus_relations(corpus, "combined", "corpora/mirna-ds/abstracts.txt_1.pickle")
\ No newline at end of file
@@ -45,7 +45,9 @@ from reader.mirtext_corpus import MirtexCorpus
 from reader.pubmed_corpus import PubmedCorpus
 from reader.tempEval_corpus import TempEvalCorpus
 from reader.Transmir_corpus import TransmirCorpus
-from text.corpus import Corpus
+from text import preprocessing
+from text.corpus import Corpus, open_corpus
+from text.corpus_store import DocumentStore
 
 if config.use_chebi:
     pass
@@ -139,6 +141,11 @@ considered when coadministering with megestrol acetate.''',
                         choices=["stanford", "crfsuite", "banner", "ensemble"])
     parser.add_argument("--log", action="store", dest="loglevel", default="WARNING", help="Log level")
     parser.add_argument("--kernel", action="store", dest="kernel", default="svmtk", help="Kernel for relation extraction")
+    parser.add_argument("--jobs", action="store", dest="jobs", type=int, default=1,
+                        help="Number of workers used to process documents, to tag sentences with CRFsuite and to "
+                             "train and test the models of each type with train_multiple and test_multiple")
+    parser.add_argument("--pool", action="store", dest="pool", default="process", choices=["process", "thread"],
+                        help="Type of worker pool used to process documents")
     options = parser.parse_args()
 
     # set logger
@@ -166,6 +173,7 @@ considered when coadministering with megestrol acetate.''',
         corpus_ann = paths[options.goldstd]["annotations"]
 
         corenlp_client = StanfordCoreNLP('http://localhost:9000')
+        preprocessing.configure(options.jobs, options.pool)
         corpus = load_corpus(options.goldstd, corpus_path, corpus_format, corenlp_client)
         #corpus.load_genia() #TODO optional genia
         corpus.save(paths[options.goldstd]["corpus"])
@@ -177,7 +185,7 @@ considered when coadministering with megestrol acetate.''',
         corpus_path = paths[options.goldstd]["corpus"]
         corpus_ann = paths[options.goldstd]["annotations"]
         logging.info("loading corpus %s" % corpus_path)
-        corpus = pickle.load(open(corpus_path, 'rb'))
+        corpus = open_corpus(corpus_path)
         corpus.load_genia()
         corpus.save(paths[options.goldstd]["corpus"])
     elif options.actions == "load_biomodel":
@@ -185,7 +193,7 @@ considered when coadministering with megestrol acetate.''',
         corpus_path = paths[options.goldstd]["corpus"]
         corpus_ann = paths[options.goldstd]["annotations"]
         logging.info("loading corpus %s" % corpus_path)
-        corpus = pickle.load(open(corpus_path, 'rb'))
+        corpus = open_corpus(corpus_path)
         corpus.load_biomodel()
         corpus.save(paths[options.goldstd]["corpus"])
     elif options.actions == "tuples":
@@ -193,7 +201,7 @@ considered when coadministering with megestrol acetate.''',
         corpus_path = paths[options.goldstd]["corpus"]
         corpus_ann = paths[options.goldstd]["annotations"]
         logging.info("loading corpus %s" % corpus_path)
-        corpus = pickle.load(open(corpus_path, 'rb'))
+        corpus = open_corpus(corpus_path)
         logging.info("converting to tuples...")
         corpus.to_tuple()
         corpus.save(paths[options.goldstd]["corpus"])
@@ -205,22 +213,21 @@ considered when coadministering with megestrol acetate.''',
         corpus_path = paths[options.goldstd]["corpus"]
         corpus_ann = paths[options.goldstd]["annotations"]
         logging.info("loading corpus %s" % corpus_path)
-        corpus = pickle.load(open(corpus_path, 'rb'))
+        corpus = open_corpus(corpus_path)
         logging.debug("loading annotations...")
         corpus.clear_annotations(options.etype)
         corpus.load_annotations(corpus_ann, options.etype, options.ptype)
         # corpus.get_invalid_sentences()
         corpus.save(paths[options.goldstd]["corpus"])
     else:
-        corpus = Corpus("corpus/" + "&".join(options.goldstd))
+        # documents are only loaded when they are used
+        corpus = Corpus("corpus/" + "&".join(options.goldstd), documents=DocumentStore())
         for g in options.goldstd:
             corpus_path = paths[g]["corpus"]
             logging.info("loading corpus %s" % corpus_path)
-            this_corpus = pickle.load(open(corpus_path, 'rb'))
+            this_corpus = open_corpus(corpus_path)
             #logging.info("adding {} documents".format(len(documents)))
-            # docs = this_corpus.documents
-            docs = dict((k, this_corpus.documents[k]) for k in this_corpus.documents.keys()[:13000])
-            corpus.documents.update(docs)
+            corpus.documents.update(this_corpus.documents)
         if options.actions == "write_goldstandard":
             model = BiasModel(options.output[1])
             model.load_data(corpus, [])
@@ -248,7 +255,8 @@ considered when coadministering with megestrol acetate.''',
             #model.train("TermList.txt")
         elif options.actions == "train_multiple": # Train one classifier for each type of entity in this corpus
             # logging.info(corpus.subtypes)
-            models = TaggerCollection(basepath=options.models, corpus=corpus, subtypes=corpus.subtypes)
+            models = TaggerCollection(basepath=options.models, corpus=corpus, subtypes=corpus.subtypes,
+                                      jobs=options.jobs)
             models.train_types()
         elif options.actions == "train_relations":
             if options.kernel == "jsre":
@@ -290,7 +298,7 @@ considered when coadministering with megestrol acetate.''',
                 if options.crf == "stanford":
                     model = StanfordNERModel(options.models + "_stanford", options.etype)
                 elif options.crf == "crfsuite":
-                    model = CrfSuiteModel(options.models + "_crfsuite", options.etype)
+                    model = CrfSuiteModel(options.models + "_crfsuite", options.etype, workers=options.jobs)
                 elif options.crf == "banner":
                     model = BANNERModel(options.models, options.etype)
                 elif options.crf == "ensemble":
@@ -320,14 +328,15 @@ considered when coadministering with megestrol acetate.''',
             logging.info("testing with multiple classifiers... {}".format(' '.join(options.submodels)))
             allresults = ResultSetNER(corpus, options.output[1])
             if len(options.submodels) < 2:
-                models = TaggerCollection(basepath=options.models)
+                models = TaggerCollection(basepath=options.models, jobs=options.jobs)
                 models.load_models()
                 results = models.test_types(corpus)
                 final_results = results.combine_results()
             else:
                 base_port = 9191
                 for submodel in options.submodels:
-                    models = TaggerCollection(basepath=options.models + "_" + submodel, baseport = base_port)
+                    models = TaggerCollection(basepath=options.models + "_" + submodel, baseport = base_port,
+                                              jobs=options.jobs)
                     models.load_models()
                     results = models.test_types(corpus)
                     logging.info("combining results...")
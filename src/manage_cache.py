@@ -0,0 +1,78 @@
+#!/usr/bin/env python
+from __future__ import division, unicode_literals
+
+import argparse
+import codecs
+import logging
+import time
+
+from pycorenlp import StanfordCoreNLP
+
+from config import config
+from config.corpus_paths import paths
+from text.corenlp_cache import CoreNLPCache
+from text.corpus import open_corpus
+from text.document import process_sentences
+from text.sentence import Sentence
+
+
+def warm_cache(sentences, corenlp_client):
+    """
+    Process sentences with CoreNLP so that their results are saved to the cache
+    :param sentences: list of (sid, text)
+    """
+    # new sentence objects so that existing corpora are not modified
+    to_process = [Sentence(text, sid=sid, did=sid.split(".")[0]) for sid, text in sentences]
+    process_sentences(to_process, corenlp_client)
+    logging.info("processed {} sentences".format(len(to_process)))
+
+
+def main():
+    start_time = time.time()
+    parser = argparse.ArgumentParser(description='Manage the cache of CoreNLP results')
+    parser.add_argument("action", help="Actions to be performed.", choices=["stats", "warm", "prune", "clear"])
+    parser.add_argument("--goldstd", default=[], dest="goldstd", nargs="+",
+                        help="Corpora used to warm the cache", choices=paths.keys())
+    parser.add_argument("--input", dest="input", help="Text file with one sentence per line, used to warm the cache")
+    parser.add_argument("--max-mb", dest="max_mb", type=float, default=config.corenlp_cache_mb,
+                        help="Maximum size of the cache after pruning")
+    parser.add_argument("--corenlp", dest="corenlp", default="http://localhost:9000", help="CoreNLP server URL")
+    parser.add_argument("--log", action="store", dest="loglevel", default="WARNING", help="Log level")
+    options = parser.parse_args()
+
+    numeric_level = getattr(logging, options.loglevel.upper(), None)
+    if not isinstance(numeric_level, int):
+        raise ValueError('Invalid log level: %s' % options.loglevel)
+    while len(logging.root.handlers) > 0:
+        logging.root.removeHandler(logging.root.handlers[-1])
+    logging_format = '%(asctime)s %(levelname)s %(filename)s:%(lineno)s:%(funcName)s %(message)s'
+    logging.basicConfig(level=numeric_level, format=logging_format)
+    logging.getLogger().setLevel(numeric_level)
+
+    if not config.corenlp_cache:
+        print "The CoreNLP cache is disabled, set corenlp_cache on settings.json"
+        return
+    cache = CoreNLPCache(config.corenlp_cache, config.corenlp_cache_mb)
+    if options.action == "warm":
+        corenlp_client = StanfordCoreNLP(options.corenlp)
+        sentences = []
+        for g in options.goldstd:
+            logging.info("loading corpus %s" % paths[g]["corpus"])
+            corpus = open_corpus(paths[g]["corpus"])
+            sentences += [(s.sid, s.text) for s in corpus.get_sentences()]
+        if options.input:
+            with codecs.open(options.input, 'r', 'utf-8') as inputfile:
+                sentences += [("input.s{}".format(i), l.strip()) for i, l in enumerate(inputfile) if l.strip()]
+        warm_cache(sentences, corenlp_client)
+    elif options.action == "prune":
+        removed = cache.prune(options.max_mb)
+        print "removed {} results".format(removed)
+    elif options.action == "clear":
+        cache.clear()
+    entries, size = cache.size()
+    print "{}: {} results, {:.1f}MB".format(config.corenlp_cache, entries, size / 1024 / 1024)
+    total_time = time.time() - start_time
+    logging.info("Total time: %ss" % total_time)
+
+if __name__ == "__main__":
+    main()
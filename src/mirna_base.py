@@ -2,21 +2,25 @@ import argparse
 import atexit
 import logging
 import os
-import pickle
+import cPickle as pickle
 
+import numpy as np
 import re
 from rdflib import URIRef, BNode, Literal, ConjunctiveGraph, Namespace
 from rdflib.namespace import RDF, RDFS
 from rdflib.plugins.sparql import prepareQuery
 import time
 import pprint
-from fuzzywuzzy import process
+from fuzzywuzzy import process, fuzz, utils
 from config import config
 pp = pprint.PrettyPrinter(indent=2)
 MIRBASE = Namespace("http://www.mirbase.org/")
 
 mirbasedic_path = "data/mirbase_dic.pickle"
 mirbasegraph_name = "mirbase.rdf"
+mirbasesnapshot_name = "mirbase_snapshot.pickle"
+# version of the contents of the snapshot, to rebuild snapshots made by older versions
+snapshot_version = 2
 if os.path.isfile(mirbasedic_path):
     logging.info("loading mirbase cache...")
     mirbasedic = pickle.load(open(mirbasedic_path, "rb"))
@@ -33,14 +37,220 @@ def exit_handler():
 
 atexit.register(exit_handler)
 
+
+def intr(values):
+    """utils.intr for arrays of non-negative numbers: round half up"""
+    return np.floor(values + 0.5)
+
+
+def partial_bound(common, length1, length2):
+    """
+    upper bound of fuzz.partial_ratio for strings with these lengths and number of characters in common; the
+    substrings of the longer string compared with the shorter string can be shorter at the end of the longer string
+    """
+    shorter = np.minimum(length1, length2)
+    common = np.minimum(common, shorter)
+    return intr(200.0 * common / np.maximum(shorter + common, 1))
+
+
+def joined_length(tokens):
+    """length of the tokens joined by spaces"""
+    if not tokens:
+        return 0
+    return sum(len(t) for t in tokens) + len(tokens) - 1
+
+
+class LabelIndex(object):
+    """
+    Index of the miRBase labels to find the label that process.extractOne would return for a query, without scoring
+    every label with fuzz.WRatio.
+    A score of 100 is only possible if the query and the label are the same after processing, so those are found in a
+    dictionary. Otherwise, lower and upper bounds of the score of every label are computed with numpy, from the
+    lengths, characters and tokens of the strings compared by each ratio of fuzz.WRatio, since two strings cannot have
+    more matching characters than they have in common. The labels are then scored by decreasing upper bound, until no
+    other label can beat the best one, or tie with it and come first in the list, which is how process.extractOne
+    breaks ties.
+    """
+    def __init__(self, labels):
+        """
+        :param labels: list of labels, in the order used by process.extractOne
+        """
+        self.labels = list(labels)
+        # label as processed by process.extract, which is then processed again by fuzz.WRatio
+        self.processed = [utils.full_process(label) for label in self.labels]
+        self.exact = {}
+        # token -> indexes of the labels with that token
+        self.tokens = {}
+        wratio_processed = []
+        for i, processed in enumerate(self.processed):
+            processed = utils.full_process(processed, force_ascii=True)
+            wratio_processed.append(processed)
+            if processed not in self.exact:
+                self.exact[processed] = i
+            for token in set(processed.split()):
+                self.tokens.setdefault(token, []).append(i)
+        self.tokens = dict((t, np.array(indexes)) for t, indexes in self.tokens.iteritems())
+        self.columns = dict((c, k) for k, c in enumerate(sorted(set("".join(wratio_processed)))))
+        self.char_counts = np.zeros((len(self.labels), len(self.columns)), dtype=np.int32)
+        for i, processed in enumerate(wratio_processed):
+            for c in processed:
+                self.char_counts[i, self.columns[c]] += 1
+        # lengths of the processed labels and of the strings compared by token_sort_ratio and token_set_ratio
+        self.lengths = np.array([len(p) for p in wratio_processed], dtype=np.float64)
+        self.sorted_lengths = np.array([joined_length(p.split()) for p in wratio_processed], dtype=np.float64)
+        self.set_lengths = np.array([joined_length(set(p.split())) for p in wratio_processed], dtype=np.float64)
+        self.max_length = int(self.lengths.max()) if self.labels else 0
+
+    def bounds(self, processed):
+        """
+        Lower and upper bounds of fuzz.WRatio for a processed query and each label
+        :return: two numpy arrays
+        """
+        tokens = processed.split()
+        length = len(processed)
+        sorted_length = joined_length(tokens)
+        set_length = joined_length(set(tokens))
+        query_counts = np.zeros(len(self.columns), dtype=np.int32)
+        for c in processed:
+            if c in self.columns:
+                query_counts[self.columns[c]] += 1
+        # characters in common, which bounds the matching characters of any two strings made from their characters
+        common = np.minimum(self.char_counts, query_counts).sum(axis=1)
+        # length of the tokens in common joined by spaces, 0 if there are none
+        sect_lengths = np.zeros(len(self.labels))
+        for token in set(tokens):
+            if token in self.tokens:
+                sect_lengths[self.tokens[token]] += len(token) + 1
+        intersection = sect_lengths > 0
+        sect_lengths = np.maximum(sect_lengths - 1, 0)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            lower, upper = self.ratio_bounds(length, sorted_length, set_length, common, sect_lengths, intersection)
+        # the score of an empty label is 0
+        return np.where(self.lengths > 0, lower, 0), np.where(self.lengths > 0, upper, 0)
+
+    def ratio_bounds(self, length, sorted_length, set_length, common, sect_lengths, intersection):
+        base = intr(200.0 * common / (length + self.lengths))
+        len_ratios = np.maximum(length, self.lengths) / np.minimum(length, self.lengths)
+        sorted_common = np.minimum(np.minimum(common, sorted_length), self.sorted_lengths)
+        set_common = np.minimum(np.minimum(common, set_length), self.set_lengths)
+        # token_sort_ratio and token_set_ratio, when len_ratio < 1.5
+        tsor = intr(200.0 * sorted_common / (sorted_length + self.sorted_lengths))
+        # the intersection is a prefix of both combined strings, so its ratios are exact
+        sect = intr(np.maximum(200.0 * sect_lengths / (sect_lengths + set_length),
+                               200.0 * sect_lengths / (sect_lengths + self.set_lengths)))
+        tser = np.maximum(intr(200.0 * set_common / (set_length + self.set_lengths)), sect)
+        lower = intr(sect * .95)
+        upper = intr(np.maximum(base, np.maximum(tsor * .95, tser * .95)))
+        # partial ratios, when len_ratio >= 1.5
+        partial_scale = np.where(len_ratios > 8, .6, .9)
+        partial = partial_bound(common, length, self.lengths)
+        ptsor = partial_bound(sorted_common, sorted_length, self.sorted_lengths)
+        # partial_ratio of the intersection and a combined string is 100
+        ptser = np.where(intersection, 100, partial_bound(set_common, set_length, self.set_lengths))
+        partial_lower = np.where(intersection, intr(100 * .95 * partial_scale), 0)
+        partial_upper = intr(np.maximum(np.maximum(base, partial * partial_scale),
+                                        np.maximum(ptsor * .95 * partial_scale, ptser * .95 * partial_scale)))
+        try_partial = len_ratios >= 1.5
+        lower = np.where(try_partial, partial_lower, lower)
+        upper = np.where(try_partial, partial_upper, upper)
+        return lower, upper
+
+    def extract_one(self, query):
+        """
+        :return: (label, score) of the best label for the query, like process.extractOne(query, labels)
+        """
+        if not self.labels:
+            return None
+        processed = utils.full_process(query, force_ascii=True)
+        if not processed:
+            return self.labels[0], 0
+        i = self.exact.get(processed)
+        # different strings only get a ratio that rounds to 100 if they have at least 200 characters together
+        if i is not None and len(processed) + self.max_length < 200:
+            return self.labels[i], 100
+        lower, upper = self.bounds(processed)
+        best, best_score = None, -1
+        # by decreasing upper bound, and then by order
+        for j in np.lexsort((np.arange(len(self.labels)), -upper)):
+            if upper[j] < best_score:
+                break
+            if upper[j] == best_score and j > best:
+                continue
+            if lower[j] == upper[j]:
+                score = int(lower[j])
+            else:
+                score = fuzz.WRatio(query, self.processed[j])
+            if score > best_score or (score == best_score and j < best):
+                best, best_score = j, score
+        return self.labels[best], best_score
+
+
 class MirbaseDB(object):
+    """
+    Human miRNAs of miRBase, stored as an rdflib graph.
+    The graph takes seconds to parse, so it is only loaded on the first call to map_label, and the data used to map
+    labels is loaded from a snapshot saved with pickle, which is created from the graph when it is missing or older
+    than the graph. The snapshot can be regenerated with the "snapshot" action of this module.
+    """
     def __init__(self, db_path):
         self.g = ConjunctiveGraph()
         self.path = db_path
         self.choices = set()
+        # label -> URI
         self.labels = {}
+        self.index = None
+        self.loaded = False
+
+    def load(self):
+        """
+        Load the snapshot or the graph, if it was not loaded yet
+        """
+        if self.loaded:
+            return
+        snapshot_path = self.path + mirbasesnapshot_name
+        graph_path = self.path + mirbasegraph_name
+        if os.path.isfile(snapshot_path) and (not os.path.isfile(graph_path) or
+                                              os.path.getmtime(snapshot_path) >= os.path.getmtime(graph_path)):
+            if self.load_snapshot():
+                return
+        self.load_graph()
+        if self.labels:
+            try:
+                self.save_snapshot()
+            except IOError as e:
+                logging.warning("could not save miRBase snapshot: {}".format(e))
+
+    def load_snapshot(self):
+        """
+        :return: True if the snapshot was loaded, False if it was made by another version
+        """
+        logging.info("Loading miRBase snapshot...")
+        with open(self.path + mirbasesnapshot_name, "rb") as f:
+            snapshot = pickle.load(f)
+        if snapshot.get("version") != snapshot_version:
+            logging.info("miRBase snapshot is from version {}, rebuilding".format(snapshot.get("version")))
+            return False
+        self.labels = dict((label, URIRef(uri)) for label, uri in snapshot["labels"].iteritems())
+        self.choices = snapshot["choices"]
+        self.index = snapshot["index"]
+        self.loaded = True
+        logging.info("loaded {} miRBase labels".format(len(self.labels)))
+        return True
+
+    def save_snapshot(self):
+        """
+        Save the labels and the label index, which are the only data of the graph used by map_label
+        """
+        snapshot = {"version": snapshot_version,
+                    "labels": dict((label, unicode(uri)) for label, uri in self.labels.iteritems()),
+                    "choices": self.choices, "index": self.index}
+        with open(self.path + mirbasesnapshot_name, "wb") as f:
+            pickle.dump(snapshot, f, pickle.HIGHEST_PROTOCOL)
+        logging.info("saved miRBase snapshot with {} labels".format(len(self.labels)))
 
     def create_graph(self):
+        # map_label is used to add the GO annotations
+        self.loaded = True
         self.g.open(self.path +  mirbasegraph_name, create=True)
         data = self.parse_mirbase(self.path)
         #g = ConjunctiveGraph(store="SPARQLUpdateStore")
@@ -69,6 +279,7 @@ class MirbaseDB(object):
                 self.g.add((mirna_instance, MIRBASE["stemloopOf"], mature_instance))
         self.get_label_to_acc()
         self.choices = self.labels.keys()
+        self.index = LabelIndex(self.choices)
         goa_data = self.parse_goa_gaf("data/goa_human_rna.gaf")
         for label in self.labels:
             if label in goa_data:
@@ -143,6 +354,11 @@ class MirbaseDB(object):
         # pp.pprint(mirna_dic)
         return mirna_dic
 
+    def extract_one(self, label):
+        if self.index is None:
+            return process.extractOne(label, self.choices)
+        return self.index.extract_one(label)
+
     def map_label(self, label):
         global mirbasedic
         result = ("", 0)
@@ -150,6 +366,7 @@ class MirbaseDB(object):
         if label in mirbasedic:
             result = mirbasedic[label]
         else:
+            self.load()
             new_label = label.lower()
             if new_label.startswith("h-"):
                 new_label = new_label[2:]
@@ -177,7 +394,7 @@ class MirbaseDB(object):
                 new_label = "hsa-mir-" + label
             elif label[0] == "-" and label[1:].isdigit():
                 new_label = "hsa-mir" + label
-            result = process.extractOne(new_label, self.choices)
+            result = self.extract_one(new_label)
             # print result
             # result = process.extract(label, choices, limit=3)
             print result
@@ -188,15 +405,15 @@ class MirbaseDB(object):
                 #     label += "a"
                 # else:
                 new_new_label = new_label + "-1"
-                revised_result = process.extractOne(new_new_label, self.choices)
+                revised_result = self.extract_one(new_new_label)
                 # logging.info(str(revised_result))
                 if revised_result[1] != 100:
                     new_new_label = new_label + "a"
-                    revised_result = process.extractOne(new_new_label, self.choices)
+                    revised_result = self.extract_one(new_new_label)
                     # logging.info(str(revised_result))
                     if revised_result[1] != 100:
                         new_new_label += "-1"
-                        revised_result2 = process.extractOne(new_new_label, self.choices)
+                        revised_result2 = self.extract_one(new_new_label)
                         # logging.info(str(revised_result2))
                         if revised_result2[1] > revised_result[1]:
                             revised_result = revised_result2
@@ -218,9 +435,11 @@ class MirbaseDB(object):
             # print "Opened graph with {} triples".format(len(self.g))
             self.get_label_to_acc()
             self.choices = self.labels.keys()
+            self.index = LabelIndex(self.choices)
             logging.info("done.")
         else:
             logging.info("miRBase graph not found")
+        self.loaded = True
 
     def get_label_to_acc(self):
         for subj, pred, obj in self.g.triples((None, RDFS.label, None)):
@@ -259,11 +478,15 @@ def main():
     if options.action == "create":
         mirbase.create_graph()
         mirbase.save_graph()
+        mirbase.save_snapshot()
+    elif options.action == "snapshot":
+        mirbase.load_graph()
+        mirbase.save_snapshot()
+    elif options.action == "map":
+        print mirbase.map_label(options.label)
     else:
         mirbase.load_graph()
-        if options.action == "map":
-            print mirbase.map_label(options.label)
-        elif options.action == "geturi":
+        if options.action == "geturi":
             q = prepareQuery('SELECT ?s WHERE { ?s rdfs:label ?label .}', initNs={"rdfs": RDFS })
             l = Literal(options.label)
             for row in mirbase.g.query(q, initBindings={'label': l}):
@@ -1,13 +1,14 @@
 import argparse
+import collections
 import logging
 import os
-import pickle
 import time
 
 import sys
 
 from config.corpus_paths import paths
 from config import config
+from classification.results import load_results
 from postprocessing import chebi_resolution
 from postprocessing.ssm import get_ssm
 
@@ -17,14 +18,14 @@ def normalize_entities(results, path, source):
     mapped = 0
     not_mapped = 0
     total_score = 0
-    for idid, did in enumerate(results.corpus):
-        logging.info("{}/{}".format(idid, len(results.corpus)))
-        for sid in results.corpus[did]:
-            for s in results.corpus[did][sid].elist:
+    for idid, did in enumerate(results.corpus.documents):
+        logging.info("{}/{}".format(idid, len(results.corpus.documents)))
+        for sentence in results.corpus.documents[did].sentences:
+            for s in sentence.entities.elist:
                 if s.startswith(source):
                     # if s != source:
                     #    logging.info("processing %s" % s)
-                    for entity in results.corpus[did][sid].elist[s]:
+                    for entity in sentence.entities.elist[s]:
                         entity.normalize()
                         if entity.normalized_score > 0:
                             mapped += 1
@@ -37,7 +38,7 @@ def normalize_entities(results, path, source):
         percentmapped = total_score / mapped
     print "{0} mapped, {1} not mapped, average score: {2}".format(mapped, not_mapped, percentmapped)
     print "saving results to %s" % path
-    pickle.dump(results, open(path, "wb"))
+    results.save(path)
 
 def add_chebi_mappings(results, path, source, save=True):
     """
@@ -51,15 +52,26 @@ def add_chebi_mappings(results, path, source, save=True):
     mapped = 0
     not_mapped = 0
     total_score = 0
-    for idid, did in enumerate(results.corpus):
-        logging.info("{}/{}".format(idid, len(results.corpus)))
-        for sid in results.corpus[did]:
-            for s in results.corpus[did][sid].elist:
+    texts = collections.OrderedDict()
+    for did in results.corpus.documents:
+        for sentence in results.corpus.documents[did].sentences:
+            for s in sentence.entities.elist:
                 if s.startswith(source):
                     #if s != source:
                     #    logging.info("processing %s" % s)
-                    for entity in results.corpus[did][sid].elist[s]:
-                        chebi_info = chebi_resolution.find_chebi_term3(entity.text.encode("utf-8"))
+                    for entity in sentence.entities.elist[s]:
+                        texts[entity.text.encode("utf-8")] = None
+    logging.info("mapping {} entity texts of {} documents".format(len(texts), len(results.corpus.documents)))
+    # the texts of every entity are resolved as one batch by the florchebi worker
+    chebi_infos = dict(zip(texts, chebi_resolution.find_chebi_terms(texts.keys())))
+    # the mappings are added while each document is referenced, so that the corpus keeps it until it is saved
+    for did in results.corpus.documents:
+        doc = results.corpus.documents[did]
+        for sentence in doc.sentences:
+            for s in sentence.entities.elist:
+                if s.startswith(source):
+                    for entity in sentence.entities.elist[s]:
+                        chebi_info = chebi_infos[entity.text.encode("utf-8")]
                         entity.chebi_id = chebi_info[0]
                         entity.chebi_name = chebi_info[1]
                         entity.chebi_score = chebi_info[2]
@@ -79,7 +91,7 @@ def add_chebi_mappings(results, path, source, save=True):
     logging.info("{0} mapped, {1} not mapped, average score: {2}".format(mapped, not_mapped, percentmapped))
     if save:
         logging.info("saving results to %s" % path)
-        pickle.dump(results, open(path, "wb"))
+        results.save(path)
     return results
 
 
@@ -97,21 +109,23 @@ def add_ssm_score(results, path, source, measure, ontology, save=True):
     # calculate similarity at the level of the document instead of sentence
     total = 0
     scores = 0
-    for did in results.corpus:
+    for did in results.corpus.documents:
         entities = {} # get all the entities from this document
-        for sid in results.corpus[did]:
-            for s in results.corpus[did][sid].elist:
+        sentences = {}
+        for sentence in results.corpus.documents[did].sentences:
+            sentences[sentence.sid] = sentence
+            for s in sentence.entities.elist:
                 if s.startswith(source):
                     if s not in entities:
                         entities[s] = []
-                    entities[s] += results.corpus[did][sid].elist[s]
+                    entities[s] += sentence.entities.elist[s]
 
         for s in entities: # get SS within the entities of this document
             entities_ssm = get_ssm(entities[s], measure, ontology)
             scores += sum([e.ssm_score for e in entities_ssm])
             for e in entities_ssm: # add SSM info to results
                 total += 1
-                for e2 in results.corpus[did][e.sid].elist[s]:
+                for e2 in sentences[e.sid].entities.elist[s]:
                     if e2.eid == e.eid:
                         e2.ssm_score = e.ssm_score
                         e2.ssm_best_text = e.ssm_best_text
@@ -130,7 +144,7 @@ def add_ssm_score(results, path, source, measure, ontology, save=True):
 
     if save:
         logging.info("saving results to %s" % path)
-        pickle.dump(results, open(path, "wb"))
+        results.save(path)
     return results
 
 
@@ -167,7 +181,7 @@ def main():
     logging.info("Processing action {0} on {1}".format(options.action, options.goldstd))
     logging.info("loading results %s" % options.results + ".pickle")
     if os.path.exists(options.results + ".pickle"):
-        results = pickle.load(open(options.results + ".pickle", 'rb'))
+        results = load_results(options.results + ".pickle", options.goldstd)
         results.path = options.results
     else:
         print "results not found"
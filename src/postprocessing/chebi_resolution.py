@@ -1,11 +1,13 @@
 #!/usr/bin/env python
 from __future__ import division, unicode_literals
-import MySQLdb
+import collections
 import re
 import sys
 import xml.etree.ElementTree as ET
 import os
 import shutil
+import threading
+import time
 from subprocess import Popen, PIPE
 from optparse import OptionParser
 import cPickle as pickle
@@ -15,8 +17,14 @@ import atexit
 from config.config import chebi_conn as db
 from config.config import florchebi_path
 from config.config import stoplist
+from chebi_base import ChebiIndex
 
 chebidic = "data/chebi_dic.pickle"
+# Nashorn script that keeps one florchebi JVM running for every term
+florchebi_worker_script = os.path.join(os.path.dirname(os.path.abspath(__file__)), "florchebi_worker.js")
+# arguments of FlorTextChebi3star after the text
+florchebi_args = ["children", "true", "mychebi201301", "false", "false", "chebi", stoplist, "1"]
+no_match = ('0', 'null', 0.0)
 
 if os.path.isfile(chebidic):
     logging.info("loading chebi...")
@@ -29,40 +37,40 @@ else:
     logging.info("new chebi dictionary")
 
 
+chebi_index = None
+
+
+def get_chebi_index():
+    """ChEBI names, synonyms and words, loaded from the database the first time a term is resolved"""
+    global chebi_index
+    if chebi_index is None:
+        logging.info("loading chebi index...")
+        chebi_index = ChebiIndex()
+        chebi_index.load(db)
+    return chebi_index
+
+
 def find_chebi_term(term, adjust=0):
     ''' returns tuple (chebiID, chebiTerm, score)
         if resolution fails, return ('0', 'null', 0.0)
     '''
     # print "TERM", term
-    term = MySQLdb.escape_string(term)
     # adjust - adjust the final score
     match = ()
-    cur = db.cursor()
+    index = get_chebi_index()
     # check for exact match
-    query = """SELECT distinct id, name
-                   FROM term a 
-                   WHERE name =%s and LENGTH(a.name)>0 and star=3;"""
-    # print "QUERY", query
-    cur.execute(query, (term,))
-
-    res = cur.fetchone()
+    res = index.find_name(term)
     if res is not None:
         # print "1"
         score = 1.0 + adjust
         match = (str(res[0]), res[1], score)
     else:
         # synonyms
-        cur.execute("""SELECT a.term_id, a.term_synonym, b.name
-                       FROM term_synonym a, term b
-                       WHERE a.term_synonym=%s
-                        and b.id=a.term_id
-                        and LENGTH(a.term_synonym)>0
-                        and star=3;""", (term,))
-        res = cur.fetchone()
+        res = index.find_synonym(term)
         if res is not None:
             # print "2"
             score = 0.8 + adjust
-            match = (str(res[0]), res[2], score)
+            match = (str(res[0]), res[1], score)
 
         else:
             # plural - tb pode ser recursivo
@@ -85,27 +93,10 @@ def find_chebi_term(term, adjust=0):
 
     if not match:
         # partial match
-
-        terms = '("' + '","'.join(term.split(" ")) + '")'
-        query = """ 
-        SELECT ((sum(d.ic)/ec)-0.1) as score, e.name, c.term_id, c.id,
-                group_concat(d.word separator ','), count(d.id), c.descriptor_type
-        FROM term e JOIN descriptor3 c ON(c.term_id=e.id) JOIN word2term3 b ON (b.descriptor_id=c.id) 
-             JOIN word3 d ON (d.id=b.word_id) JOIN SSM_TermDesc f ON (e.id=f.term_id)
-        WHERE b.word_id IN
-           (SELECT distinct id
-            FROM word3
-            WHERE word in %s)
-        GROUP by c.id 
-        ORDER by score desc 
-        LIMIT 3;""" % (terms,)
-        # print "QUERY3", query, adjust
-        cur.execute(query)
-        res = cur.fetchone()
-
+        res = index.find_partial(term.split(" "))
         if res is not None:
             # print "3"
-            match = (str(res[3]), res[1], float(res[0]))
+            match = (str(res[0]), res[1], float(res[2]))
             # print term, match
 
     if not match or match[2] < 0.0:
@@ -114,24 +105,168 @@ def find_chebi_term(term, adjust=0):
     return match
 
 
-def find_chebi_term2(term):
-    if _platform == "linux" or _platform == "linux2":
-        # linux
-        cp = "{0}/florchebi.jar:{0}/mysql-connector-java-5.1.24-bin.jar:{0}/Tokenizer.jar".format(florchebi_path)
-    elif _platform == "win32":
+def get_florchebi_classpath():
+    if _platform == "win32":
         # "Windows..."
-        cp = "{0}/florchebi.jar;{0}/mysql-connector-java-5.1.24-bin.jar;{0}/Tokenizer.jar".format(florchebi_path)
-    florcall = ["java", "-cp", cp, "xldb.flor.match.FlorTextChebi3star", db.escape_string(term),
-                "children", "true", "mychebi201301", "false", "false", "chebi", stoplist, "1"]
-    # print ' '.join(florcall)
-    flor = Popen(florcall, stdout=PIPE)
-    florresult, error = flor.communicate()
-    chebires = florresult.strip().split('\t')
+        return "{0}/florchebi.jar;{0}/mysql-connector-java-5.1.24-bin.jar;{0}/Tokenizer.jar".format(florchebi_path)
+    return "{0}/florchebi.jar:{0}/mysql-connector-java-5.1.24-bin.jar:{0}/Tokenizer.jar".format(florchebi_path)
+
+
+def parse_florchebi_output(output):
+    """
+    :param output: output of florchebi for one term
+    :return: (chebi id, chebi name, score)
+    """
+    chebires = output.strip().split('\t')
     # print "chebires: ", chebires
     if len(chebires) == 3:
         return (chebires[0], chebires[1], float(chebires[2]))
     else:
-        return ('0', 'null', 0.0)
+        return no_match
+
+
+def find_chebi_term2(term):
+    florcall = ["java", "-cp", get_florchebi_classpath(), "xldb.flor.match.FlorTextChebi3star",
+                db.escape_string(term)] + florchebi_args
+    # print ' '.join(florcall)
+    flor = Popen(florcall, stdout=PIPE)
+    florresult, error = flor.communicate()
+    return parse_florchebi_output(florresult)
+
+
+class FlorChebiError(Exception):
+    """The florchebi worker could not be started or exited too many times"""
+    pass
+
+
+class FlorChebiWorker(object):
+    """
+    florchebi JVM that resolves a stream of terms, so that the JVM, the stop words and the database connection are
+    loaded once instead of once per term, as in find_chebi_term2.
+    The JVM runs florchebi_worker.js with the Nashorn shell (jjs) of Java 8, which reads one term per line and writes
+    the matches of each term followed by an empty line. The terms of a batch are written by a thread while the
+    results are read, and the worker is restarted if it exits, skipping a term if it exits twice with that term.
+    """
+    def __init__(self, max_restarts=3):
+        self.process = None
+        self.lock = threading.Lock()
+        self.max_restarts = max_restarts
+        self.starts = 0
+
+    def get_args(self):
+        return ["jjs", "-J-Dfile.encoding=UTF-8", "-cp", get_florchebi_classpath(), florchebi_worker_script,
+                "--"] + florchebi_args
+
+    def start(self):
+        args = self.get_args()
+        logging.info(" ".join(args))
+        try:
+            self.process = Popen(args, stdin=PIPE, stdout=PIPE, stderr=PIPE)
+        except OSError as e:
+            raise FlorChebiError("could not start florchebi worker: {}".format(e))
+        self.starts += 1
+        reader = threading.Thread(target=self.read_stderr, args=(self.process,), name="florchebi-stderr")
+        reader.daemon = True
+        reader.start()
+
+    def read_stderr(self, process):
+        """Log the output of the JVM until it exits, so that the pipe does not fill up"""
+        for line in iter(process.stderr.readline, b""):
+            logging.debug("florchebi: {}".format(line.strip()))
+        process.stderr.close()
+
+    def is_alive(self):
+        return self.process is not None and self.process.poll() is None
+
+    def stop(self, timeout=10):
+        """Close the input of the JVM, which makes it exit, and kill it if it does not exit after timeout seconds"""
+        if not self.is_alive():
+            return
+        self.process.stdin.close()
+        end_time = time.time() + timeout
+        while self.process.poll() is None and time.time() < end_time:
+            time.sleep(0.1)
+        if self.process.poll() is None:
+            self.process.kill()
+            self.process.wait()
+
+    def write_terms(self, process, terms):
+        try:
+            for term in terms:
+                # one term per line; the terms are escaped because florchebi adds them to SQL queries
+                process.stdin.write(db.escape_string(term).replace(b"\n", b" ").replace(b"\r", b" ") + b"\n")
+            process.stdin.flush()
+        except (IOError, OSError, ValueError):
+            # the process exited, which is found when reading its output
+            pass
+
+    def read_result(self, process):
+        """
+        Read the output of one term
+        :return: (chebi id, chebi name, score), or None if the process exited
+        """
+        lines = []
+        while True:
+            line = process.stdout.readline()
+            if not line:
+                return None
+            line = line.rstrip(b"\r\n")
+            if not line:
+                break
+            lines.append(line)
+        if lines and lines[0].startswith(b"error\t"):
+            logging.warning("florchebi error: {}".format(lines[0].decode("utf-8", "replace")))
+            return no_match
+        # only the best match, as find_chebi_term2
+        return parse_florchebi_output(lines[0] if lines else b"")
+
+    def resolve(self, terms):
+        """
+        Resolve a batch of terms
+        :param terms: list of terms encoded in UTF-8
+        :return: list of (chebi id, chebi name, score) of each term, ('0', 'null', 0.0) if nothing was found
+        """
+        results = []
+        # exits of the worker without resolving any term
+        exits = 0
+        with self.lock:
+            while len(results) < len(terms):
+                if not self.is_alive():
+                    self.start()
+                pending = terms[len(results):]
+                process = self.process
+                writer = threading.Thread(target=self.write_terms, args=(process, pending), name="florchebi-input")
+                writer.daemon = True
+                writer.start()
+                for term in pending:
+                    result = self.read_result(process)
+                    if result is None:
+                        break
+                    results.append(result)
+                    exits = 0
+                writer.join()
+                if len(results) == len(terms):
+                    break
+                process.wait()
+                exits += 1
+                logging.warning("florchebi worker exited with code {} on {}".format(
+                    process.returncode, terms[len(results)].decode("utf-8", "replace")))
+                if exits > self.max_restarts:
+                    raise FlorChebiError("florchebi worker exited {} times".format(exits))
+                if exits >= 2:
+                    # skip the term, which may be the reason why the worker exits
+                    results.append(no_match)
+        return results
+
+
+florchebi_worker = None
+
+
+def get_florchebi_worker():
+    global florchebi_worker
+    if florchebi_worker is None:
+        florchebi_worker = FlorChebiWorker()
+    return florchebi_worker
 
 
 def get_IC():
@@ -147,18 +282,38 @@ def get_IC():
 
 
 def find_chebi_term3(term):
+    return find_chebi_terms([term])[0]
+
+
+def find_chebi_terms(terms):
+    """
+    Map a batch of terms to ChEBI, resolving the terms that are not in the chebi dictionary with the florchebi worker
+    :param terms: list of terms encoded in UTF-8
+    :return: list of (chebi id, chebi name, score)
+    """
     global chebi
     # first check if a chebi mappings dictionary is loaded in memory
-    if term in chebi:
-        c = chebi[term]
-        # chebi mappings are not loaded, or this text is not mapped yet, so update chebi dictionary
-    else:
-        c = find_chebi_term2(term)
-        chebi[term] = c
-        logging.info("mapped %s to %s", term.decode("utf-8"), c)
-    return c
+    missing_set = set()
+    missing = []
+    for term in terms:
+        if term not in chebi and term not in missing_set:
+            missing.append(term)
+            missing_set.add(term)
+    if missing:
+        # chebi mappings are not loaded, or these texts are not mapped yet, so update chebi dictionary
+        try:
+            mapped = get_florchebi_worker().resolve(missing)
+        except FlorChebiError as e:
+            logging.warning("{}, starting florchebi for each term".format(e))
+            mapped = [find_chebi_term2(term) for term in missing]
+        for term, c in zip(missing, mapped):
+            chebi[term] = c
+            logging.info("mapped %s to %s", term.decode("utf-8"), c)
+    return [chebi[term] for term in terms]
 
 def exit_handler():
+    if florchebi_worker is not None:
+        florchebi_worker.stop()
     logging.info('Saving chebi dictionary...!')
     pickle.dump(chebi, open(chebidic, "wb"))
 
@@ -268,6 +423,7 @@ def add_chebi_mappings(results, source):
     mapped = 0
     not_mapped = 0
     total_score = 0
+    texts = collections.OrderedDict()
     for did in results.corpus.documents:
         for sentence in results.corpus.documents[did].sentences:
             for s in sentence.entities.elist:
@@ -275,7 +431,17 @@ def add_chebi_mappings(results, source):
                     #if s != source:
                     #    logging.info("processing %s" % s)
                     for entity in sentence.entities.elist[s]:
-                        chebi_info = find_chebi_term3(entity.text.encode("utf-8"))
+                        texts[entity.text.encode("utf-8")] = None
+    # the texts of every entity are resolved as one batch
+    chebi_infos = dict(zip(texts, find_chebi_terms(texts.keys())))
+    # the mappings are added while each document is referenced, so that the corpus keeps it until it is saved
+    for did in results.corpus.documents:
+        doc = results.corpus.documents[did]
+        for sentence in doc.sentences:
+            for s in sentence.entities.elist:
+                if s.startswith(source):
+                    for entity in sentence.entities.elist[s]:
+                        chebi_info = chebi_infos[entity.text.encode("utf-8")]
                         entity.chebi_id = chebi_info[0]
                         entity.chebi_name = chebi_info[1]
                         entity.chebi_score = chebi_info[2]
@@ -374,11 +540,10 @@ def main():
                                     f + '-with-chebi.txt' not in files and not os.path.isdir(dir + '/' + f):
                 print dir + '/' + f
                 with open(dir + '/' + f, 'r') as predfile:
-                    for line in predfile:
-                        tsv = line.strip().split('\t')
-                        chebires = find_chebi_term3(tsv[3])
-                        lines.append(
-                            '\t'.join(tsv[:4]) + '\t' + chebires[0] + '\t' + str(chebires[2]) + '\n')
+                    tsvs = [line.strip().split('\t') for line in predfile]
+                for tsv, chebires in zip(tsvs, find_chebi_terms([tsv[3] for tsv in tsvs])):
+                    lines.append(
+                        '\t'.join(tsv[:4]) + '\t' + chebires[0] + '\t' + str(chebires[2]) + '\n')
                 with open(dir + '/' + f + '-with-chebi.txt', 'w') as chebifile:
                     for line in lines:
                         chebifile.write(line)
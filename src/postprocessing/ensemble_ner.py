@@ -1,5 +1,3 @@
-import unicodedata
-
 __author__ = 'Andre'
 from sklearn import ensemble
 from sklearn.pipeline import Pipeline
@@ -9,31 +7,10 @@ import os
 import cPickle as pickle
 import atexit
 
+from classification.ner import wordshape
 from text.chemical_entity import chem_words
 
-
-def word_case(word):
-    if word.islower():
-        case = 0
-    elif word.isupper():
-        case = 1
-    elif word.istitle():
-        case = 2
-    else:
-        case = 3
-    return case
-
-
-def has_greek_symbol(word):
-    for c in word:
-        #print c
-        try:
-            if 'GREEK' in unicodedata.name(c):
-                hasgreek = 'HASGREEK'
-                return 1
-        except ValueError:
-            return 0
-    return 0
+case_values = {"LOWERCASE": 0, "UPPERCASE": 1, "TITLECASE": 2, "MIXEDCASE": 3}
 
 
 class EnsembleNER(object):
@@ -106,14 +83,14 @@ class EnsembleNER(object):
                     #chebi score
                     vector.append(entity.chebi_score)
                     if "case" in self.feature_names:
-                        vector.append(word_case(entity.text))
+                        vector.append(case_values[wordshape.word_case(entity.text)])
                     if "number" in self.feature_names:
-                        if any(c.isdigit() for c in entity.text):
+                        if wordshape.has_number(entity.text):
                             vector.append(1)
                         else:
                             vector.append(0)
                     if "greek" in self.feature_names:
-                        vector.append(has_greek_symbol(entity.text))
+                        vector.append(int(wordshape.has_greek_symbol(entity.text)))
                     if "dashes" in self.feature_names:
                         vector.append(entity.text.count("-"))
                     if "commas" in self.feature_names:
@@ -145,6 +122,7 @@ class EnsembleNER(object):
 
         logging.info("0: %s; 1: %s", len([x for x in self.labels if x == 0]),
                      len([x for x in self.labels if x == 1]))
+        wordshape.log_stats()
         #print ids
         #print [i for i in ids if i[0] == "21826085"]
         #print [g for g in goldset if g[0] == "21826085"]
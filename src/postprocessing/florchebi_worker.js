@@ -0,0 +1,44 @@
+/*
+ * Persistent florchebi process, run with the Nashorn shell of Java 8:
+ * jjs -cp <florchebi classpath> florchebi_worker.js -- icType synonyms ontology useLemmas startstop tokenizer stoplist k
+ * The arguments are the same as xldb.flor.match.FlorTextChebi3star, without the text.
+ * Reads one term per line from stdin and writes the matches of each term to stdout, one per line with the id, name
+ * and score separated by tabs, followed by an empty line. Errors are written as a line starting with "error\t".
+ * The database connection and the stop words are loaded once and shared by every term.
+ */
+var FlorTextChebi3star = Java.type("xldb.flor.match.FlorTextChebi3star");
+var ProcessTerms = Java.type("xldb.flor.ontology_vocabulary.ProcessTerms");
+var Database = Java.type("xldb.tools.Database");
+var System = Java.type("java.lang.System");
+
+var icType = arguments[0];
+var synonyms = arguments[1] == "true";
+var ontology = arguments[2];
+var useLemmas = arguments[3] == "true";
+var startstop = arguments[4] == "true";
+var tokenizer = arguments[5];
+var stopwords = ProcessTerms.getStopWords(arguments[6]);
+var k = parseInt(arguments[7]);
+var db = new Database(ontology);
+
+// only the results are written to stdout; anything printed by florchebi goes to stderr
+var out = new java.io.PrintWriter(new java.io.OutputStreamWriter(System.out, "UTF-8"));
+System.setOut(System.err);
+var input = new java.io.BufferedReader(new java.io.InputStreamReader(System.in, "UTF-8"));
+
+var line;
+while ((line = input.readLine()) !== null) {
+    try {
+        var flor = new FlorTextChebi3star(line, icType, synonyms, stopwords, db, ontology, useLemmas, startstop,
+                                          tokenizer);
+        var matches = flor.matchAll(k);
+        for (var i = 0; i < matches.length; i++) {
+            out.println(matches[i].getTerm().getId() + "\t" + matches[i].getTerm().getName() + "\t" +
+                        matches[i].getScore());
+        }
+    } catch (e) {
+        out.println("error\t" + String(e).replace(/[\t\r\n]+/g, " "));
+    }
+    out.println();
+    out.flush();
+}
@@ -17,7 +17,6 @@ class TransmirCorpus(PubmedCorpus):
     """
     def __init__(self, corpusdir, **kwargs):
         self.mirbase = MirbaseDB(config.mirbase_path)
-        self.mirbase.load_graph()
         self.mirnas = {}
         self.tfs = {}
         self.pairs = {}
@@ -18,15 +18,9 @@ class AIMedCorpus(Corpus):
 
     def load_corpus(self, corenlpserver, process=True):
         trainfiles = [self.path + '/' + f for f in os.listdir(self.path)]
-        total = len(trainfiles)
-        widgets = [pb.Percentage(), ' ', pb.Bar(), ' ', pb.AdaptiveETA(), ' ', pb.Timer()]
-        pbar = pb.ProgressBar(widgets=widgets, maxval=total, redirect_stdout=True).start()
-        time_per_abs = []
-        for current, f in enumerate(trainfiles):
-            #logging.debug('%s:%s/%s', f, current + 1, total)
-            print '{}:{}/{}'.format(f, current + 1, total)
+        docs = []
+        for f in trainfiles:
             did = f
-            t = time.time()
             with open(f, 'r') as f:
                 article = "<Article>" + f.read() +  "</Article>"
             soup = BeautifulSoup(article, 'xml')
@@ -36,17 +30,8 @@ class AIMedCorpus(Corpus):
             doc_text = title + " " + abstract
 
             newdoc = Document(doc_text, process=False, did=did)
-            newdoc.sentence_tokenize("biomedical")
-            newdoc.process_document(corenlpserver, "biomedical")
-            #logging.info(len(newdoc.sentences))
-            self.documents[newdoc.did] = newdoc
-            abs_time = time.time() - t
-            time_per_abs.append(abs_time)
-            logging.debug("%s sentences, %ss processing time" % (len(newdoc.sentences), abs_time))
-            pbar.update(current)
-        pbar.finish()
-        abs_avg = sum(time_per_abs)*1.0/len(time_per_abs)
-        logging.info("average time per abstract: %ss" % abs_avg)
+            docs.append(newdoc)
+        self.process_documents(docs, corenlpserver, process)
 
 
     def load_annotations(self, ann_dir, etype, ptype):
@@ -22,12 +22,8 @@ class BC2GMCorpus(Corpus):
         super(BC2GMCorpus, self).__init__(corpusdir, **kwargs)
 
     def load_corpus(self, corenlpserver, process=True):
-        total_lines = sum(1 for line in open(self.path))
-        widgets = [pb.Percentage(), ' ', pb.Bar(), ' ', pb.AdaptiveETA(), ' ', pb.Timer()]
-        pbar = pb.ProgressBar(widgets=widgets, maxval=total_lines, redirect_stdout=True).start()
-        time_per_abs = []
+        docs = []
         with codecs.open(self.path, 'r', "utf-8") as trainfile:
-            current = 0
             for line in trainfile:
                 #logging.debug('%s:%s/%s', f, current + 1, total)
                 x = line.strip().split(" ")
@@ -37,17 +33,8 @@ class BC2GMCorpus(Corpus):
                 #newdoc.sentence_tokenize("biomedical")
                 sid = did + ".s0"
                 newdoc.sentences.append(Sentence(doctext, offset=0, sid=sid, did=did))
-                if process:
-                    newdoc.process_document(corenlpserver, "biomedical")
-                self.documents[newdoc.did] = newdoc
-                # abs_time = time.time() - t
-                # time_per_abs.append(abs_time)
-                #logging.info("%s sentences, %ss processing time" % (len(newdoc.sentences), abs_time))
-                pbar.update(current+1)
-                current += 1
-        pbar.finish()
-        # abs_avg = sum(time_per_abs)*1.0/len(time_per_abs)
-        # logging.info("average time per abstract: %ss" % abs_avg)
+                docs.append(newdoc)
+        self.process_documents(docs, corenlpserver, process)
 
     def load_annotations(self, ann_dir, etype, pairtype="all"):
         pmids = []
@@ -33,29 +33,14 @@ class BratCorpus(Corpus):
     def load_corpus(self, corenlpserver, process=True):
         # self.path is the base directory of the files of this corpus
         trainfiles = [self.path + '/' + f for f in os.listdir(self.path) if f.endswith('.txt')]
-        total = len(trainfiles)
-        widgets = [pb.Percentage(), ' ', pb.Bar(), ' ', pb.AdaptiveETA(), ' ', pb.Timer()]
-        pbar = pb.ProgressBar(widgets=widgets, maxval=total, redirect_stdout=True).start()
-        time_per_abs = []
-        for current, f in enumerate(trainfiles):
-            #logging.debug('%s:%s/%s', f, current + 1, total)
-            print '{}:{}/{}'.format(f, current + 1, total)
+        docs = []
+        for f in trainfiles:
             did = f.split(".")[0].split("/")[-1]
-            t = time.time()
             with io.open(f, 'r', encoding='utf8') as txt:
                 doctext = txt.read()
             newdoc = Document(doctext, process=False, did=did)
-            newdoc.sentence_tokenize("biomedical")
-            if process:
-                newdoc.process_document(corenlpserver, "biomedical")
-            self.documents[newdoc.did] = newdoc
-            abs_time = time.time() - t
-            time_per_abs.append(abs_time)
-            #logging.info("%s sentences, %ss processing time" % (len(newdoc.sentences), abs_time))
-            pbar.update(current+1)
-        pbar.finish()
-        abs_avg = sum(time_per_abs)*1.0/len(time_per_abs)
-        logging.info("average time per abstract: %ss" % abs_avg)
+            docs.append(newdoc)
+        self.process_documents(docs, corenlpserver, process)
 
     def load_annotations(self, ann_dir, etype, pairtype="all"):
         self.clear_annotations()
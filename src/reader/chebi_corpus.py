@@ -36,17 +36,11 @@ class ChebiCorpus(Corpus):
                     sents.append((sid, p))
         return sents
 
-    def load_corpus(self, corenlpserver):
+    def load_corpus(self, corenlpserver, process=True):
         docs = self.get_docs(self.path)
-        total = len(docs)
-        current = 0
-        time_per_abs = []
-        ts = set()
+        newdocs = []
         for f in docs:
-            logging.debug('%s:%s/%s', f[0], current + 1, total)
-            current += 1
             #parse DDI corpus file
-            t = time.time()
             #print root.tag
             docid = f[0] # TODO: actually each paragraph should be it's own documents, that should help offset issues
             doctext = ""
@@ -68,19 +62,10 @@ class ChebiCorpus(Corpus):
                 doc_offset = len(doctext)
                 #doc_sentences.append(this_sentence)
                     #logging.info(len(doc_sentences))
-            newdoc = Document(doctext, process=False, did=docid, ssplit=True)
+            newdoc = Document(doctext, process=False, did=docid)
             #newdoc.sentences = doc_sentences[:]
-            newdoc.process_document(corenlpserver, "biomedical")
-            #logging.info(len(newdoc.sentences))
-            self.documents[newdoc.did] = newdoc
-            #for s in self.documents[newdoc.did].sentences:
-            #    logging.debug("sentence {} has {} tokens".format(s.sid, len(s.tokens)))
-            #    logging.debug([(t.start, t.end) for t in s.tokens])
-            abs_time = time.time() - t
-            time_per_abs.append(abs_time)
-            logging.info("%s sentences, %ss processing time" % (len(newdoc.sentences), abs_time))
-        abs_avg = sum(time_per_abs)*1.0/len(time_per_abs)
-        logging.info("average time per abstract: %ss" % abs_avg)
+            newdocs.append(newdoc)
+        self.process_documents(newdocs, corenlpserver, process)
 
     def load_annotations(self, ann_dir, entitytype="chemical"):
         docs = self.get_docs(ann_dir)
@@ -10,7 +10,7 @@ import progressbar as pb
 from subprocess import check_output
 
 import config.corpus_paths
-from text.corpus import Corpus
+from text.corpus import Corpus, open_corpus
 from text.document import Document
 from config import config
 
@@ -23,31 +23,17 @@ class ChemdnerCorpus(Corpus):
     def load_corpus(self, corenlpserver, process=True):
         """Load the CHEMDNER corpus file on the dir element"""
         # open filename and parse lines
-        total_lines = sum(1 for line in open(self.path))
-        widgets = [pb.Percentage(), ' ', pb.Bar(), ' ', pb.ETA(), ' ', pb.Timer()]
-        pbar = pb.ProgressBar(widgets=widgets, maxval=total_lines).start()
-        n_lines = 1
-        time_per_abs = []
+        docs = []
         with io.open(self.path, 'r', encoding="utf-8") as inputfile:
             for line in inputfile:
-                t = time.time()
                 # each line is PMID  title   abs
                 tsv = line.split('\t')
                 doctext = tsv[1].strip().replace("<", "(").replace(">", ")").replace(". ", ", ") + ". "
                 doctext += tsv[2].strip().replace("<", "(").replace(">", ")")
                 newdoc = Document(doctext, process=False,
                                   did=tsv[0], title=tsv[1].strip() + ".")
-                newdoc.sentence_tokenize("biomedical")
-                if process:
-                    newdoc.process_document(corenlpserver, "biomedical")
-                self.documents[newdoc.did] = newdoc
-                abs_time = time.time() - t
-                time_per_abs.append(abs_time)
-                pbar.update(n_lines)
-                n_lines += 1
-        pbar.finish()
-        abs_avg = sum(time_per_abs)*1.0/len(time_per_abs)
-        logging.info("average time per abstract: %ss" % abs_avg)
+                docs.append(newdoc)
+        self.process_documents(docs, corenlpserver, process)
 
     def load_annotations(self, ann_dir, entitytype="chemical", pairtype=None):
         # total_lines = sum(1 for line in open(ann_dir))
@@ -199,9 +185,9 @@ considered when coadministering with megestrol acetate.''',
             if options.goldstd == "chemdner_traindev":
                 # merge chemdner_train and chemdner_dev
                 tpath = config.corpus_paths.paths["chemdner_train"]["corpus"]
-                tcorpus = pickle.load(open(tpath, 'rb'))
+                tcorpus = open_corpus(tpath)
                 dpath = config.corpus_paths.paths["chemdner_dev"]["corpus"]
-                dcorpus = pickle.load(open(dpath, 'rb'))
+                dcorpus = open_corpus(dpath)
                 corpus.documents.update(tcorpus.documents)
                 corpus.documents.update(dcorpus.documents)
             elif options.goldstd == "cemp_test_divide":
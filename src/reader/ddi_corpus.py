@@ -20,18 +20,13 @@ class DDICorpus(Corpus):
         super(DDICorpus, self).__init__(corpusdir, **kwargs)
         self.subtypes = ["drug", "group", "brand", "drug_n"]
 
-    def load_corpus(self, corenlpserver):
+    def load_corpus(self, corenlpserver, process=True):
         # self.path is the base directory of the files of this corpus
         trainfiles = [self.path + '/' + f for f in os.listdir(self.path) if f.endswith('.xml')]
-        total = len(trainfiles)
-        current = 0
-        time_per_abs = []
+        docs = []
         for f in trainfiles:
-            logging.debug('%s:%s/%s', f, current + 1, total)
-            current += 1
             with open(f, 'r') as xml:
                 #parse DDI corpus file
-                t = time.time()
                 root = ET.fromstring(xml.read())
                 doctext = ""
                 did = root.get('id')
@@ -49,14 +44,8 @@ class DDICorpus(Corpus):
                 #logging.info(len(doc_sentences))
                 newdoc = Document(doctext, process=False, did=did)
                 newdoc.sentences = doc_sentences[:]
-                newdoc.process_document(corenlpserver, "biomedical")
-                #logging.info(len(newdoc.sentences))
-                self.documents[newdoc.did] = newdoc
-                abs_time = time.time() - t
-                time_per_abs.append(abs_time)
-                logging.info("%s sentences, %ss processing time" % (len(newdoc.sentences), abs_time))
-        abs_avg = sum(time_per_abs)*1.0/len(time_per_abs)
-        logging.info("average time per abstract: %ss" % abs_avg)
+                docs.append(newdoc)
+        self.process_documents(docs, corenlpserver, process)
 
     def getOffsets(self, offset):
         # check if its just one offset per entity or not
@@ -3,6 +3,7 @@ import logging
 import pickle
 
 from chemdner_corpus import ChemdnerCorpus
+from text.corpus import open_corpus
 
 
 class GproCorpus(ChemdnerCorpus):
@@ -20,7 +21,7 @@ class GproCorpus(ChemdnerCorpus):
         """
         ps = self.path.split("/")
         cemp_path = "data/chemdner_" + "_".join(ps[-1].split("_")[1:]) + ".pickle"
-        corpus = pickle.load(open(cemp_path, 'rb'))
+        corpus = open_corpus(cemp_path)
         self.documents = corpus.documents
 
     def load_annotations(self, ann_dir, etype="protein"):
@@ -29,6 +29,7 @@ class JNLPBACorpus(Corpus):
                 pass
         print nlines
         pbar = pb.ProgressBar(widgets=widgets, maxval=nlines).start()
+        docs = []
         with codecs.open(self.path, 'r', "utf-8") as corpusfile:
             doc_text = ""
             sentences = []
@@ -38,9 +39,7 @@ class JNLPBACorpus(Corpus):
                         logging.debug("creating document: {}".format(doc_text))
                         newdoc = Document(doc_text, process=False, did=did)
                         newdoc.sentences = sentences[:]
-                        newdoc.process_document(corenlpserver, "biomedical")
-                        # logging.info(len(newdoc.sentences))
-                        self.documents[newdoc.did] = newdoc
+                        docs.append(newdoc)
                         doc_text = ""
                     did = "JNLPBA" + l.strip().split(":")[-1]
                     logging.debug("starting new document:" + did)
@@ -58,9 +57,7 @@ class JNLPBACorpus(Corpus):
                         logging.debug("creating document: {}".format(doc_text))
                         newdoc = Document(doc_text, process=False, did=did)
                         newdoc.sentences = sentences[:]
-                        newdoc.process_document(corenlpserver, "biomedical")
-                        # logging.info(len(newdoc.sentences))
-                        self.documents[newdoc.did] = newdoc
+                        docs.append(newdoc)
                         doc_text = ""
                     # start new sentence
                     sentence_text = ""
@@ -73,6 +70,7 @@ class JNLPBACorpus(Corpus):
                     sentence_text += t[0]
                 pbar.update(i)
             pbar.finish()
+        self.process_documents(docs, corenlpserver, process)
 
     def load_annotations(self, ann_dir, etype, ptype):
         added = True
@@ -21,11 +21,8 @@ class LLLCorpus(Corpus):
         self.pmid_list = []
 
     def load_corpus(self, corenlpserver, process=True):
-        total_lines = sum(1 for line in open(self.path))
-        time_per_abs = []
+        docs = []
         with codecs.open(self.path, 'r', "utf-8") as trainfile:
-            current = 0
-            ddi = ""
             for line in trainfile:
                 #logging.debug('%s:%s/%s', f, current + 1, total)
                 if line.startswith("ID"):
@@ -36,15 +33,8 @@ class LLLCorpus(Corpus):
                     newdoc = Document(doctext, process=False, did=did)
                     sid = did + ".s0"
                     newdoc.sentences.append(Sentence(doctext, offset=0, sid=sid, did=did))
-                    if process:
-                        newdoc.process_document(corenlpserver)
-                    self.documents[newdoc.did] = newdoc
-                    # abs_time = time.time() - t
-                    # time_per_abs.append(abs_time)
-                    #logging.info("%s sentences, %ss processing time" % (len(newdoc.sentences), abs_time))
-
-        # abs_avg = sum(time_per_abs)*1.0/len(time_per_abs)
-        # logging.info("average time per abstract: %ss" % abs_avg)
+                    docs.append(newdoc)
+        self.process_documents(docs, corenlpserver, process)
 
     def load_annotations(self, ann_dir, etype, pairtype="all"):
         pmids = []
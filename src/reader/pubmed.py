@@ -26,7 +26,8 @@ class PubmedDocument(Document):
         if self.pmcid:
             print "pmc", self.pmcid
             self.get_pmc_captions()
-        super(PubmedDocument, self).__init__(title + "\n" + abstract, ssplit=True, title=title,
+        kwargs.setdefault("ssplit", True)
+        super(PubmedDocument, self).__init__(title + "\n" + abstract, title=title,
                                              did="PMID" + pmid, **kwargs)
 
     def get_pubmed_abs(self, pmid):
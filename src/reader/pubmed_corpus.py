@@ -19,20 +19,15 @@ class PubmedCorpus(Corpus):
         :param process:
         :return:
         """
-        time_per_abs = []
+        docs = []
         widgets = [pb.Percentage(), ' ', pb.Bar(), ' ', pb.AdaptiveETA(), ' ', pb.Timer()]
         pbar = pb.ProgressBar(widgets=widgets, maxval=len(self.pmids), redirect_stdout=True).start()
         for i, pmid in enumerate(self.pmids):
-            t = time.time()
-            newdoc = PubmedDocument(pmid)
+            newdoc = PubmedDocument(pmid, ssplit=False)
             if newdoc.abstract == "":
                 logging.info("ignored {} due to the fact that no abstract was found".format(pmid))
                 continue
-            newdoc.process_document(corenlpserver, "biomedical")
-            self.documents["PMID" + pmid] = newdoc
-            abs_time = time.time() - t
-            time_per_abs.append(abs_time)
+            docs.append(newdoc)
             pbar.update(i+1)
         pbar.finish()
-        abs_avg = sum(time_per_abs)*1.0/len(time_per_abs)
-        logging.info("average time per abstract: %ss" % abs_avg)
\ No newline at end of file
+        self.process_documents(docs, corenlpserver, process)
\ No newline at end of file
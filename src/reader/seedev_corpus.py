@@ -27,7 +27,7 @@ from sklearn.svm import LinearSVC
 
 from config.seedev_types import ds_pair_types, all_entity_groups, all_entity_types, pair_types
 from config import config
-from text.corpus import Corpus
+from text.corpus import Corpus, open_corpus
 from text.document import Document
 from text.sentence import Sentence
 
@@ -58,30 +58,15 @@ class SeeDevCorpus(Corpus):
     def load_corpus(self, corenlpserver, process=True):
         # self.path is the base directory of the files of this corpus
         trainfiles = [self.path + '/' + f for f in os.listdir(self.path) if f.endswith('.txt')]
-        total = len(trainfiles)
-        widgets = [pb.Percentage(), ' ', pb.Bar(), ' ', pb.AdaptiveETA(), ' ', pb.Timer()]
-        pbar = pb.ProgressBar(widgets=widgets, maxval=total, redirect_stdout=True).start()
-        time_per_abs = []
-        for current, f in enumerate(trainfiles):
-            #logging.debug('%s:%s/%s', f, current + 1, total)
-            print '{}:{}/{}'.format(f, current + 1, total)
+        docs = []
+        for f in trainfiles:
             did = f.split(".")[0].split("/")[-1]
-            t = time.time()
             with codecs.open(f, 'r', 'utf-8') as txt:
                 doctext = txt.read()
             doctext = doctext.replace("\n", " ")
             newdoc = Document(doctext, process=False, did=did)
-            newdoc.sentence_tokenize("biomedical")
-            if process:
-                newdoc.process_document(corenlpserver, "biomedical")
-            self.documents[newdoc.did] = newdoc
-            abs_time = time.time() - t
-            time_per_abs.append(abs_time)
-            #logging.info("%s sentences, %ss processing time" % (len(newdoc.sentences), abs_time))
-            pbar.update(current+1)
-        pbar.finish()
-        abs_avg = sum(time_per_abs)*1.0/len(time_per_abs)
-        logging.info("average time per abstract: %ss" % abs_avg)
+            docs.append(newdoc)
+        self.process_documents(docs, corenlpserver, process)
 
     def load_annotations(self, ann_dir, etype, pairtype="all"):
         self.clear_annotations("all")
@@ -368,7 +353,7 @@ class SeeDevCorpus(Corpus):
         for did in self.documents:
             nsentences += len(self.documents[did].sentences)
         print "base corpus has {} sentences".format(nsentences)
-        corpus2 = pickle.load(open(corpuspath, 'rb'))
+        corpus2 = open_corpus(corpuspath)
         nsentences = 0
         for did in corpus2.documents:
             if did in self.documents:
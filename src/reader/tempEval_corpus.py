@@ -33,11 +33,15 @@ class TempEvalCorpus(Corpus):
         
 #         if more than one file:
         trainfiles = [self.path + f for f in os.listdir(self.path) if not f.endswith('~')] # opens all files in folder (see config file)
+        docs = []
         for openfile in trainfiles:
             print("file: "+openfile)
             with open(openfile, 'r') as inputfile:
                 newdoc = Document(inputfile.read(), process=False, did=os.path.basename(openfile), title = "titulo_"+os.path.basename(openfile)) 
-            newdoc.process_document(corenlpserver, "biomedical") #process_document chama o tokenizer
+            docs.append(newdoc)
+        self.process_documents(docs, corenlpserver) #process_document chama o tokenizer
+        for did in self.documents:
+            newdoc = self.documents[did]
             valid = True
             invalid_sids = []
             for s in newdoc.sentences:
@@ -52,7 +56,6 @@ class TempEvalCorpus(Corpus):
             newdoc.invalid_sids = invalid_sids
             logging.debug("invalid sentences: {}".format(invalid_sids))
             logging.debug("title sentences: {}".format(newdoc.title_sids))
-            self.documents[newdoc.did] = newdoc
     
     def get_invalid_sentences(self):
         for did in self.documents:
@@ -1,7 +1,6 @@
 import argparse
 import logging
 import os
-import pickle
 
 import time
 
@@ -12,7 +11,7 @@ from config.corpus_paths import paths
 
 from config.seedev_types import all_entity_types, all_entity_groups, pair_types
 from classification.ner.taggercollection import TaggerCollection
-from classification.results import ResultsRE, ResultSetNER
+from classification.results import ResultsRE, ResultSetNER, load_results
 from classification.rext.crfre import CrfSuiteRE
 from classification.rext.jsrekernel import JSREKernel
 from classification.rext.multir import MultiR
@@ -23,7 +22,7 @@ from classification.rext.svmtk import SVMTKernel
 from config import config
 from evaluate import get_relations_results, get_gold_ann_set, get_results
 from reader.seedev_corpus import SeeDevCorpus
-from text.corpus import Corpus
+from text.corpus import Corpus, open_corpus
 from text.pair import Pairs
 
 
@@ -104,7 +103,7 @@ def main():
         corpus_path = paths[options.goldstd]["corpus"]
         corpus_ann = paths[options.goldstd]["annotations"]
         logging.info("loading corpus %s" % corpus_path)
-        corpus = pickle.load(open(corpus_path, 'rb'))
+        corpus = open_corpus(corpus_path)
         logging.debug("loading annotations...")
         # corpus.clear_annotations("all")
         corpus.load_annotations(corpus_ann, "all", options.ptype)
@@ -114,7 +113,7 @@ def main():
         #corpus = SeeDevCorpus("corpus/" + "&".join(options.goldstd))
         corpus_path = paths[options.goldstd[0]]["corpus"]
         logging.info("loading corpus %s" % corpus_path)
-        basecorpus = pickle.load(open(corpus_path, 'rb'))
+        basecorpus = open_corpus(corpus_path)
         corpus = SeeDevCorpus(corpus_path)
         corpus.documents = basecorpus.documents
         if options.actions == "add_sentences":
@@ -250,8 +249,7 @@ def main():
         #    print res
         elif options.actions == "evaluate_ner":
             if os.path.exists(options.output[1] + ".pickle"):
-                results = pickle.load(open(options.output[1] + ".pickle", 'rb'))
-                results.load_corpus(options.goldstd[0])
+                results = load_results(options.output[1] + ".pickle", options.goldstd[0])
                 results.path = options.output[1]
             logging.info("loading gold standard %s" % paths[options.goldstd[0]]["annotations"])
             for t in all_entity_types:
@@ -195,12 +195,20 @@ class IBENT(object):
         output = {}
         for a in self.entity_annotators:  # a in (annotator_name, annotator_engine, annotator_etype)
             if a[0] == annotator:
+                doc_sentences = []
                 for s in sentences:
                     sentence = Sentence(s[2], offset=s[3], sid=s[1], did=doctag)
                     #sentence.process_sentence(self.corenlp)
                     sentence.process_corenlp_output(ast.literal_eval(s[4]))
-                    sentence_text = " ".join([t.text for t in sentence.tokens])
-                    sentence_output = self.entity_annotators[a].annotate_sentence(sentence_text)
+                    doc_sentences.append(sentence)
+                # BANNER uses the offsets of the entities on the sentence text
+                if a[1] == "banner":
+                    texts = [sentence.text for sentence in doc_sentences]
+                else:
+                    texts = [" ".join([t.text for t in sentence.tokens]) for sentence in doc_sentences]
+                # all the sentences of the document are tagged together
+                outputs = self.entity_annotators[a].annotate_sentences(texts)
+                for sentence, sentence_output in zip(doc_sentences, outputs):
                     #print sentence_output
 
                     sentence_entities = self.entity_annotators[a].process_sentence(sentence_output, sentence)
@@ -0,0 +1,5 @@
+import os
+import sys
+
+# modules are imported from the src directory, like the scripts do
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
@@ -0,0 +1,66 @@
+"""
+Entities and pairs saved on an annotation layer should be the same after the layer is applied to the corpus, also when
+the store of the corpus keeps only a few documents in memory.
+"""
+from __future__ import division, absolute_import
+
+import random
+
+import pytest
+
+from benchmarks.corpus_store_benchmark import generate_document
+from text.annotation_layer import AnnotationLayer, load_layer
+from text.corpus import Corpus, open_corpus
+from text.entity import Entity
+from text.pair import Pair
+
+ndocuments = 30
+
+
+def add_annotations(doc):
+    sentence = doc.sentences[0]
+    entities = []
+    for i, tokens in enumerate((sentence.tokens[0:2], sentence.tokens[3:4])):
+        entity = Entity(tokens, e_type="chemical", text=" ".join(t.text for t in tokens), did=doc.did,
+                        sid=sentence.sid, eid="{}.e{}".format(sentence.sid, i))
+        sentence.entities.add_entity(entity, "results")
+        entities.append(entity)
+    doc.pairs.pairs.append(Pair(entities, "interacts", did=doc.did, pid=doc.did + ".p0"))
+
+
+def annotations(corpus):
+    values = []
+    for did in corpus.documents:
+        doc = corpus.documents[did]
+        elist = doc.sentences[0].entities.elist["results"]
+        values.append(([(e.eid, e.text, e.start, e.dend, [t.order for t in e.tokens]) for e in elist],
+                       [(p.pid, p.relation, p.eids) for p in doc.pairs.pairs],
+                       # the pair uses the same entity objects as the entity list
+                       [e is p.entities[i] for p in doc.pairs.pairs for i, e in enumerate(elist)]))
+    return values
+
+
+@pytest.fixture
+def corpus_path(tmpdir):
+    random.seed(0)
+    corpus = Corpus("test", documents=dict(("d{}".format(d), generate_document("d{}".format(d), 3, 5))
+                                           for d in range(ndocuments)))
+    path = str(tmpdir.join("corpus.db"))
+    corpus.save(path)
+    return path
+
+
+@pytest.mark.parametrize("cache_size", [None, 5])
+def test_apply(tmpdir, corpus_path, cache_size):
+    annotated = open_corpus(corpus_path)
+    for did in annotated.documents:
+        add_annotations(annotated.documents[did])
+    layer = AnnotationLayer()
+    layer.add_corpus(annotated, pairs=True)
+    layer_path = str(tmpdir.join("results.layer"))
+    layer.save(layer_path)
+
+    corpus = open_corpus(corpus_path, cache_size=cache_size)
+    load_layer(layer_path).apply(corpus)
+    corpus.save(corpus_path)
+    assert annotations(open_corpus(corpus_path)) == annotations(annotated)
@@ -0,0 +1,53 @@
+"""
+The ChEBI index used by find_chebi_term should find the same matches as the queries previously run on the florchebi
+database, here on the sample tables of the ChEBI benchmark.
+"""
+from __future__ import division, absolute_import
+
+import sqlite3
+
+import pytest
+
+from benchmarks.chebi_benchmark import sample_sql, sample_queries, sql_matches, index_matches
+from chebi_base import ChebiIndex
+
+# texts that only match with the collation of the MySQL database -> term id
+collation_names = {"ethanol ": 16236, "\xc3\xa9thanol": 16236, "Caf\xc3\xa9ine": None, "NACL": 26710}
+
+
+@pytest.fixture(scope="module")
+def conn():
+    conn = sqlite3.connect(":memory:")
+    with open(sample_sql) as f:
+        conn.executescript(f.read())
+    conn.text_factory = str
+    return conn
+
+
+@pytest.fixture(scope="module")
+def index(conn):
+    index = ChebiIndex()
+    index.load(conn)
+    return index
+
+
+def same_match(sql_match, index_match):
+    if sql_match is None or index_match is None:
+        return sql_match is None and index_match is None
+    if len(sql_match) == 3 and abs(sql_match[2] - index_match[2]) > 1e-9:
+        return False
+    return tuple(sql_match[:2]) == tuple(index_match[:2])
+
+
+@pytest.mark.parametrize("text", sample_queries)
+def test_same_matches_as_queries(conn, index, text):
+    for stage, sql_match, index_match in zip(("exact", "synonym", "partial"), sql_matches(conn, text),
+                                             index_matches(index, text)):
+        assert same_match(sql_match, index_match), "{} match: query {}, index {}".format(stage, sql_match,
+                                                                                        index_match)
+
+
+@pytest.mark.parametrize("text,term_id", sorted(collation_names.items()))
+def test_collation(index, text, term_id):
+    match = index.find_name(text) or index.find_synonym(text)
+    assert (match[0] if match else None) == term_id
@@ -0,0 +1,89 @@
+"""
+Documents of a DocumentStore should be saved and read back the same, and changes to them should not be lost when they
+are removed from memory.
+"""
+from __future__ import division, absolute_import
+
+import random
+
+import pytest
+
+from benchmarks.corpus_store_benchmark import generate_document
+from text.corpus_store import DocumentStore, is_store
+
+ndocuments = 30
+
+
+def document_texts(store):
+    return [(did, store[did].text, [s.text for s in store[did].sentences]) for did in store]
+
+
+@pytest.fixture
+def path(tmpdir):
+    random.seed(0)
+    store = DocumentStore()
+    for d in range(ndocuments):
+        did = "d{}".format(d)
+        store[did] = generate_document(did, 3, 5)
+    path = str(tmpdir.join("corpus.db"))
+    store.save(path, metadata="corpus")
+    store.close()
+    return path
+
+
+def test_round_trip(path):
+    random.seed(0)
+    expected = [generate_document("d{}".format(d), 3, 5) for d in range(ndocuments)]
+    store = DocumentStore(path)
+    assert is_store(path)
+    assert store.metadata == "corpus"
+    assert document_texts(store) == [(doc.did, doc.text, [s.text for s in doc.sentences]) for doc in expected]
+    assert store.changed() == []
+
+
+def test_save_changes(path):
+    store = DocumentStore(path)
+    for did in store:
+        store[did].sentences
+    store["d3"].text = "changed"
+    del store["d4"]
+    assert [did for did, data in store.changed()] == ["d3"]
+    store.save(path)
+    saved = DocumentStore(path)
+    assert saved["d3"].text == "changed"
+    assert "d4" not in saved
+    assert list(saved) == ["d{}".format(d) for d in range(ndocuments) if d != 4]
+
+
+@pytest.mark.parametrize("cache_size", [None, 5])
+def test_eviction(path, cache_size):
+    store = DocumentStore(path, cache_size=cache_size)
+    texts = document_texts(store)
+    if cache_size is not None:
+        assert len(store.loaded) == cache_size
+    # changes to documents that are removed from memory are spilled and saved
+    for did in store:
+        store[did].text += " changed"
+    # the document is still referenced, so it is kept in memory
+    held = store["d0"]
+    for did in store:
+        store[did].sentences
+    held.text = "held"
+    store.save(path)
+    saved = DocumentStore(path)
+    assert saved["d0"].text == "held"
+    assert [saved[did].text for did, text, sentences in texts[1:]] == \
+        [text + " changed" for did, text, sentences in texts[1:]]
+
+
+def test_sentence_references(path):
+    # without cache_size, a document is not removed while only its sentences are referenced
+    store = DocumentStore(path)
+    sentences = [store[did].sentences[0] for did in store]
+    for did in store:
+        store[did].sentences
+    for sentence in sentences:
+        sentence.text = "changed"
+    store.save(path)
+    saved = DocumentStore(path)
+    assert [saved[did].sentences[0].text for did in saved] == ["changed"] * ndocuments
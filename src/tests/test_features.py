@@ -0,0 +1,23 @@
+"""
+Features of SimpleTaggerModel generated one sentence at a time should be the same as the features generated one token
+at a time.
+"""
+from __future__ import division, absolute_import
+
+import pytest
+
+from benchmarks.features_benchmark import generate_sentences, run_sentences, run_tokens
+from classification.ner.simpletagger import SimpleTaggerModel, feature_extractors, mirna_features
+
+flists = [("all", feature_extractors.keys()), ("mirna", mirna_features.keys())]
+
+
+@pytest.fixture(scope="module")
+def sentences():
+    return generate_sentences(200)
+
+
+@pytest.mark.parametrize("subtype,flist", flists)
+def test_sentence_features(sentences, subtype, flist):
+    model = SimpleTaggerModel("test", "all")
+    assert run_sentences(model, sentences, flist, subtype)[1] == run_tokens(model, sentences, flist, subtype)[1]
@@ -0,0 +1,93 @@
+"""
+LabelIndex, used by MirbaseDB.map_label, should find the same label and score as process.extractOne over every label.
+The graph and snapshot created from the miRBase tables should have the same labels.
+"""
+from __future__ import division, absolute_import
+
+import os
+
+import pytest
+from fuzzywuzzy import process
+from rdflib import Literal, URIRef
+
+from benchmarks.mirbase_benchmark import generate_labels, generate_mentions
+from mirna_base import LabelIndex, MIRBASE, MirbaseDB, mirbasesnapshot_name
+
+# rows of the miRBase tables read by MirbaseDB.parse_mirbase, and of the GO annotations of data/goa_human_rna.gaf
+mirna_rows = [["1", "MI0000077", "hsa-mir-21", "hsa-mir-21-old", "Homo sapiens miR-21 stem-loop", "22"],
+              ["2", "MI0000060", "hsa-let-7a-1", "", "Homo sapiens let-7a-1 stem-loop", "22"],
+              ["3", "MI0000612", "mmu-mir-21a", "", "Mus musculus miR-21a stem-loop", "23"]]
+mature_rows = [["10", "hsa-miR-21-5p", "hsa-miR-21", "MIMAT0000076"],
+               ["11", "hsa-let-7a-5p", "", "MIMAT0000062"],
+               ["12", "mmu-miR-21a-5p", "", "MIMAT0000530"]]
+pre_mature_rows = [["1", "10"], ["2", "11"], ["3", "12"]]
+goa_rows = [["RNAcentral", "URS0000", "", "", "GO:0035195", "", "", "", "", "Homo sapiens hsa-mir-21"]]
+
+labels = generate_labels(100)
+
+
+@pytest.fixture(scope="module")
+def index():
+    return LabelIndex(labels)
+
+
+def test_same_results_as_extract_one(index):
+    mentions = generate_mentions(labels, 100)
+    assert [index.extract_one(m) for m in mentions] == [process.extractOne(m, labels) for m in mentions]
+
+
+@pytest.mark.parametrize("query", ["hsa-mir-21", "HSA-MIR-21", "miR-21", "", "-", u"\xb5RNA-21", "x" * 300])
+def test_queries(index, query):
+    assert index.extract_one(query) == process.extractOne(query, labels)
+
+
+def test_empty_index():
+    assert LabelIndex([]).extract_one("miR-21") is None
+
+
+@pytest.fixture
+def mirbase_path(tmpdir, monkeypatch):
+    for name, rows in (("mirna.txt", mirna_rows), ("mirna_mature.txt", mature_rows),
+                       ("mirna_pre_mature.txt", pre_mature_rows)):
+        tmpdir.join(name).write("".join("\t".join(row) + "\n" for row in rows))
+    tmpdir.mkdir("data").join("goa_human_rna.gaf").write("!gaf-version: 2.1\n" +
+                                                         "".join("\t".join(row) + "\n" for row in goa_rows))
+    # the GO annotations are read from the working directory
+    monkeypatch.chdir(tmpdir)
+    return str(tmpdir) + os.sep
+
+
+def test_create(mirbase_path):
+    mirbase = MirbaseDB(mirbase_path)
+    mirbase.create_graph()
+    mirbase.save_graph()
+    mirbase.save_snapshot()
+    labels = {"hsa-mir-21": MIRBASE["MI0000077"], "hsa-let-7a-1": MIRBASE["MI0000060"],
+              "hsa-miR-21-5p": MIRBASE["MIMAT0000076"], "hsa-let-7a-5p": MIRBASE["MIMAT0000062"]}
+    assert mirbase.labels == labels
+
+    snapshot = MirbaseDB(mirbase_path)
+    assert snapshot.load_snapshot()
+    assert snapshot.labels == labels
+    assert snapshot.map_label("hsa-let-7a-1") == ("hsa-let-7a-1", 100)
+
+    graph = MirbaseDB(mirbase_path)
+    graph.load_graph()
+    assert graph.labels == labels
+    assert (URIRef(MIRBASE["MI0000077"]), MIRBASE["goa"], Literal("GO:0035195")) in graph.g
+
+
+def test_snapshot(mirbase_path):
+    mirbase = MirbaseDB(mirbase_path)
+    mirbase.create_graph()
+    mirbase.save_graph()
+    # "snapshot" action
+    graph = MirbaseDB(mirbase_path)
+    graph.load_graph()
+    graph.save_snapshot()
+    assert os.path.isfile(mirbase_path + mirbasesnapshot_name)
+    snapshot = MirbaseDB(mirbase_path)
+    snapshot.load()
+    assert snapshot.labels == mirbase.labels
+    assert snapshot.index.labels == graph.index.labels
+    assert snapshot.map_label("hsa-mir-21") == ("hsa-mir-21", 100)
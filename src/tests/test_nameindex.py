@@ -0,0 +1,34 @@
+"""
+NameIndex, used by MatcherModel, should find the same names as the regexes that MatcherModel used before, in the same
+order, except for the differences listed on NameIndex.
+"""
+from __future__ import division, absolute_import
+
+import pytest
+
+from benchmarks.matcher_benchmark import generate_names, generate_sentences, run_index, run_regex
+from classification.ner.nameindex import NameIndex, fold_case
+
+
+def test_same_matches_as_regexes():
+    names = generate_names(1000)
+    # names that only differ in case are matched once by the index
+    assert len(set(fold_case(n) for n in names)) == len(names)
+    sentences = generate_sentences(names, 200)
+    index_matches = run_index(names, sentences)[2]
+    assert sum(len(m) for m in index_matches) > 100
+    assert index_matches == run_regex(names, sentences)[2]
+
+
+@pytest.mark.parametrize("names,text,index_matches,regex_matches", [
+    # by name and then by start
+    (["b", "A"], u"a b a, B.", [(2, 3), (7, 8), (0, 1), (4, 5)], [(2, 3), (7, 8), (0, 1), (4, 5)]),
+    # a repetition after a single space, whose whitespace the pattern consumed
+    (["aspirin"], u"aspirin aspirin aspirin", [(0, 7), (8, 15), (16, 23)], [(0, 7), (16, 23)]),
+    (["aspirin"], u"aspirin  aspirin", [(0, 7), (9, 16)], [(0, 7), (9, 16)]),
+    # names that only differ in case
+    (["NaCl", "nacl"], u"NaCl and NACL", [(0, 4), (9, 13)], [(0, 4), (9, 13), (0, 4), (9, 13)]),
+])
+def test_differences(names, text, index_matches, regex_matches):
+    assert NameIndex(names).find(text) == index_matches
+    assert run_regex(names, [text])[2] == [regex_matches]
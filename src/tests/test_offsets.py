@@ -0,0 +1,16 @@
+"""
+Offsets should keep the same offsets as the previous version, which compared each new offset with every offset.
+"""
+from __future__ import division, absolute_import
+
+import pytest
+
+from benchmarks.offsets_benchmark import LinearOffsets, generate_entities, rules, run
+from text.offset import Offsets
+
+
+@pytest.mark.parametrize("name,exclude_this_if,exclude_others_if", rules)
+def test_same_offsets_as_linear(name, exclude_this_if, exclude_others_if):
+    entities = generate_entities(500, 4, 10000)
+    assert run(Offsets, entities, exclude_this_if, exclude_others_if)[1] == \
+        run(LinearOffsets, entities, exclude_this_if, exclude_others_if)[1]
@@ -0,0 +1,29 @@
+"""
+The UniProt index used by ProteinEntity.normalize should find the entries of gene and protein names, on the sample
+dump of the UniProt benchmark.
+"""
+from __future__ import division, absolute_import
+
+import pytest
+
+from benchmarks.uniprot_benchmark import sample_dump
+from uniprot_base import UniprotIndex
+
+# name -> accession expected for the sample dump
+sample_names = {"TP53": "P04637", "p53": "P04637", "Q15086": "P04637", "P53_HUMAN": "P04637",
+                "cellular tumor antigen P53": "P04637", "Tumor protein p53 variant": "Q53GA5", "IL-2": "P60568",
+                "IL2": "P60568", "il 2": "P60568", "Aldesleukin": "P60568", "HER1": "P00533", "ERBB1": "P00533",
+                "proto-oncogene c-ErbB-1": "P00533", "POMC": "P01189", "ACTH": None, "Trp53": None, "microRNA": None}
+
+
+@pytest.fixture(scope="module")
+def index(tmpdir_factory):
+    index = UniprotIndex(str(tmpdir_factory.mktemp("uniprot").join("uniprot.db")))
+    index.create(sample_dump, "9606")
+    return index
+
+
+@pytest.mark.parametrize("name,accession", sorted(sample_names.items()))
+def test_search(index, name, accession):
+    line = index.search(name)
+    assert (line.split("\t")[0] if line else None) == accession
@@ -0,0 +1,205 @@
+from __future__ import division, absolute_import
+
+import collections
+import cPickle as pickle
+import logging
+import os
+
+from text import slots
+from text.entity import Entities
+from text.pair import Pairs
+
+# entities are identified by (did, sid, start, end), the remaining attributes of each entity are kept in "attrs"
+entity_columns = ("did", "sid", "eid", "start", "end", "dstart", "dend", "type", "text")
+pair_columns = ("did", "sid", "pid", "relation")
+
+
+def get_layer_path(results_path):
+    """Path of the annotation layer of a results file"""
+    return os.path.splitext(results_path)[0] + ".layer"
+
+
+def get_attributes(obj, exclude):
+    return dict((k, v) for k, v in slots.get_attributes(obj).iteritems() if k not in exclude)
+
+
+class AnnotationLayer(object):
+    """
+    Entities and pairs of a corpus, stored in columns separately from the corpus, so that results do not have to
+    save a copy of the corpus. Each entity is stored once, even if it is on several lists of Entities.elist, and
+    its tokens are stored as their order in the sentence.
+    A layer can be applied to a corpus opened with open_corpus, replacing only the entity sources and pairs that
+    are on the layer, so several layers can be applied to the same corpus.
+    """
+    def __init__(self):
+        self.entities = dict((c, []) for c in entity_columns + ("tokens", "cls", "attrs"))
+        # entity lists of each sentence, entity is None for empty lists
+        self.elists = dict((c, []) for c in ("did", "sid", "source", "entity"))
+        self.pairs = dict((c, []) for c in pair_columns + ("entities", "cls", "attrs"))
+        # documents whose pairs are on the layer
+        self.pair_dids = []
+        self.entity_rows = {}
+
+    def add_entity(self, entity, did, sid):
+        """
+        Add an entity if it was not added before
+        :return: row of the entity
+        """
+        if id(entity) in self.entity_rows:
+            return self.entity_rows[id(entity)]
+        row = len(self.entities["did"])
+        values = {"did": did, "sid": sid}
+        for c in entity_columns[2:]:
+            values[c] = getattr(entity, c, None)
+        for c in entity_columns:
+            self.entities[c].append(values[c])
+        self.entities["tokens"].append([t.order for t in entity.tokens])
+        self.entities["cls"].append(entity.__class__)
+        self.entities["attrs"].append(get_attributes(entity, entity_columns + ("tokens",)))
+        self.entity_rows[id(entity)] = row
+        return row
+
+    def add_sentence(self, did, sentence):
+        """Add the entities of every source of a sentence"""
+        if sentence.entities is None:
+            return
+        for source, elist in sentence.entities.elist.iteritems():
+            if not elist:
+                rows = [None]
+            else:
+                rows = [self.add_entity(e, did, sentence.sid) for e in elist]
+            for row in rows:
+                self.elists["did"].append(did)
+                self.elists["sid"].append(sentence.sid)
+                self.elists["source"].append(source)
+                self.elists["entity"].append(row)
+
+    def add_pairs(self, did, pairs):
+        """Add the pairs of a document"""
+        self.pair_dids.append(did)
+        for p in pairs.pairs:
+            for c in pair_columns[1:]:
+                self.pairs[c].append(getattr(p, c, None))
+            self.pairs["did"].append(did)
+            self.pairs["entities"].append([self.add_entity(e, did, e.sid) for e in p.entities])
+            self.pairs["cls"].append(p.__class__)
+            self.pairs["attrs"].append(get_attributes(p, pair_columns + ("entities", "eids")))
+
+    def add_corpus(self, corpus, pairs=False):
+        """
+        Add the entities of every sentence of a corpus
+        :param pairs: also add the pairs of each document
+        """
+        for did in corpus.documents:
+            for sentence in corpus.documents[did].sentences:
+                self.add_sentence(did, sentence)
+            if pairs:
+                self.add_pairs(did, corpus.documents[did].pairs)
+
+    def build_entity(self, row, sentence=None):
+        cls = self.entities["cls"][row]
+        entity = cls.__new__(cls)
+        for k, v in self.entities["attrs"][row].iteritems():
+            setattr(entity, k, v)
+        for c in entity_columns:
+            setattr(entity, c, self.entities[c][row])
+        if sentence is not None:
+            entity.tokens = [sentence.tokens[i] for i in self.entities["tokens"][row]]
+        else:
+            entity.tokens = []
+        return entity
+
+    def build_pair(self, row, entities):
+        cls = self.pairs["cls"][row]
+        pair = cls.__new__(cls)
+        for k, v in self.pairs["attrs"][row].iteritems():
+            setattr(pair, k, v)
+        for c in pair_columns:
+            setattr(pair, c, self.pairs[c][row])
+        pair.entities = [entities[e] for e in self.pairs["entities"][row]]
+        pair.eids = tuple(e.eid for e in pair.entities)
+        return pair
+
+    def sources(self):
+        """Entity sources that are on the layer"""
+        return set(self.elists["source"])
+
+    def apply(self, corpus):
+        """
+        Replace the entities and pairs of the corpus with the ones on this layer. Sources of Entities.elist that
+        are not on the layer are kept. Only the documents with annotations are loaded, and each one is changed while
+        it is referenced, so that the store of the corpus keeps it until it is saved (see DocumentStore).
+        """
+        elist_rows = collections.OrderedDict()
+        for row, did in enumerate(self.elists["did"]):
+            elist_rows.setdefault(did, []).append(row)
+        pair_rows = collections.OrderedDict((did, []) for did in self.pair_dids)
+        for row, did in enumerate(self.pairs["did"]):
+            if did in pair_rows:
+                pair_rows[did].append(row)
+        ndocuments = nentities = npairs = 0
+        for did in elist_rows.keys() + [did for did in pair_rows if did not in elist_rows]:
+            if did not in corpus.documents:
+                continue
+            doc = corpus.documents[did]
+            nentities += self.apply_document(doc, did, elist_rows.get(did, []), pair_rows.get(did))
+            if did in pair_rows:
+                npairs += len(doc.pairs.pairs)
+            ndocuments += 1
+        logging.info("applied {} entities and {} pairs to {} documents".format(nentities, npairs, ndocuments))
+
+    def apply_document(self, doc, did, elist_rows, pair_rows=None):
+        """
+        Replace the entities and pairs of a document
+        :param elist_rows: rows of the entity lists of the document
+        :param pair_rows: rows of the pairs of the document, None if its pairs are not on the layer
+        :return: number of entities added
+        """
+        sentences = dict((s.sid, s) for s in doc.sentences)
+        entities = {}
+        elists = collections.OrderedDict()
+        for row in elist_rows:
+            sid = self.elists["sid"][row]
+            if sid not in sentences:
+                logging.info("{} is not on the corpus".format(sid))
+                continue
+            elist = elists.setdefault(sid, {}).setdefault(self.elists["source"][row], [])
+            erow = self.elists["entity"][row]
+            if erow is not None:
+                if erow not in entities:
+                    entities[erow] = self.build_entity(erow, sentences[sid])
+                elist.append(entities[erow])
+        for sid, sentence_elists in elists.iteritems():
+            sentence = sentences[sid]
+            if sentence.entities is None:
+                sentence.entities = Entities(sid=sid, did=did)
+            sentence.entities.elist.update(sentence_elists)
+        if pair_rows is not None:
+            pairs = Pairs(did=did)
+            for row in pair_rows:
+                for erow in self.pairs["entities"][row]:
+                    # entities of pairs that are not on any entity list
+                    if erow not in entities:
+                        entities[erow] = self.build_entity(erow, sentences.get(self.entities["sid"][erow]))
+                pairs.pairs.append(self.build_pair(row, entities))
+            doc.pairs = pairs
+        return len(entities)
+
+    def __getstate__(self):
+        # entity_rows is only valid while adding entities
+        return {"entities": self.entities, "elists": self.elists, "pairs": self.pairs, "pair_dids": self.pair_dids}
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self.entity_rows = {}
+
+    def save(self, path):
+        with open(path, "wb") as f:
+            pickle.dump(self, f, pickle.HIGHEST_PROTOCOL)
+        logging.info("saved {} entities and {} pairs to {}".format(len(self.entities["did"]),
+                                                                   len(self.pairs["did"]), path))
+
+
+def load_layer(path):
+    with open(path, "rb") as f:
+        return pickle.load(f)
@@ -169,6 +169,8 @@ with open(config.stoplist, 'r') as stopfile:
 
 class ChemicalEntity(Entity):
     """Chemical entities"""
+    __slots__ = ("chebi_id", "chebi_score", "chebi_name", "ssm_score")
+
     def __init__(self, tokens, sid, *args, **kwargs):
         # Entity.__init__(self, kwargs)
         super(ChemicalEntity, self).__init__(tokens, *args, **kwargs)
@@ -0,0 +1,167 @@
+from __future__ import division, absolute_import
+
+import hashlib
+import json
+import logging
+import os
+import time
+from multiprocessing.util import Finalize
+
+from config import config
+from worker_local import WorkerLocal, connect_shared
+
+# number of cache hits whose last use is saved in one transaction
+touch_interval = 1000
+
+
+class CoreNLPCache(object):
+    """
+    On-disk cache of CoreNLP results of single sentences, stored in a sqlite database.
+    Results are keyed by the hash of the sentence text, the annotators and the CoreNLP version, and the least recently
+    used results are removed when the database is bigger than max_mb.
+    The last use of the results that are read is saved in batches, with the next write, prune or close, so that hits
+    do not wait for a commit.
+    """
+    def __init__(self, path, max_mb=1024, version=None):
+        self.path = path
+        self.max_bytes = int(max_mb * 1024 * 1024)
+        self.version = version or os.path.basename(config.corenlp_dir.rstrip("/"))
+        self.hits = 0
+        self.misses = 0
+        self.writes = 0
+        # key -> time of the hits that are not saved yet
+        self.used = {}
+        # closed when the worker exits, which may be from another thread
+        self.conn = connect_shared(path, check_same_thread=False)
+        self.conn.execute("""CREATE TABLE IF NOT EXISTS parses (key TEXT PRIMARY KEY, result TEXT,
+                             size INTEGER, last_used REAL)""")
+        self.conn.execute("CREATE INDEX IF NOT EXISTS parses_last_used ON parses (last_used)")
+        self.conn.commit()
+
+    def get_key(self, text, annotators):
+        if isinstance(text, unicode):
+            text = text.encode("utf-8")
+        return hashlib.sha1("\t".join([self.version, annotators, text])).hexdigest()
+
+    def get(self, text, annotators):
+        """
+        Get the CoreNLP output of a sentence
+        :return: CoreNLP output as a dictionary, None if it is not cached
+        """
+        key = self.get_key(text, annotators)
+        row = self.conn.execute("SELECT result FROM parses WHERE key = ?", (key,)).fetchone()
+        if row is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        self.used[key] = time.time()
+        if len(self.used) >= touch_interval:
+            self.commit()
+        return json.loads(row[0])
+
+    def put(self, text, annotators, result):
+        """
+        Save the CoreNLP output of a sentence, with offsets relative to the sentence
+        """
+        value = json.dumps(result)
+        self.conn.execute("INSERT OR REPLACE INTO parses (key, result, size, last_used) VALUES (?, ?, ?, ?)",
+                          (self.get_key(text, annotators), value, len(value), time.time()))
+        self.commit()
+        self.writes += 1
+        # checking the size on every write would be too slow
+        if self.writes % 1000 == 0:
+            self.prune()
+
+    def commit(self):
+        """Save the last use of the results read since the last commit, and any pending write"""
+        if self.used:
+            self.conn.executemany("UPDATE parses SET last_used = ? WHERE key = ?",
+                                  [(t, key) for key, t in self.used.iteritems()])
+            self.used = {}
+        self.conn.commit()
+
+    def size(self):
+        entries, total = self.conn.execute("SELECT COUNT(*), SUM(size) FROM parses").fetchone()
+        return entries, total or 0
+
+    def prune(self, max_mb=None):
+        """
+        Remove the least recently used results until the cache is smaller than max_mb
+        :return: number of results removed
+        """
+        if max_mb is None:
+            max_bytes = self.max_bytes
+        else:
+            max_bytes = int(max_mb * 1024 * 1024)
+        self.commit()
+        entries, total = self.size()
+        removed = 0
+        if total <= max_bytes:
+            return removed
+        to_delete = []
+        for key, size in self.conn.execute("SELECT key, size FROM parses ORDER BY last_used"):
+            if total <= max_bytes:
+                break
+            to_delete.append((key,))
+            total -= size
+        self.conn.executemany("DELETE FROM parses WHERE key = ?", to_delete)
+        self.conn.commit()
+        removed = len(to_delete)
+        logging.info("removed {} results from the CoreNLP cache".format(removed))
+        return removed
+
+    def clear(self):
+        self.used = {}
+        self.conn.execute("DELETE FROM parses")
+        self.conn.commit()
+
+    def stats(self):
+        total = self.hits + self.misses
+        if total == 0:
+            hit_rate = 0
+        else:
+            hit_rate = self.hits / total
+        return {"hits": self.hits, "misses": self.misses, "hit_rate": hit_rate}
+
+    def close(self):
+        self.commit()
+        self.conn.close()
+
+
+def new_cache():
+    cache = CoreNLPCache(config.corenlp_cache, config.corenlp_cache_mb)
+    # save the last use of the hits when the process or pool worker exits
+    Finalize(cache, cache.close, exitpriority=0)
+    return cache
+
+
+_caches = WorkerLocal(new_cache)
+
+
+def get_cache():
+    """
+    Get the CoreNLP cache of the current thread and process, None if the cache is disabled
+    """
+    if not config.corenlp_cache:
+        return None
+    return _caches.get()
+
+
+def annotate(text, corenlpserver, annotators):
+    """
+    Annotate the text of one sentence with CoreNLP, using the cache if it is enabled
+    :return: CoreNLP output, or a string if CoreNLP failed
+    """
+    cache = get_cache()
+    if cache is not None:
+        corenlpres = cache.get(text, annotators)
+        if corenlpres is not None:
+            return corenlpres
+    corenlpres = corenlpserver.annotate(text.encode("utf8"), properties={
+        'ssplit.eolonly': True,
+        'annotators': annotators,
+        'outputFormat': 'json',
+    })
+    if cache is not None and not isinstance(corenlpres, basestring):
+        cache.put(text, annotators, corenlpres)
+    return corenlpres
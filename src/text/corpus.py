@@ -12,6 +12,7 @@ from subprocess import Popen
 import pexpect
 
 from postprocessing import ssm
+from text.corpus_store import DocumentStore, is_store
 from bllipparser import RerankingParser
 sys.path.append(os.path.abspath(os.path.dirname(__file__) + '../..'))
 
@@ -36,16 +37,42 @@ class Corpus(object):
         sys.stdout.write('[%s] %s%s ...%s\r' % (bar, percents, '%', suffix))
 
     def save(self, savedir, *args):
-        """Save corpus object to a pickle file"""
+        """
+        Save corpus object to a document store, with one record per document (see open_corpus).
+        If the corpus was opened from the same file, only the documents that were changed, added or deleted are
+        written.
+        """
         # TODO: compare with previous version and ask if it should rewrite
         logging.info("saving corpus...")
         #if not args:
         #    path = "data/" + self.path.split('/')[-1] + ".pickle"
         #else:
         #    path = args[0]
-        pickle.dump(self, open(savedir, "wb"))
+        if not isinstance(self.documents, DocumentStore):
+            self.documents = DocumentStore(documents=self.documents)
+        documents = self.documents
+        # the documents are saved separately from the rest of the corpus object
+        self.documents = None
+        try:
+            metadata = pickle.dumps(self, pickle.HIGHEST_PROTOCOL)
+        finally:
+            self.documents = documents
+        documents.save(savedir, metadata)
         logging.info("saved corpus to " + savedir)
 
+    def process_documents(self, documents, corenlpserver, process=True):
+        """
+        Sentence split and process a list of documents with the preprocessing pool and add them to this corpus,
+        in the same order as the list
+        :param documents: list of Document objects
+        :param corenlpserver: StanfordCoreNLP client
+        :param process: if False, only sentence split the documents
+        """
+        # imported here because text.document imports modules that import this one
+        from text import preprocessing
+        for newdoc in preprocessing.process_documents(documents, corenlpserver, process):
+            self.documents[newdoc.did] = newdoc
+
     def to_tuple(self):
         for did in self.documents:
             self.documents[did].sentences = tuple(self.documents[did].sentences)
@@ -188,10 +215,17 @@ class Corpus(object):
                     yield sentence
 
     def get_sentence(self, sid):
-        for d in self.documents:
-            for sentence in self.documents[d].sentences:
-                if sentence.sid == sid:
+        # sentence IDs start with the document ID
+        if sid and ".s" in sid:
+            did = sid[:sid.rfind(".s")]
+            if did in self.documents:
+                sentence = self.documents[did].get_sentence(sid)
+                if sentence is not None:
                     return sentence
+        for d in self.documents:
+            sentence = self.documents[d].get_sentence(sid)
+            if sentence is not None:
+                return sentence
         print "sentence not found", sid
         for d in self.documents:
             for sentence in self.documents[d].sentences:
@@ -354,6 +388,22 @@ class Corpus(object):
                 output_file.write(u"{}\t{}\n".format(did, self.documents[did].text.replace("\n", " ")))
 
 
+def open_corpus(path, cache_size=None):
+    """
+    Open a corpus saved with Corpus.save. The documents are only loaded when they are accessed.
+    Corpora saved as one pickle are also accepted.
+    :param cache_size: maximum number of documents kept in memory, only for corpora whose documents are only read
+        (see DocumentStore); by default every document that is accessed is kept
+    """
+    if not is_store(path):
+        return pickle.load(open(path, 'rb'))
+    documents = DocumentStore(path, cache_size=cache_size)
+    corpus = pickle.loads(documents.metadata)
+    corpus.documents = documents
+    logging.info("opened corpus with {} documents".format(len(documents)))
+    return corpus
+
+
 def netcat(hostname, port, content):
     s = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
     s.connect((hostname, port))
@@ -0,0 +1,315 @@
+from __future__ import division, absolute_import
+
+import collections
+import cPickle as pickle
+import functools
+import hashlib
+import logging
+import os
+import sqlite3
+import sys
+import tempfile
+import threading
+from multiprocessing.util import Finalize
+
+from worker_local import WorkerLocal
+
+# first bytes of every sqlite database, used to tell stores apart from corpora saved as one pickle
+sqlite_header = b"SQLite format 3\x00"
+# number of documents kept in memory by stores whose documents are only read (see DocumentStore)
+read_cache_size = 1000
+
+
+def is_store(path):
+    """Check if a file is a document store instead of a pickled corpus"""
+    with open(path, 'rb') as f:
+        return f.read(len(sqlite_header)) == sqlite_header
+
+
+def create_tables(conn):
+    conn.execute("CREATE TABLE documents (did TEXT PRIMARY KEY, data BLOB)")
+    conn.execute("CREATE TABLE metadata (key TEXT PRIMARY KEY, data BLOB)")
+
+
+def remove_file(path):
+    if os.path.exists(path):
+        os.remove(path)
+
+
+class DocumentStore(collections.MutableMapping):
+    """
+    Mapping of document IDs to Document objects saved in a sqlite database, one pickle per document.
+    Documents are only unpickled when they are accessed. By default every document that was accessed is kept in
+    memory. If cache_size is set, at most cache_size documents are kept, removing the least recently used first: a
+    removed document is dropped if its pickle did not change, and otherwise it is written to a temporary spill file of
+    the process, so that its changes are saved with the other documents.
+    Only references to the Document are checked before removing it. A caller that keeps its sentences, entities or
+    tokens and changes them after the document was removed changes a copy that is not saved, so cache_size should
+    only be set when the documents are only read, such as with read_cache_size.
+    Only the documents whose pickle changed are written when the store is saved to the same file.
+    A store can read documents from several files, so that corpora can be merged without loading their documents.
+    """
+    def __init__(self, path=None, documents=None, cache_size=None):
+        self.paths = []
+        # did -> index of the file with that document, None if the document only exists in memory
+        self.index = collections.OrderedDict()
+        # documents in memory, from the least to the most recently used
+        self.loaded = collections.OrderedDict()
+        # did -> hash of the pickle of the document when it was read or written, to find the documents that changed
+        self.hashes = {}
+        self.deleted = set()
+        self.metadata = None
+        self.cache_size = cache_size
+        # (index of the spill file, pid of the process that writes it)
+        self.spill = (None, None)
+        self.lock = threading.RLock()
+        self._connections = {}
+        if path is not None:
+            self.add_file(path)
+        if documents:
+            for did in documents:
+                self[did] = documents[did]
+
+    def connection(self, i):
+        """Open the connection to file i, once per process"""
+        if i not in self._connections:
+            self._connections[i] = WorkerLocal(functools.partial(sqlite3.connect, self.paths[i],
+                                                                 check_same_thread=False), per_thread=False)
+        return self._connections[i].get()
+
+    def add_file(self, path):
+        """
+        Add the documents of a store file, replacing documents with the same ID
+        :return: index of the file
+        """
+        i = self.get_file(path)
+        conn = self.connection(i)
+        for did, in conn.execute("SELECT did FROM documents ORDER BY rowid"):
+            self.index[did] = i
+            self.loaded.pop(did, None)
+            self.hashes.pop(did, None)
+            self.deleted.discard(did)
+        row = conn.execute("SELECT data FROM metadata WHERE key = 'corpus'").fetchone()
+        if row is not None and self.metadata is None:
+            self.metadata = str(row[0])
+        return i
+
+    def get_file(self, path):
+        """Get the index of a file, without reading its documents"""
+        path = os.path.realpath(path)
+        if path not in self.paths:
+            self.paths.append(path)
+        return self.paths.index(path)
+
+    def get_data(self, did):
+        """Get the pickle of a document from the file where it is saved"""
+        with self.lock:
+            row = self.connection(self.index[did]).execute("SELECT data FROM documents WHERE did = ?",
+                                                           (did,)).fetchone()
+        return str(row[0])
+
+    def spill_file(self):
+        """Index of the spill file of the current process, created if necessary"""
+        i, pid = self.spill
+        if i is None or pid != os.getpid():
+            fd, path = tempfile.mkstemp(prefix="corpus_store", suffix=".db")
+            os.close(fd)
+            conn = sqlite3.connect(path)
+            create_tables(conn)
+            conn.commit()
+            conn.close()
+            # removed when the store is garbage collected or the process exits
+            Finalize(self, remove_file, args=(path,), exitpriority=0)
+            i = self.get_file(path)
+            self.spill = (i, os.getpid())
+        return i
+
+    def is_spilled(self, did):
+        return self.spill[0] is not None and self.index[did] == self.spill[0]
+
+    def evict(self):
+        """Remove the least recently used documents from memory until there are at most cache_size"""
+        if self.cache_size is None:
+            return
+        # referenced documents go back to the end, so that each call only checks a few documents
+        tries = len(self.loaded) - self.cache_size + 10
+        while len(self.loaded) > self.cache_size and tries > 0:
+            tries -= 1
+            did, doc = self.loaded.popitem(last=False)
+            # references: doc and the argument of getrefcount
+            if sys.getrefcount(doc) > 2:
+                self.loaded[did] = doc
+                continue
+            data = pickle.dumps(doc, pickle.HIGHEST_PROTOCOL)
+            digest = hashlib.sha1(data).hexdigest()
+            if digest != self.hashes.get(did):
+                i = self.spill_file()
+                conn = self.connection(i)
+                conn.execute("INSERT OR REPLACE INTO documents (did, data) VALUES (?, ?)",
+                             (did, sqlite3.Binary(data)))
+                conn.commit()
+                self.index[did] = i
+                self.hashes[did] = digest
+
+    def __getitem__(self, did):
+        with self.lock:
+            if did in self.loaded:
+                doc = self.loaded.pop(did)
+                self.loaded[did] = doc
+                if self.cache_size is not None and len(self.loaded) > self.cache_size:
+                    self.evict()
+                return doc
+            if self.index[did] is None:
+                raise KeyError(did)
+            data = self.get_data(did)
+            doc = pickle.loads(data)
+            self.loaded[did] = doc
+            self.hashes[did] = hashlib.sha1(data).hexdigest()
+            self.evict()
+            return doc
+
+    def __setitem__(self, did, doc):
+        with self.lock:
+            if did not in self.index:
+                self.index[did] = None
+            self.loaded.pop(did, None)
+            self.loaded[did] = doc
+            # new documents are always written
+            self.hashes.pop(did, None)
+            self.deleted.discard(did)
+            self.evict()
+
+    def __delitem__(self, did):
+        with self.lock:
+            del self.index[did]
+            self.loaded.pop(did, None)
+            self.hashes.pop(did, None)
+            self.deleted.add(did)
+
+    def __iter__(self):
+        return iter(self.index)
+
+    def __len__(self):
+        return len(self.index)
+
+    def __contains__(self, did):
+        return did in self.index
+
+    def update(self, other=(), **kwargs):
+        if isinstance(other, DocumentStore):
+            self.merge(other)
+        else:
+            super(DocumentStore, self).update(other, **kwargs)
+
+    def merge(self, other):
+        """Add the documents of another store without loading the ones that are saved on its files"""
+        for did, i in other.index.iteritems():
+            if did in other.loaded or other.is_spilled(did):
+                # the spill file of the other store is removed with it
+                self[did] = other[did]
+            else:
+                # replace previous documents with the same ID
+                self.loaded.pop(did, None)
+                self.hashes.pop(did, None)
+                self.index[did] = self.get_file(other.paths[i])
+                self.deleted.discard(did)
+
+    def __reduce__(self):
+        # pickled objects with a store, such as results, should not depend on the store files
+        return dict, (self.items(),)
+
+    def changed(self):
+        """
+        Get the documents that changed since they were read or written to a store file
+        :return: list of (did, pickle)
+        """
+        changes = []
+        for did in self.index:
+            if did in self.loaded:
+                data = pickle.dumps(self.loaded[did], pickle.HIGHEST_PROTOCOL)
+                # documents read back from the spill file were not saved yet, even if they did not change since
+                if self.is_spilled(did) or hashlib.sha1(data).hexdigest() != self.hashes.get(did):
+                    changes.append((did, data))
+            elif self.is_spilled(did):
+                changes.append((did, self.get_data(did)))
+        return changes
+
+    def save(self, path, metadata=None):
+        """
+        Save the documents to a file. If the documents were read only from that file, only the documents that were
+        changed, added or deleted are written, otherwise the file is written again.
+        :param path: path of the store
+        :param metadata: pickle of the corpus object
+        """
+        if metadata is not None:
+            self.metadata = metadata
+        path = os.path.realpath(path)
+        if [p for i, p in enumerate(self.paths) if i != self.spill[0]] == [path]:
+            self.save_changes(path)
+        else:
+            self.save_all(path)
+
+    def save_changes(self, path):
+        with self.lock:
+            i = self.paths.index(path)
+            conn = self.connection(i)
+            for did in self.deleted:
+                conn.execute("DELETE FROM documents WHERE did = ?", (did,))
+            changes = self.changed()
+            for did, data in changes:
+                # update instead of replacing to keep the order of the documents
+                if conn.execute("UPDATE documents SET data = ? WHERE did = ?",
+                                (sqlite3.Binary(data), did)).rowcount == 0:
+                    conn.execute("INSERT INTO documents (did, data) VALUES (?, ?)", (did, sqlite3.Binary(data)))
+                self.index[did] = i
+                self.hashes[did] = hashlib.sha1(data).hexdigest()
+            self.write_metadata(conn)
+            conn.commit()
+            if self.spill[1] == os.getpid():
+                spill_conn = self.connection(self.spill[0])
+                spill_conn.execute("DELETE FROM documents")
+                spill_conn.commit()
+        logging.info("saved {} changed documents to {}".format(len(changes), path))
+        self.deleted = set()
+
+    def save_all(self, path):
+        temp_path = path + ".tmp"
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+        conn = sqlite3.connect(temp_path)
+        create_tables(conn)
+        with self.lock:
+            for did in self.index:
+                if did in self.loaded:
+                    data = pickle.dumps(self.loaded[did], pickle.HIGHEST_PROTOCOL)
+                    self.hashes[did] = hashlib.sha1(data).hexdigest()
+                else:
+                    # copy the pickle without loading the document
+                    data = self.get_data(did)
+                conn.execute("INSERT INTO documents (did, data) VALUES (?, ?)", (did, sqlite3.Binary(data)))
+            self.write_metadata(conn)
+            conn.commit()
+            conn.close()
+            self.close()
+            os.rename(temp_path, path)
+            if self.spill[1] == os.getpid():
+                remove_file(self.paths[self.spill[0]])
+            # from now on the documents are read from the new file
+            self.paths = [path]
+            self.spill = (None, None)
+            for did in self.index:
+                self.index[did] = 0
+        logging.info("saved {} documents to {}".format(len(self.index), path))
+        self.deleted = set()
+
+    def write_metadata(self, conn):
+        if self.metadata is not None:
+            conn.execute("INSERT OR REPLACE INTO metadata (key, data) VALUES ('corpus', ?)",
+                         (sqlite3.Binary(self.metadata),))
+
+    def close(self):
+        for connections in self._connections.values():
+            conn = connections.current()
+            if conn is not None:
+                conn.close()
+        self._connections = {}
@@ -2,6 +2,7 @@ from __future__ import division, absolute_import
 #from nltk.stem.porter import PorterStemmer
 #import jsonrpclib
 #from simplejson import loads
+import bisect
 import io
 import logging
 import os
@@ -9,7 +10,9 @@ from subprocess import Popen, PIPE
 import codecs
 import xml.etree.ElementTree as ET
 import sys
-from config.config import geniass_path
+from text import corenlp_cache
+from text import index
+from text import sentence_splitter
 from text.sentence import Sentence
 from text.token2 import Token2
 from text.pair import Pair, Pairs
@@ -22,6 +25,13 @@ whitespace = [u"\u2002", u"\u2003", u"\u00A0", u"\u2009", u"\u200C", u"\u200D",
 #porter = PorterStemmer()
 
 
+corenlp_annotators = 'tokenize,ssplit,pos,parse,ner,lemma,depparse'
+# used if CoreNLP fails with corenlp_annotators
+corenlp_fallback_annotators = 'tokenize,ssplit,pos,ner,lemma'
+# maximum number of characters sent to CoreNLP in each request
+corenlp_batch_chars = 50000
+
+
 def clean_whitespace(text):
     'replace all whitespace for a regular space " "'
     replacedtext = text
@@ -29,6 +39,122 @@ def clean_whitespace(text):
         replacedtext = replacedtext.replace(code, " ")
     return replacedtext
 
+
+def get_sentence_offsets(sentences):
+    """
+    Get the start and end of the sentences with tokens, relative to the document
+    :return: (sentences, starts, ends), None if the sentences are not sorted
+    """
+    sentences = [s for s in sentences if s.tokens]
+    starts = [s.tokens[0].dstart for s in sentences]
+    ends = [s.tokens[-1].dend for s in sentences]
+    if not index.is_sorted(starts) or not index.is_sorted(ends):
+        return None
+    return sentences, starts, ends
+
+
+def process_corenlp_batch(sentences, corenlpserver):
+    """
+    Annotate a list of sentences with one CoreNLP request, sending one sentence per line, and give each sentence its
+    part of the output, with offsets relative to that sentence.
+    The sentences can be from different documents.
+    :param sentences: list of Sentence objects
+    :param corenlpserver: StanfordCoreNLP client
+    :return: list of sentences that could not be matched to exactly one CoreNLP sentence
+    """
+    cache = corenlp_cache.get_cache()
+    # each sentence has to be in one line, newlines are replaced to keep the same offsets
+    lines = [s.text.replace("\n", " ").replace("\r", " ") for s in sentences]
+    text = "\n".join(lines)
+    corenlpres = corenlpserver.annotate(text.encode("utf8"), properties={
+        'ssplit.eolonly': True,
+        'annotators': corenlp_annotators,
+        'outputFormat': 'json',
+    })
+    if isinstance(corenlpres, basestring):
+        logging.info("could not process batch of {} sentences: {}".format(len(sentences), corenlpres))
+        return sentences
+    starts = []
+    offset = 0
+    for s in sentences:
+        starts.append(offset)
+        offset += len(s.text) + 1
+    sentence_results = [[] for s in sentences]
+    for corenlp_sentence in corenlpres['sentences']:
+        if not corenlp_sentence['tokens']:
+            continue
+        i = bisect.bisect_right(starts, corenlp_sentence['tokens'][0]["characterOffsetBegin"]) - 1
+        sentence_results[i].append(corenlp_sentence)
+    failed = []
+    for s, line, start, results in zip(sentences, lines, starts, sentence_results):
+        if len(results) != 1:
+            failed.append(s)
+            continue
+        tokens = results[0]['tokens']
+        for t in tokens:
+            t["characterOffsetBegin"] -= start
+            t["characterOffsetEnd"] -= start
+        # offsets may not match if the text has characters that count as two on the server side
+        if any("originalText" in t and s.text[t["characterOffsetBegin"]:t["characterOffsetEnd"]] != t["originalText"]
+               for t in (tokens[0], tokens[-1])):
+            logging.debug("offsets of batch output do not match {}".format(s.sid))
+            failed.append(s)
+            continue
+        # the cache is read with the text of the sentence, so results of a changed text are not cached
+        if cache is not None and line == s.text:
+            cache.put(s.text, corenlp_annotators, {'sentences': results})
+        s.process_corenlp_output({'sentences': results})
+    return failed
+
+def process_corenlp_sentence(s, corenlpserver):
+    """
+    Process one sentence with CoreNLP, retrying with less annotators if it fails
+    """
+    for annotators in (corenlp_annotators, corenlp_fallback_annotators):
+        corenlpres = corenlp_cache.annotate(s.text, corenlpserver, annotators)
+        if not isinstance(corenlpres, basestring):
+            break
+        print corenlpres
+    if isinstance(corenlpres, basestring):
+        print "could not process this sentence:", s.text.encode("utf8")
+    else:
+        s.process_corenlp_output(corenlpres)
+
+
+def process_sentences(sentences, corenlpserver, max_chars=corenlp_batch_chars):
+    """
+    Process sentences with CoreNLP in batches of up to max_chars characters. The sentences that could not be processed
+    in a batch are processed one by one.
+    :param sentences: list of Sentence objects, which can be from multiple documents
+    :param corenlpserver: StanfordCoreNLP client
+    """
+    cache = corenlp_cache.get_cache()
+    if cache is not None:
+        to_process = []
+        for s in sentences:
+            corenlpres = cache.get(s.text, corenlp_annotators)
+            if corenlpres is None:
+                to_process.append(s)
+            else:
+                s.process_corenlp_output(corenlpres)
+        sentences = to_process
+    failed = []
+    batch = []
+    batch_chars = 0
+    for s in sentences:
+        if batch and batch_chars + len(s.text) + 1 > max_chars:
+            failed += process_corenlp_batch(batch, corenlpserver)
+            batch = []
+            batch_chars = 0
+        batch.append(s)
+        batch_chars += len(s.text) + 1
+    if batch:
+        failed += process_corenlp_batch(batch, corenlpserver)
+    if failed:
+        logging.debug("processing {} sentences one by one".format(len(failed)))
+    for s in failed:
+        process_corenlp_sentence(s, corenlpserver)
+
 sources = ("PubMed", "PMC")
 
 class Document(object):
@@ -60,57 +186,34 @@ class Document(object):
         #    self.sentences.append(Sentence(self.title, sid=sid, did=self.did))
         # inputtext = clean_whitespace(self.text)
         inputtext = self.text
-        with io.open("/tmp/geniainput.txt", 'w', encoding='utf-8') as geniainput:
-            geniainput.write(inputtext)
-        current_dir = os.getcwd()
-        os.chdir(geniass_path)
-        geniaargs = ["./geniass", "/tmp/geniainput.txt", "/tmp/geniaoutput.txt"]
-        Popen(geniaargs, stdout=PIPE, stderr=PIPE).communicate()
-        os.chdir(current_dir)
-        offset = 0
-        with io.open("/tmp/geniaoutput.txt", 'r', encoding="utf-8") as geniaoutput:
-            for l in geniaoutput:
-                stext = l.strip()
-                if stext == "":
-                    offset = self.get_space_between_sentences(offset)
-                    continue
-                sid = self.did + ".s" + str(len(self.sentences))
-                self.sentences.append(Sentence(stext, offset=offset, sid=sid, did=self.did))
-                offset += len(stext)
-                offset = self.get_space_between_sentences(offset)
+        splitter = sentence_splitter.get_splitter()
+        self.add_sentences(splitter.split([inputtext])[0])
+
+    def add_sentences(self, sentences):
+        """
+        Add the sentences obtained with a sentence splitter
+        :param sentences: list of (offset, sentence text)
+        """
+        for offset, stext in sentences:
+            sid = self.did + ".s" + str(len(self.sentences))
+            self.sentences.append(Sentence(stext, offset=offset, sid=sid, did=self.did))
 
-    def process_document(self, corenlpserver, doctype="biomedical"):
+    def process_document(self, corenlpserver, doctype="biomedical", batch=True):
         """
         Process each sentence in the text (sentence split if there are no sentences) using Stanford CoreNLP
         :param corenlpserver:
         :param doctype:
+        :param batch: send the sentences in batches instead of one request per sentence
         :return:
         """
         if len(self.sentences) == 0:
             # use specific sentence splitter
             self.sentence_tokenize(doctype)
-        for s in self.sentences:
-            #corenlpres = corenlpserver.raw_parse(s.text)
-            corenlpres = corenlpserver.annotate(s.text.encode("utf8"), properties={
-                'ssplit.eolonly': True,
-                #'annotators': 'tokenize,ssplit,pos,ner,lemma',
-                'annotators': 'tokenize,ssplit,pos,parse,ner,lemma,depparse',
-                'outputFormat': 'json',
-            })
-            if isinstance(corenlpres, basestring):
-                print corenlpres
-                corenlpres = corenlpserver.annotate(s.text.encode("utf8"), properties={
-                'ssplit.eolonly': True,
-                # 'annotators': 'tokenize,ssplit,pos,depparse,parse',
-                'annotators': 'tokenize,ssplit,pos,ner,lemma',
-                'outputFormat': 'json',
-            })
-            if isinstance(corenlpres, basestring):
-                print "could not process this sentence:", s.text.encode("utf8")
-                print corenlpres
-                continue
-            else:
-                s.process_corenlp_output(corenlpres)
+        if batch:
+            process_sentences(self.sentences, corenlpserver)
+        else:
+            for s in self.sentences:
+                process_corenlp_sentence(s, corenlpserver)
 
 
     def tag_chemdner_entity(self, start, end, subtype, source="goldstandard", **kwargs):
@@ -236,12 +339,7 @@ class Document(object):
         :param sid: sentence ID
         :return: the sentence object if it exists
         """
-        for s in self.sentences:
-            # logging.debug([(t.start, t.end) for t in s.tokens])
-            if s.sid == sid:
-                # logging.debug("found sid: {}".format(sid))
-                return s
-        return None
+        return index.find(self, self.sentences, "sid", sid)
 
     def find_sentence_containing(self, start, end, chemdner=True):
         """
@@ -252,13 +350,28 @@ class Document(object):
             firstsent = 1
         else:
             firstsent = 0
-        for i, s in enumerate(self.sentences[firstsent:]):
-            if len(s.tokens) == 0:
-                #logging.debug("sentence without tokens: {} {}".format(s.sid, s.text.encoding("utf-8")))
-                continue
-            if s.tokens[0].dstart <= start and s.tokens[-1].dend >= end:
-                # print "found it!"
-                return s
+        for rebuild in (False, True):
+            # sentences may have been tokenized after the offsets were cached
+            offsets = index.get_cached(self, ("sentence_offsets", firstsent), self.sentences,
+                                       lambda sentences: get_sentence_offsets(sentences[firstsent:]), rebuild)
+            if offsets is None:
+                break
+            sentences, starts, ends = offsets
+            # the first sentence that ends after end, if it starts before start
+            i = bisect.bisect_left(ends, end)
+            if i < len(sentences) and starts[i] <= start:
+                s = sentences[i]
+                if s.tokens and s.tokens[0].dstart <= start and s.tokens[-1].dend >= end:
+                    return s
+        if offsets is None:
+            # sentences are not sorted
+            for i, s in enumerate(self.sentences[firstsent:]):
+                if len(s.tokens) == 0:
+                    #logging.debug("sentence without tokens: {} {}".format(s.sid, s.text.encoding("utf-8")))
+                    continue
+                if s.tokens[0].dstart <= start and s.tokens[-1].dend >= end:
+                    # print "found it!"
+                    return s
         for s in self.sentences:
             if len(s.tokens) > 0:
                 logging.debug("{} {} {} {} {}".format(s.tokens[0].dstart <= start, s.tokens[-1].dend >= end,
@@ -273,6 +386,13 @@ class Document(object):
         return offsets
 
     def get_entity(self, eid, source="goldstandard"):
+        # entity IDs start with the sentence ID
+        if eid and ".e" in eid:
+            sentence = self.get_sentence(eid[:eid.rfind(".e")])
+            if sentence is not None and source in sentence.entities.elist:
+                e = sentence.entities.find_entity_by_eid(eid, source)
+                if e is not None:
+                    return e
         for sentence in self.sentences:
             for e in sentence.entities.elist[source]:
                 if e.eid == eid:
@@ -2,11 +2,17 @@ from __future__ import division, absolute_import, unicode_literals
 
 import xml.etree.ElementTree as ET
 import logging
+from text import index
+from text.slots import Slotted
 from text.offset import Offset, Offsets, perfect_overlap, contained_by, no_overlap
 
 
-class Entity(object):
+class Entity(Slotted):
     """Base entity class"""
+    # attributes of subclasses that are not slots are kept in __dict__
+    __slots__ = ("type", "subtype", "text", "did", "sid", "eid", "tokens", "start", "end", "dstart", "dend", "exclude",
+                 "dexclude", "recognized_by", "subentities", "targets", "score", "scores", "original_id", "normalized",
+                 "normalized_score", "normalized_ref", "__dict__")
 
     def __init__(self, tokens, *args, **kwargs):
         self.type = kwargs.get('e_type', None)
@@ -211,7 +217,7 @@ class Entities(object):
                     eid_offset = Offset(e.dstart, e.dend, text=e.text, sid=e.sid, eid=next_eid)
                     added = False
                     # check for perfect overlaps only
-                    for i, o in enumerate(offsets.offsets):
+                    for i, o in enumerate(offsets.get_overlapping(eid_offset)):
                         overlap = eid_offset.overlap(o)
                         if overlap == perfect_overlap:
                             combined[o.eid].recognized_by.append(s)
@@ -227,7 +233,7 @@ class Entities(object):
                         elif overlap != no_overlap:
                             added = True # skip this
                     if not added:
-                        offsets.offsets.add(eid_offset)
+                        offsets.add(eid_offset)
                         e.recognized_by = [s]
                         e.scores[s] = e.score
                         # if hasattr(e, "ssm_score"):
@@ -267,8 +273,14 @@ class Entities(object):
                         logging.debug("did not add {}".format(e.text))
         return spans
 
+    def find_entity_by_eid(self, eid, source="goldstandard"):
+        """
+        :return: first entity of source with that ID, None if there is none
+        """
+        return index.find(self, self.elist[source], "eid", eid, name=source)
+
     def get_entity(self, eid, source="goldstandard"):
-        for e in self.elist[source]:
-            if e.eid == eid:
-                return e
+        e = self.find_entity_by_eid(eid, source)
+        if e is not None:
+            return e
         print "entity not found:", eid, source
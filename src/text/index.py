@@ -0,0 +1,95 @@
+from __future__ import division, absolute_import
+
+import weakref
+
+# indexes of each object, so that they are not saved when the object is pickled
+_indexes = weakref.WeakKeyDictionary()
+
+
+class ListIndex(object):
+    """
+    Dictionary of the items of a list by one of their attributes. The index keeps the list that it was built from,
+    and it is built again when the list is replaced or changes size, or when the item found is not at the same
+    position or does not have the key anymore. A key that is not on the index is not searched again, so the key of an
+    item should not be changed after the item is added to a list that was already searched.
+    """
+    def __init__(self, attribute):
+        self.attribute = attribute
+        self.list = None
+        self.length = None
+        # key -> position of the first item with that key
+        self.positions = {}
+
+    def build(self, items):
+        self.positions = {}
+        for i, item in enumerate(items):
+            # keep the first item with each key, like a linear search
+            self.positions.setdefault(getattr(item, self.attribute), i)
+        self.list = items
+        self.length = len(items)
+
+    def get(self, items, key):
+        """Item of the index with that key, None if it is not there or the item changed"""
+        i = self.positions.get(key)
+        if i is not None and getattr(items[i], self.attribute) == key:
+            return items[i]
+        return None
+
+    def find(self, items, key):
+        """
+        :param items: list indexed by this index
+        :return: first item of the list with that key, None if there is none
+        """
+        if self.list is not items or self.length != len(items):
+            self.build(items)
+        if key not in self.positions:
+            return None
+        item = self.get(items, key)
+        if item is None:
+            # an item was replaced or its key changed without changing the size of the list
+            self.build(items)
+            item = self.get(items, key)
+        return item
+
+
+def find(owner, items, attribute, key, name=None):
+    """
+    Find the first item of a list of owner with a given attribute value, using an index of that list
+    :param owner: object that has the list, for example the document of a list of sentences
+    :param items: list of items
+    :param attribute: attribute of the items used as key
+    :param key: value of the attribute
+    :param name: name of the index, if the owner has more than one list indexed by the same attribute
+    """
+    owner_indexes = get_owner_indexes(owner)
+    index_name = (name, attribute)
+    if index_name not in owner_indexes:
+        owner_indexes[index_name] = ListIndex(attribute)
+    return owner_indexes[index_name].find(items, key)
+
+
+def get_owner_indexes(owner):
+    owner_indexes = _indexes.get(owner)
+    if owner_indexes is None:
+        owner_indexes = {}
+        _indexes[owner] = owner_indexes
+    return owner_indexes
+
+
+def get_cached(owner, name, items, build, rebuild=False):
+    """
+    Get a value computed from a list of owner, computing it again if the list was replaced or changed size
+    :param build: function that receives the list and returns the value
+    :param rebuild: compute the value even if the list did not change
+    """
+    owner_indexes = get_owner_indexes(owner)
+    # the list is kept with the value, so that another list cannot be taken for it
+    cached_items, length, value = owner_indexes.get(name, (None, None, None))
+    if rebuild or cached_items is not items or length != len(items):
+        value = build(items)
+        owner_indexes[name] = (items, len(items), value)
+    return value
+
+
+def is_sorted(values):
+    return all(values[i] <= values[i+1] for i in xrange(len(values) - 1))
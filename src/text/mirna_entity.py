@@ -20,10 +20,12 @@ with open(config.stoplist, 'r') as stopfile:
         if w not in mirna_stopwords and len(w) > 1:
             mirna_stopwords.add(w)
 mirna_stopwords.discard("let")
+# miRBase is loaded on the first call to map_label
 mirna_graph = MirbaseDB(config.mirbase_path)
-mirna_graph.load_graph()
 
 class MirnaEntity(Entity):
+    __slots__ = ("mirna_acc", "mirna_name", "nextword", "go_ids", "best_go")
+
     def __init__(self, tokens, sid, *args, **kwargs):
         # Entity.__init__(self, kwargs)
         super(MirnaEntity, self).__init__(tokens, **kwargs)
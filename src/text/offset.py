@@ -1,4 +1,8 @@
+import bisect
 import logging
+
+from text.slots import Slotted
+
 partial_overlap_before = 1
 partial_overlap_after = -1
 no_overlap = 0
@@ -7,10 +11,12 @@ contained_by = -2
 perfect_overlap = -3
 
 
-class Offset(object):
+class Offset(Slotted):
     """
     Offset relative to a fragment of text
     """
+    __slots__ = ("start", "end", "text", "sid", "eid", "tag")
+
     def __init__(self, start, end, **kwargs):
         self.start = start
         self.end = end
@@ -70,13 +76,45 @@ class Offset(object):
 class Offsets(object):
     """
     Set of offsets relative to a text.
+    The offsets are also kept sorted by start, so that only the offsets that can overlap a new offset are compared
+    with it. Use add and remove instead of changing self.offsets directly.
     """
     def __init__(self):
         self.offsets = set()
+        self.starts = []
+        self.sorted_offsets = []
+        # the offsets that overlap o start between o.start - max_length and o.end
+        self.max_length = 0
 
     def __iter__(self):
         return self
 
+    def add(self, o):
+        if o in self.offsets:
+            return
+        self.offsets.add(o)
+        i = bisect.bisect_right(self.starts, o.start)
+        self.starts.insert(i, o.start)
+        self.sorted_offsets.insert(i, o)
+        self.max_length = max(self.max_length, o.end - o.start)
+
+    def remove(self, o):
+        self.offsets.remove(o)
+        i = bisect.bisect_left(self.starts, o.start)
+        while self.sorted_offsets[i] is not o:
+            i += 1
+        del self.starts[i]
+        del self.sorted_offsets[i]
+
+    def get_overlapping(self, o):
+        """
+        Get the offsets that overlap o, including the ones that only share one of its limits,
+        i.e. every offset oo where o.overlap(oo) != no_overlap
+        """
+        first = bisect.bisect_left(self.starts, o.start - self.max_length)
+        last = bisect.bisect_right(self.starts, o.end)
+        return [oo for oo in self.sorted_offsets[first:last] if oo.end >= o.start]
+
     def add_offset(self, o, exclude_this_if, exclude_others_if):
         """
         Check if offset is not repeated or overlapped and add.
@@ -87,7 +125,11 @@ class Offsets(object):
         to_exclude = []
         v = 0
         toadd = True
-        for oi, oo in enumerate(self.offsets):
+        if no_overlap in exclude_this_if or no_overlap in exclude_others_if:
+            candidates = self.sorted_offsets
+        else:
+            candidates = self.get_overlapping(o)
+        for oi, oo in enumerate(candidates):
             over = o.overlap(oo)
             if over in exclude_this_if:
                 toadd = False
@@ -102,8 +144,8 @@ class Offsets(object):
             #    logging.info("Overlap of %s:%s:%s:%s and %s:%s:%s:%s = %s" % (o.text, o.start, o.end, o.sid,
             #                                                            oo.text, oo.start, oo.end, o.sid, over))
         if toadd:
-            self.offsets.add(o)
+            self.add(o)
             for oo in to_exclude:
-                self.offsets.remove(oo)
+                self.remove(oo)
         #logging.info(str(len(self.offsets)))
         return toadd, v, overlapping, to_exclude
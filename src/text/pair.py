@@ -1,9 +1,15 @@
 from __future__ import unicode_literals
 import logging
 
+from text import index
+from text.slots import Slotted
 
-class Pair(object):
+
+class Pair(Slotted):
     """Relation between two entities from the same sentence"""
+    __slots__ = ("sid", "did", "pid", "between_text", "entities", "eids", "relation", "recognized_by", "score",
+                 "__dict__")
+
     def __init__(self, entities, relation, *args, **kwargs):
         self.sid = kwargs.get("sid")
         self.did = kwargs.get("did")
@@ -47,6 +53,12 @@ class Pairs(object):
             dic.append(p.get_dic())
         return dic
 
+    def get_pair(self, pid):
+        """
+        :return: first pair with that ID, None if there is none
+        """
+        return index.find(self, self.pairs, "pid", pid)
+
     def add_pair(self, pair, psource):
             # logging.debug("created new entry %s for %s" % (esource, self.sid))
         #if entity in self.elist[esource]:
@@ -0,0 +1,153 @@
+from __future__ import division, absolute_import
+
+import logging
+import multiprocessing
+import threading
+import time
+from multiprocessing.pool import ThreadPool
+
+import progressbar as pb
+from pycorenlp import StanfordCoreNLP
+
+from text import corenlp_cache
+from text import document
+from text import sentence_splitter
+
+# number of workers and type of pool used to preprocess documents, set with configure()
+workers = 1
+backend = "process"
+# CoreNLP client of each worker process
+_corenlpserver = None
+
+
+def configure(nworkers=1, pool_backend="process"):
+    """
+    Set the number of workers and type of pool used to preprocess documents
+    :param nworkers: number of documents processed at the same time
+    :param pool_backend: "process" to use one process per worker, "thread" to use threads of this process
+    """
+    global workers, backend
+    if pool_backend not in ("process", "thread"):
+        raise ValueError("invalid preprocessing backend: {}".format(pool_backend))
+    workers = max(1, int(nworkers))
+    backend = pool_backend
+
+
+def init_worker(server_url):
+    """Create the CoreNLP client used by this worker process"""
+    global _corenlpserver
+    if server_url:
+        _corenlpserver = StanfordCoreNLP(server_url)
+
+
+def preprocess_documents(docs, corenlpserver, process=True):
+    """
+    Sentence split the documents without sentences and process the sentences of every document with CoreNLP,
+    sending sentences of multiple documents in the same request
+    :return: the documents, the name of the worker, the time it took and the CoreNLP cache stats of the worker
+    """
+    t = time.time()
+    to_split = [doc for doc in docs if len(doc.sentences) == 0]
+    if to_split:
+        splitter = sentence_splitter.get_splitter()
+        for doc, sentences in zip(to_split, splitter.split([doc.text for doc in to_split])):
+            doc.add_sentences(sentences)
+    if process:
+        document.process_sentences([s for doc in docs for s in doc.sentences], corenlpserver)
+    if backend == "thread":
+        worker = threading.current_thread().name
+    else:
+        worker = multiprocessing.current_process().name
+    cache = corenlp_cache.get_cache()
+    if cache is not None:
+        cache_stats = cache.stats()
+    else:
+        cache_stats = None
+    return docs, worker, time.time() - t, cache_stats
+
+
+def preprocess_documents_worker(args):
+    """Entry point of the process pool, using the CoreNLP client of the worker process"""
+    docs, process = args
+    return preprocess_documents(docs, _corenlpserver, process)
+
+
+def group_documents(documents, max_chars=document.corenlp_batch_chars):
+    """
+    Group consecutive documents so that the text of each group fits in one CoreNLP request
+    """
+    group = []
+    group_chars = 0
+    for doc in documents:
+        if group and group_chars + len(doc.text) > max_chars:
+            yield group
+            group = []
+            group_chars = 0
+        group.append(doc)
+        group_chars += len(doc.text)
+    if group:
+        yield group
+
+
+def process_documents(documents, corenlpserver, process=True):
+    """
+    Preprocess a list of documents with the configured pool of workers. Each worker receives a group of consecutive
+    documents, whose sentences are sent to CoreNLP in the same request.
+    Documents are yielded in the same order as the input list, so sentence IDs are the same as the serial version.
+    :param documents: list of Document objects
+    :param corenlpserver: StanfordCoreNLP client; process workers open their own client to the same server
+    :param process: if False, only sentence split the documents
+    """
+    if not documents:
+        return
+    worker_times = {}
+    worker_cache_stats = {}
+    widgets = [pb.Percentage(), ' ', pb.Bar(), ' ', pb.ETA(), ' ', pb.Timer()]
+    pbar = pb.ProgressBar(widgets=widgets, maxval=len(documents)).start()
+    start_time = time.time()
+    pool = None
+    # smaller groups if there would not be enough groups for every worker
+    max_chars = min(document.corenlp_batch_chars, sum(len(doc.text) for doc in documents) // workers + 1)
+    groups = list(group_documents(documents, max_chars))
+    nworkers = min(workers, len(groups))
+    if nworkers == 1:
+        results = (preprocess_documents(docs, corenlpserver, process) for docs in groups)
+    elif backend == "thread":
+        pool = ThreadPool(nworkers)
+        results = pool.imap(lambda docs: preprocess_documents(docs, corenlpserver, process), groups)
+    else:
+        server_url = getattr(corenlpserver, "server_url", None)
+        pool = multiprocessing.Pool(nworkers, initializer=init_worker, initargs=(server_url,))
+        results = pool.imap(preprocess_documents_worker, [(docs, process) for docs in groups])
+    ndocs = 0
+    try:
+        for docs, worker, docs_time, cache_stats in results:
+            if worker not in worker_times:
+                worker_times[worker] = [0, 0]
+            worker_times[worker][0] += len(docs)
+            worker_times[worker][1] += docs_time
+            if cache_stats is not None:
+                worker_cache_stats[worker] = cache_stats
+            for doc in docs:
+                ndocs += 1
+                pbar.update(ndocs)
+                yield doc
+    except:
+        if pool is not None:
+            pool.terminate()
+        raise
+    if pool is not None:
+        # let the workers exit normally so that they clean up their sentence splitters
+        pool.close()
+        pool.join()
+    pbar.finish()
+    total_time = time.time() - start_time
+    for worker in sorted(worker_times):
+        ndocs, worker_time = worker_times[worker]
+        logging.info("{}: {} documents in {:.2f}s ({:.2f}s per document)".format(worker, ndocs, worker_time,
+                                                                              worker_time / ndocs))
+        if worker in worker_cache_stats:
+            logging.info("{}: CoreNLP cache {hits} hits, {misses} misses ({hit_rate:.1%})".format(
+                worker, **worker_cache_stats[worker]))
+    logging.info("preprocessed {} documents with {} workers in {:.2f}s ({:.2f} documents/s)".format(
+        len(documents), nworkers, total_time, len(documents) / max(total_time, 1e-6)))
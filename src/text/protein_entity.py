@@ -16,6 +16,7 @@ if use_go:
 from config import config
 from text.entity import Entity
 from text.token2 import Token2
+from uniprot_base import UniprotIndex
 
 __author__ = 'Andre'
 prot_words = set()
@@ -50,6 +51,30 @@ def exit_handler():
 
 atexit.register(exit_handler)
 
+uniprot_index = UniprotIndex(config.uniprot_index)
+if not uniprot_index.exists():
+    logging.info("UniProt index not found: {}".format(config.uniprot_index))
+
+
+def search_uniprot_online(text):
+    """
+    Query uniprot.org for the best human entry of a text
+    :return: columns of the entry separated by tabs, or None
+    """
+    query = {"query": text + ' AND organism:9606',
+             "sort": "score",
+             "columns": "id,entry name,reviewed,protein names,organism,go,go-id",
+             "format": "tab",
+             "limit": "1"}
+    headers = {'User-Agent': 'IBEnt (CentOS) alamurias@lasige.di.fc.ul.pt'}
+    r = requests.get('http://www.uniprot.org/uniprot/', query, headers=headers)
+    # logging.debug("Request Status: " + str(r.status_code))
+    if "\n" not in r.text:
+        return None
+    c = r.text.split("\n")[1].strip()
+    uniprot[text] = c
+    return c
+
 
 def get_uniprot_name(text):
     global uniprot
@@ -57,22 +82,12 @@ def get_uniprot_name(text):
     if text in uniprot:
         c = uniprot[text]
     else:
-        query = {"query": text + ' AND organism:9606',
-                 "sort": "score",
-                 "columns": "id,entry name,reviewed,protein names,organism,go,go-id",
-                 "format": "tab",
-                 "limit": "1"}
-        headers = {'User-Agent': 'IBEnt (CentOS) alamurias@lasige.di.fc.ul.pt'}
-        r = requests.get('http://www.uniprot.org/uniprot/', query, headers=headers)
-        # logging.debug("Request Status: " + str(r.status_code))
-
-        c = r.text
-        if "\n" not in c:
+        c = uniprot_index.search(text)
+        if c is None and config.uniprot_online:
+            c = search_uniprot_online(text)
+        if c is None:
             logging.info("nothing found on uniprot for {}".format(text))
             c = text + "\t0\t" + "NA\t" * 4
-        else:
-            c = c.split("\n")[1].strip()
-            uniprot[text] = c
     values = c.split("\t")
     normalized = text.strip()
     normalized_score = 0
@@ -93,6 +108,8 @@ def get_uniprot_name(text):
     return normalized, normalized_score, go_ids
 
 class ProteinEntity(Entity):
+    __slots__ = ("go_ids", "best_go")
+
     def __init__(self, tokens, sid, *args, **kwargs):
         # Entity.__init__(self, kwargs)
         super(ProteinEntity, self).__init__(tokens, *args, **kwargs)
@@ -1,4 +1,5 @@
 from __future__ import unicode_literals
+import bisect
 import logging
 import socket
 import sys
@@ -6,6 +7,8 @@ from xml.etree import ElementTree as ET
 import re
 import pprint
 from classification.ner.stanfordner import stanford_coding
+from text import corenlp_cache
+from text import index
 from text.offset import Offsets, Offset
 from text.protein_entity import ProteinEntity
 
@@ -22,6 +25,19 @@ from text.time_entity import TimeEntity
 from text.tlink import TLink
 
 pp = pprint.PrettyPrinter(indent=2)
+
+
+def get_token_offsets(tokens, start_attribute, end_attribute):
+    """
+    :return: (starts, ends) of the tokens, None if the tokens are not sorted
+    """
+    starts = [getattr(t, start_attribute) for t in tokens]
+    ends = [getattr(t, end_attribute) for t in tokens]
+    if not index.is_sorted(starts) or not index.is_sorted(ends):
+        return None
+    return starts, ends
+
+
 class Sentence(object):
     """Sentence from a document, to be annotated"""
     def __init__(self, text, offset=0, **kwargs):
@@ -40,20 +56,13 @@ class Sentence(object):
         pass
 
     def process_sentence(self, corenlpserver, doctype="biomedical"):
-        corenlpres = corenlpserver.annotate(self.text.encode("utf8"), properties={
-            'ssplit.eolonly': True,
-            'annotators': 'tokenize,ssplit,pos,ner,lemma',
-            #'annotators': 'tokenize,ssplit,pos,parse,ner,lemma,depparse',
-            'outputFormat': 'json',
-        })
-        if isinstance(corenlpres, basestring):
+        # 'annotators': 'tokenize,ssplit,pos,parse,ner,lemma,depparse',
+        # 'annotators': 'tokenize,ssplit,pos,depparse,parse',
+        for annotators in ('tokenize,ssplit,pos,ner,lemma', 'tokenize,ssplit,pos,lemma'):
+            corenlpres = corenlp_cache.annotate(self.text, corenlpserver, annotators)
+            if not isinstance(corenlpres, basestring):
+                break
             print corenlpres
-            corenlpres = corenlpserver.annotate(self.text.encode("utf8"), properties={
-                'ssplit.eolonly': True,
-                # 'annotators': 'tokenize,ssplit,pos,depparse,parse',
-                'annotators': 'tokenize,ssplit,pos,lemma',
-                'outputFormat': 'json',
-            })
         if isinstance(corenlpres, basestring):
             print "could not process this sentence:", self.text.encode("utf8")
             print corenlpres
@@ -176,23 +185,24 @@ class Sentence(object):
         tlist = []
         # print self.tokens
         nextword = ""
-        for t in self.tokens:
+        last_token = None
+        # only the tokens that end after start and start until the next word can match
+        first, last = self.get_token_range(start, end + 1, "sent", contained=False)
+        for t in self.tokens[first:last]:
             # discard tokens that intersect the entity for now
             # print t.start, t.end, t.text
             if t.start >= start and t.end <= end:
                 tlist.append(t)
             elif (t.start == start and t.end > end) or (t.start < start and t.end == end):
                 tlist.append(t)
+                last_token = t
                 break
             elif t.start == end+1:
                 nextword = t.text
-            exclude_list = []
-            if exclude is not None:
-                for t in tlist:
-                    for e in exclude:
-                        if t.start >= e[0] and t.end <= e[1]-1:
-                            exclude_list.append(t.tid)
-            tlist = [t for t in tlist if t.tid not in exclude_list]
+        if exclude is not None:
+            # the last token is kept even if it is excluded
+            tlist = [t for t in tlist if t is last_token or
+                     not any(t.start >= e[0] and t.end <= e[1]-1 for e in exclude)]
         if tlist:
             if exclude is not None:
                 newtext = self.text[tlist[0].start:exclude[0][0]]
@@ -341,13 +351,36 @@ class Sentence(object):
         """Return list of tokens between offsets. Use relativeto to consider doc indexes or
            sentence indexes."""
         foundtokens = []
-        for t in self.tokens:
+        first, last = self.get_token_range(start, end, relativeto)
+        for t in self.tokens[first:last]:
             if relativeto.startswith("doc") and t.dstart >= start and t.dend <= end:
                 foundtokens.append(t)
             elif relativeto.startswith("sent") and t.start >= start and t.end <= end:
                 foundtokens.append(t)
         return foundtokens
 
+    def get_token_range(self, start, end, relativeto="doc", contained=True):
+        """
+        Get the range of tokens that are between start and end, using the offsets of the tokens sorted by start.
+        :param relativeto: "doc" to use the offsets relative to the document, "sent" relative to the sentence
+        :param contained: if False, get the tokens that end after start and start before end
+        :return: index of the first token and of the token after the last one
+        """
+        if relativeto.startswith("doc"):
+            offsets = index.get_cached(self, "doc_token_offsets", self.tokens,
+                                       lambda tokens: get_token_offsets(tokens, "dstart", "dend"))
+        else:
+            offsets = index.get_cached(self, "sent_token_offsets", self.tokens,
+                                       lambda tokens: get_token_offsets(tokens, "start", "end"))
+        if offsets is None:
+            # tokens are not sorted
+            return 0, len(self.tokens)
+        starts, ends = offsets
+        if contained:
+            return bisect.bisect_left(starts, start), bisect.bisect_right(ends, end)
+        else:
+            return bisect.bisect_left(ends, start), bisect.bisect_right(starts, end)
+
     def test_relations(self, pairs, basemodel, classifiers=[relations.SLK_PRED, relations.SST_PRED],
                        tag="", backup=False, printstd=False):
         #data =  ddi_train_slk.model, ddi_train_sst.model
@@ -0,0 +1,182 @@
+from __future__ import division, absolute_import
+
+import abc
+import io
+import logging
+import os
+import re
+import shutil
+import tempfile
+import threading
+from distutils.spawn import find_executable
+from multiprocessing.util import Finalize
+from subprocess import Popen, PIPE
+
+from config.config import geniass_path
+from worker_local import WorkerLocal
+
+# abbreviations that do not end a sentence with the python splitter
+abbreviations = set(["e.g", "i.e", "al", "fig", "figs", "ref", "refs", "vs", "etc", "approx", "ca", "cf", "no", "nos",
+                     "dr", "mr", "mrs", "st", "eq", "resp", "sp", "spp", "var", "viz", "wt", "vol", "suppl"])
+sentence_end = re.compile(r'[.!?]+["\')\]]*(?=\s+["\'(\[]?[A-Z0-9])')
+
+
+def align_sentences(text, sentences, offset=0):
+    """
+    Get the offset of each sentence on the text, assuming that the sentences are in order and only whitespace
+    is between them
+    :param text: text that was split
+    :param sentences: list of sentence texts
+    :param offset: index where the first sentence starts
+    :return: list of (offset, sentence text)
+    """
+    aligned = []
+    for stext in sentences:
+        offset = skip_whitespace(text, offset)
+        aligned.append((offset, stext))
+        offset += len(stext)
+    return aligned
+
+
+def skip_whitespace(text, offset):
+    while offset < len(text) and text[offset].isspace():
+        offset += 1
+    return offset
+
+
+class SentenceSplitter(object):
+    """
+    Base sentence splitter. split receives a list of texts so that subclasses can process several texts at once.
+    """
+    __metaclass__ = abc.ABCMeta
+
+    def split(self, texts):
+        """
+        Split each text into sentences
+        :param texts: list of texts
+        :return: list with a list of (offset, sentence text) for each text
+        """
+        return [align_sentences(text, self.split_text(text)) for text in texts]
+
+    @abc.abstractmethod
+    def split_text(self, text):
+        """
+        :return: list of the sentence texts of a text
+        """
+
+    def close(self):
+        pass
+
+
+class PythonSentenceSplitter(SentenceSplitter):
+    """
+    Rule based splitter used when the GENIA sentence splitter is not available. Sentences end with punctuation followed
+    by whitespace and a capital letter or number, except after common abbreviations, and at line breaks.
+    """
+    def split_text(self, text):
+        sentences = []
+        for line in text.split("\n"):
+            start = 0
+            for m in sentence_end.finditer(line):
+                words = line[start:m.start()].split()
+                if words and words[-1].lower().lstrip("([{\"'").rstrip(".") in abbreviations:
+                    continue
+                # single letters are initials, as in "A. thaliana"
+                if words and len(words[-1]) == 1 and words[-1].isalpha() and m.group().startswith("."):
+                    continue
+                sentences.append(line[start:m.end()].strip())
+                start = m.end()
+            sentences.append(line[start:].strip())
+        return [s for s in sentences if s]
+
+
+class GeniaSentenceSplitter(SentenceSplitter):
+    """
+    GENIA sentence splitter. geniass reads and writes whole files, so instead of running it for each document,
+    it is run once for each batch of texts.
+    Each splitter uses its own directory, so different threads and processes should use different splitters
+    (see get_splitter).
+    """
+    def __init__(self, path=geniass_path):
+        self.path = path
+        self.tempdir = tempfile.mkdtemp(prefix="geniass")
+        self.input_path = os.path.join(self.tempdir, "geniainput.txt")
+        self.output_path = os.path.join(self.tempdir, "geniaoutput.txt")
+        self.lock = threading.Lock()
+        self.nruns = 0
+
+    def run(self, texts):
+        """
+        Run geniass on the texts, separated by newlines
+        :return: sentences of all the texts
+        """
+        with self.lock:
+            with io.open(self.input_path, 'w', encoding='utf-8') as geniainput:
+                geniainput.write(u"\n".join(texts))
+            geniaargs = ["./geniass", self.input_path, self.output_path]
+            Popen(geniaargs, stdout=PIPE, stderr=PIPE, cwd=self.path).communicate()
+            self.nruns += 1
+            with io.open(self.output_path, 'r', encoding="utf-8") as geniaoutput:
+                sentences = [l.strip() for l in geniaoutput]
+        return [s for s in sentences if s != ""]
+
+    def split_text(self, text):
+        return self.run([text])
+
+    def split(self, texts):
+        if len(texts) == 1:
+            return [align_sentences(texts[0], self.run(texts))]
+        # geniass does not join lines, so each sentence belongs to only one of the texts
+        sentences = self.run(texts)
+        results = []
+        i = 0
+        for ti, text in enumerate(texts):
+            aligned = []
+            offset = 0
+            while i < len(sentences):
+                offset = skip_whitespace(text, offset)
+                if offset == len(text):
+                    break
+                if not text.startswith(sentences[i], offset):
+                    break
+                aligned.append((offset, sentences[i]))
+                offset += len(sentences[i])
+                i += 1
+            if skip_whitespace(text, offset) != len(text):
+                # the output does not match the input, so split the rest of the texts one by one
+                logging.debug("could not align geniass output, splitting {} texts separately".format(len(texts) - ti))
+                results += SentenceSplitter.split(self, texts[ti:])
+                break
+            results.append(aligned)
+        return results
+
+    def close(self):
+        shutil.rmtree(self.tempdir, ignore_errors=True)
+
+
+def genia_available(path=geniass_path):
+    return os.path.isfile(os.path.join(path, "geniass")) and find_executable("ruby") is not None
+
+
+def new_splitter():
+    """
+    Uses the GENIA sentence splitter if it is installed, and the python splitter otherwise.
+    """
+    if genia_available():
+        splitter = GeniaSentenceSplitter()
+    else:
+        logging.warning("GENIA sentence splitter or ruby not found, using python sentence splitter")
+        splitter = PythonSentenceSplitter()
+    # also called when pool workers exit
+    Finalize(splitter, splitter.close, exitpriority=0)
+    return splitter
+
+
+_splitters = WorkerLocal(new_splitter)
+
+
+def get_splitter():
+    """
+    Get the sentence splitter of the current thread and process, creating it if necessary.
+    """
+    return _splitters.get()
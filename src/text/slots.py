@@ -0,0 +1,55 @@
+from __future__ import division, absolute_import
+
+_class_slots = {}
+
+
+def get_slots(cls):
+    """Names of the slots of a class and its base classes, except __dict__ and __weakref__"""
+    if cls not in _class_slots:
+        names = []
+        for c in reversed(cls.__mro__):
+            slots = c.__dict__.get("__slots__", ())
+            if isinstance(slots, basestring):
+                slots = (slots,)
+            names += [str(s) for s in slots if s not in ("__dict__", "__weakref__") and s not in names]
+        _class_slots[cls] = tuple(names)
+    return _class_slots[cls]
+
+
+def get_attributes(obj):
+    """
+    Attributes of an object with or without __slots__, as a dictionary
+    Slots that were not set are not included.
+    """
+    attributes = dict(getattr(obj, "__dict__", {}))
+    for name in get_slots(obj.__class__):
+        try:
+            attributes[name] = getattr(obj, name)
+        except AttributeError:
+            pass
+    return attributes
+
+
+class Slotted(object):
+    """
+    Base class of objects that exist in large numbers on a corpus, such as tokens, entities and offsets, which keep
+    their attributes in __slots__ instead of a dictionary per object.
+    Objects are pickled with a dictionary of attributes, the same state as objects pickled before these classes had
+    __slots__, so corpora saved by older versions can still be loaded.
+    """
+    __slots__ = ()
+    # attributes of older versions that are no longer kept, ignored when loading old pickles
+    removed_attributes = ()
+
+    def __getstate__(self):
+        return get_attributes(self)
+
+    def __setstate__(self, state):
+        if isinstance(state, tuple):
+            # (__dict__, slots) state of objects pickled without __getstate__
+            dict_state, slots_state = state
+            state = dict(dict_state or {})
+            state.update(slots_state or {})
+        for name, value in state.iteritems():
+            if name not in self.removed_attributes:
+                setattr(self, name, value)
@@ -1,16 +1,25 @@
 import logging
 
-class Token2(object):
+from text.slots import Slotted
+
+
+class Token2(Slotted):
     """
     Token that is part of a sentence
     The 2 is because there's already a token class in NLTK
+    Attributes set by some readers that are not slots, such as genia_pos, are kept in __dict__, which is only created
+    when one of them is set.
     """
+    __slots__ = ("text", "sid", "order", "tags", "tid", "start", "end", "dstart", "dend", "pos", "tag", "lemma",
+                 "__dict__")
+    # feature sets are kept by the models that use them
+    removed_attributes = ("features",)
+
     def __init__(self, text, **kwargs):
         # TODO: require start and end and dstart and dend
         self.text = text
         self.sid = kwargs.get("sid")
         self.order = kwargs.get("order")
         # logging.debug("order: {}".format(self.order))
-        self.features = {}
         self.tags = {}
         self.tid = kwargs.get("tid")
\ No newline at end of file
@@ -1,12 +1,12 @@
 import argparse
 import logging
 import time
-import cPickle as pickle
 from collections import OrderedDict
+from classification.results import load_results
 from classification.rext.multiinstance import MILClassifier
 from config.corpus_paths import paths
 from evaluate import get_gold_ann_set, get_list_results, get_relations_results
-from text.corpus import Corpus
+from text.corpus import Corpus, open_corpus
 
 def main():
     start_time = time.time()
@@ -52,7 +52,7 @@ def main():
     for goldstd in options.train:
         corpus_path = paths[goldstd]["corpus"]
         logging.info("loading corpus %s" % corpus_path)
-        train_corpus = pickle.load(open(corpus_path, 'rb'))
+        train_corpus = open_corpus(corpus_path)
         for sentence in train_corpus.get_sentences(options.emodels[0]):
             for e in sentence.entities.elist[options.emodels[0]]:
                 if e.normalized_score > 0:
@@ -80,7 +80,7 @@ def main():
     for g in options.test:
         corpus_path = paths[g]["corpus"]
         logging.info("loading corpus %s" % corpus_path)
-        test_corpus = pickle.load(open(corpus_path, 'rb'))
+        test_corpus = open_corpus(corpus_path)
         test_sets.append(test_corpus)
 
 
@@ -97,8 +97,8 @@ def main():
         test_model.test()
         results = test_model.get_predictions(test_corpus)
         results.path = options.results + "-" + options.test[i]
-        results.save(options.results + "-" + options.test[i] + ".pickle")
-        results.load_corpus(options.test[i])
+        results.save(results.path + ".pickle")
+        results = load_results(results.path + ".pickle", options.test[i])
         if options.test[i] != "mirna_cf_annotated":
             logging.info("loading gold standard %s" % paths[options.test[i]]["annotations"])
             goldset = get_gold_ann_set(paths[options.test[i]]["format"], paths[options.test[i]]["annotations"],
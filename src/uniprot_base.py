@@ -0,0 +1,321 @@
+from __future__ import division, absolute_import
+
+import argparse
+import gzip
+import logging
+import os
+import re
+import sqlite3
+import threading
+import time
+from xml.etree import cElementTree as ElementTree
+
+from config import config
+from worker_local import WorkerLocal
+
+# order of the kinds of names when a text matches several entries; reviewed entries come first
+ACCESSION, GENE_NAME, GENE_SYNONYM, PROTEIN_NAME, ALTERNATIVE_NAME = range(5)
+uniprot_ns = "{http://uniprot.org/uniprot}"
+# evidence tags of the flat file, e.g. {ECO:0000269|PubMed:1234}
+evidence_re = re.compile(r"\s*\{[^}]*\}")
+flat_name_re = re.compile(r"(Full|Short|CD_antigen|INN|Allergen|Biotech)=([^;]+);")
+
+
+def name_key(name):
+    """key of a name in the index: case is ignored"""
+    return name.strip().lower()
+
+
+def compact_key(name):
+    """key of a name ignoring punctuation and spaces, so that IL-2 also matches IL2"""
+    return re.sub(r"[\W_]+", "", name.lower(), flags=re.UNICODE)
+
+
+def open_dump(path):
+    if path.endswith(".gz"):
+        return gzip.open(path, "rb")
+    return open(path, "rb")
+
+
+def new_entry():
+    return {"accessions": [], "entry_name": "", "reviewed": False, "protein_names": [], "alternative_names": [],
+            "gene_names": [], "gene_synonyms": [], "organism": "", "taxid": "", "go": []}
+
+
+def parse_flat(dump):
+    """
+    Read the entries of a UniProtKB flat file (.dat)
+    :param dump: file object
+    :return: iterator of entry dictionaries
+    """
+    entry = new_entry()
+    section = None
+    gene_text = []
+    organism_text = []
+    for line in dump:
+        line = line.decode("utf-8").rstrip()
+        code, text = line[:2], evidence_re.sub("", line[5:])
+        if code == "//":
+            entry["organism"] = " ".join(organism_text).rstrip(".")
+            parse_flat_genes(" ".join(gene_text), entry)
+            yield entry
+            entry = new_entry()
+            section = None
+            gene_text = []
+            organism_text = []
+        elif code == "ID":
+            values = text.split()
+            entry["entry_name"] = values[0]
+            entry["reviewed"] = values[1].startswith("Reviewed")
+        elif code == "AC":
+            entry["accessions"] += [a.strip() for a in text.split(";") if a.strip()]
+        elif code == "DE":
+            text = text.strip()
+            if text.startswith(("Contains:", "Includes:")):
+                # names of the chains and domains of the protein
+                section = "component"
+                continue
+            elif text.startswith(("RecName:", "SubName:")) and section != "component":
+                section = "protein_names"
+            elif text.startswith("AltName:") and section != "component":
+                section = "alternative_names"
+            elif text.startswith("Flags:"):
+                continue
+            if section in ("protein_names", "alternative_names"):
+                entry[section] += [name.strip() for kind, name in flat_name_re.findall(text)]
+        elif code == "GN":
+            gene_text.append(text)
+        elif code == "OS":
+            organism_text.append(text.strip())
+        elif code == "OX":
+            match = re.search(r"NCBI_TaxID=(\d+)", text)
+            if match:
+                entry["taxid"] = match.group(1)
+        elif code == "DR" and text.startswith("GO;"):
+            values = [v.strip() for v in text.split(";")]
+            # C:cytoplasm -> cytoplasm
+            entry["go"].append((values[1], values[2][2:]))
+
+
+def parse_flat_genes(text, entry):
+    """Add the gene names of the GN lines of an entry, e.g. Name=TP53; Synonyms=P53; ORFNames=..."""
+    for part in text.split(";"):
+        if "=" not in part:
+            continue
+        key, values = part.split("=", 1)
+        names = [v.strip() for v in values.split(",") if v.strip()]
+        if key.strip() == "Name":
+            entry["gene_names"] += names
+        elif key.strip() in ("Synonyms", "OrderedLocusNames", "ORFNames"):
+            entry["gene_synonyms"] += names
+
+
+def parse_xml(dump):
+    """
+    Read the entries of a UniProtKB XML file
+    :param dump: file object
+    :return: iterator of entry dictionaries
+    """
+    root = None
+    for event, element in ElementTree.iterparse(dump, events=("start", "end")):
+        if root is None:
+            root = element
+        if event != "end" or element.tag != uniprot_ns + "entry":
+            continue
+        entry = new_entry()
+        entry["reviewed"] = element.get("dataset") == "Swiss-Prot"
+        entry["accessions"] = [a.text for a in element.findall(uniprot_ns + "accession")]
+        entry["entry_name"] = element.findtext(uniprot_ns + "name", "")
+        protein = element.find(uniprot_ns + "protein")
+        if protein is not None:
+            # only the names of the protein, not of its components and domains
+            for child in protein:
+                if child.tag in (uniprot_ns + "recommendedName", uniprot_ns + "submittedName"):
+                    section = "protein_names"
+                elif child.tag == uniprot_ns + "alternativeName":
+                    section = "alternative_names"
+                elif child.tag in (uniprot_ns + "cdAntigenName", uniprot_ns + "innName",
+                                   uniprot_ns + "allergenName", uniprot_ns + "biotechName"):
+                    entry["alternative_names"].append(child.text)
+                    continue
+                else:
+                    continue
+                for name in child:
+                    if name.tag in (uniprot_ns + "fullName", uniprot_ns + "shortName"):
+                        entry[section].append(name.text)
+        for gene in element.findall(uniprot_ns + "gene"):
+            for name in gene.findall(uniprot_ns + "name"):
+                if name.get("type") == "primary":
+                    entry["gene_names"].append(name.text)
+                else:
+                    entry["gene_synonyms"].append(name.text)
+        organism = element.find(uniprot_ns + "organism")
+        if organism is not None:
+            names = dict((n.get("type"), n.text) for n in organism.findall(uniprot_ns + "name"))
+            entry["organism"] = names.get("scientific", "")
+            if "common" in names:
+                entry["organism"] += " ({})".format(names["common"])
+            for reference in organism.findall(uniprot_ns + "dbReference"):
+                if reference.get("type") == "NCBI Taxonomy":
+                    entry["taxid"] = reference.get("id")
+        for reference in element.findall(uniprot_ns + "dbReference"):
+            if reference.get("type") == "GO":
+                for prop in reference.findall(uniprot_ns + "property"):
+                    if prop.get("type") == "term":
+                        entry["go"].append((reference.get("id"), prop.get("value")[2:]))
+        # remove the entries that were read from the tree
+        root.clear()
+        yield entry
+
+
+def parse_dump(path):
+    """Read the entries of a flat or XML dump, optionally compressed with gzip"""
+    with open_dump(path) as dump:
+        if path.endswith((".xml", ".xml.gz")):
+            parser = parse_xml(dump)
+        else:
+            parser = parse_flat(dump)
+        for entry in parser:
+            yield entry
+
+
+def entry_line(entry):
+    """
+    Columns returned by the uniprot.org queries of ProteinEntity: id, entry name, reviewed, protein names, organism,
+    go and go-id, separated by tabs
+    """
+    names = entry["protein_names"] + entry["alternative_names"]
+    protein_names = names[0] if names else ""
+    if len(names) > 1:
+        protein_names += " " + " ".join("({})".format(n) for n in names[1:])
+    go = "; ".join("{} [{}]".format(term, go_id) for go_id, term in entry["go"])
+    go_ids = "; ".join(go_id for go_id, term in entry["go"])
+    return "\t".join([entry["accessions"][0], entry["entry_name"], "reviewed" if entry["reviewed"] else "unreviewed",
+                      protein_names, entry["organism"], go, go_ids])
+
+
+def entry_names(entry):
+    """
+    :return: dictionary of each name of the entry to the best kind of that name
+    """
+    names = {}
+    kinds = [(ACCESSION, entry["accessions"] + [entry["entry_name"]]), (GENE_NAME, entry["gene_names"]),
+             (GENE_SYNONYM, entry["gene_synonyms"]), (PROTEIN_NAME, entry["protein_names"]),
+             (ALTERNATIVE_NAME, entry["alternative_names"])]
+    for kind, kind_names in kinds:
+        for name in kind_names:
+            if name and name_key(name) not in names:
+                names[name_key(name)] = (kind, compact_key(name))
+    return names
+
+
+class UniprotIndex(object):
+    """
+    Local index of the names of the UniProtKB entries of an organism, saved in a sqlite database, to normalize
+    protein names without querying uniprot.org.
+    The index is created from a flat (.dat) or XML dump with the "create" action of this module. Each name of an entry
+    (accessions, entry name, gene names and synonyms, protein names) is matched ignoring case, and then ignoring
+    punctuation and spaces. When a text matches several entries, reviewed entries come first, then the entries where
+    the text is a more specific kind of name (accession, gene name, gene synonym, recommended and then alternative
+    protein name), and then the order of the dump, which is sorted by relevance.
+    """
+    def __init__(self, path):
+        self.path = path
+        self.lock = threading.Lock()
+        # one connection per process
+        self._connections = WorkerLocal(lambda: sqlite3.connect(self.path, check_same_thread=False),
+                                        per_thread=False)
+
+    def exists(self):
+        return os.path.isfile(self.path)
+
+    def connection(self):
+        return self._connections.get()
+
+    def create(self, dump_path, organism="9606"):
+        """
+        Create the index from a dump, replacing the previous index when it is complete
+        :param organism: NCBI taxonomy ID of the entries to index, None to index every entry
+        :return: number of entries indexed
+        """
+        tmp_path = self.path + ".tmp"
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        conn = sqlite3.connect(tmp_path)
+        conn.execute("CREATE TABLE entries (accession TEXT PRIMARY KEY, reviewed INTEGER, rank INTEGER, line TEXT)")
+        conn.execute("CREATE TABLE names (name TEXT, compact TEXT, kind INTEGER, accession TEXT)")
+        conn.execute("CREATE TABLE metadata (key TEXT PRIMARY KEY, value TEXT)")
+        nentries = 0
+        for entry in parse_dump(dump_path):
+            if not entry["accessions"] or (organism is not None and entry["taxid"] != str(organism)):
+                continue
+            accession = entry["accessions"][0]
+            conn.execute("INSERT OR IGNORE INTO entries VALUES (?, ?, ?, ?)",
+                         (accession, int(entry["reviewed"]), nentries, entry_line(entry)))
+            conn.executemany("INSERT INTO names VALUES (?, ?, ?, ?)",
+                             [(name, compact, kind, accession)
+                              for name, (kind, compact) in entry_names(entry).iteritems()])
+            nentries += 1
+            if nentries % 100000 == 0:
+                logging.info("indexed {} UniProt entries".format(nentries))
+        conn.execute("CREATE INDEX names_name ON names (name)")
+        conn.execute("CREATE INDEX names_compact ON names (compact)")
+        conn.executemany("INSERT INTO metadata VALUES (?, ?)", [("dump", os.path.abspath(dump_path)),
+                                                                 ("organism", str(organism)),
+                                                                 ("entries", str(nentries))])
+        conn.commit()
+        conn.close()
+        os.rename(tmp_path, self.path)
+        self._connections.reset()
+        logging.info("indexed {} UniProt entries from {}".format(nentries, dump_path))
+        return nentries
+
+    def search(self, text):
+        """
+        :return: columns of the best entry for a name separated by tabs, like the uniprot.org queries, or None
+        """
+        if not self.exists():
+            return None
+        if isinstance(text, str):
+            text = text.decode("utf-8")
+        for column, key in (("name", name_key(text)), ("compact", compact_key(text))):
+            if not key:
+                continue
+            with self.lock:
+                row = self.connection().execute("SELECT e.line FROM names n JOIN entries e ON e.accession = "
+                                                "n.accession WHERE n.{} = ? ORDER BY e.reviewed DESC, n.kind, "
+                                                "e.rank LIMIT 1".format(column), (key,)).fetchone()
+            if row is not None:
+                return row[0]
+        return None
+
+
+def main():
+    start_time = time.time()
+    parser = argparse.ArgumentParser(description='Create and search the local index of UniProt names')
+    parser.add_argument("action", choices=["create", "search"], help="Actions to be performed.")
+    parser.add_argument("--dump", action="store", dest="dump", help="UniProtKB dump (.dat, .xml, optionally .gz)")
+    parser.add_argument("--organism", action="store", dest="organism", default="9606",
+                        help="NCBI taxonomy ID of the entries to index, all to index every entry")
+    parser.add_argument("--index", action="store", dest="index", default=config.uniprot_index,
+                        help="Path of the index")
+    parser.add_argument("--text", action="store", dest="text")
+    parser.add_argument("--log", action="store", dest="loglevel", default="WARNING", help="Log level")
+    options = parser.parse_args()
+
+    numeric_level = getattr(logging, options.loglevel.upper(), None)
+    if not isinstance(numeric_level, int):
+        raise ValueError('Invalid log level: %s' % options.loglevel)
+    logging_format = '%(asctime)s %(levelname)s %(filename)s:%(lineno)s:%(funcName)s %(message)s'
+    logging.basicConfig(level=numeric_level, format=logging_format)
+
+    index = UniprotIndex(options.index)
+    if options.action == "create":
+        organism = None if options.organism == "all" else options.organism
+        print "indexed {} entries".format(index.create(options.dump, organism))
+    elif options.action == "search":
+        print index.search(options.text.decode("utf-8"))
+    logging.info("Total time: %ss" % (time.time() - start_time))
+
+if __name__ == "__main__":
+    main()
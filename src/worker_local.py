@@ -0,0 +1,67 @@
+from __future__ import division, absolute_import
+
+import os
+import sqlite3
+import threading
+
+
+def connect_shared(path, timeout=60, **kwargs):
+    """
+    Open a sqlite database that several workers read and write at the same time, creating its directory if necessary.
+    The database uses write-ahead logging, so that readers do not wait for writers.
+    :param kwargs: other arguments of sqlite3.connect
+    """
+    dirname = os.path.dirname(path)
+    if dirname and not os.path.exists(dirname):
+        os.makedirs(dirname)
+    conn = sqlite3.connect(path, timeout=timeout, **kwargs)
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA synchronous=NORMAL")
+    return conn
+
+
+class WorkerLocal(object):
+    """
+    Object created by factory once for each process, or for each thread of each process if per_thread is True.
+    sqlite connections, subprocesses and temporary files cannot be used by forked processes such as pool workers,
+    so a new object is created when the process changes.
+    """
+    def __init__(self, factory, per_thread=True):
+        self.factory = factory
+        self.per_thread = per_thread
+        self.lock = threading.Lock()
+        self._local = threading.local()
+        self._process = None
+
+    def current(self):
+        """Object of the current worker, None if it was not created yet"""
+        if self.per_thread:
+            value = getattr(self._local, "value", None)
+        else:
+            value = self._process
+        if value is None or value[1] != os.getpid():
+            return None
+        return value[0]
+
+    def get(self):
+        """Object of the current worker, created if necessary"""
+        obj = self.current()
+        if obj is not None:
+            return obj
+        if self.per_thread:
+            obj = self.factory()
+            self._local.value = (obj, os.getpid())
+            return obj
+        with self.lock:
+            obj = self.current()
+            if obj is None:
+                obj = self.factory()
+                self._process = (obj, os.getpid())
+        return obj
+
+    def reset(self):
+        """Forget the object of the current worker, so that the next get creates a new one"""
+        if self.per_thread:
+            self._local.value = None
+        else:
+            self._process = None